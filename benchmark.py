@@ -0,0 +1,459 @@
+import io
+import os
+import json
+import time
+import random
+import argparse
+import platform
+import statistics
+import tempfile
+import contextlib
+from datetime import datetime
+from typing import Callable, Optional
+
+import numpy as np
+import pandas as pd
+from openpyxl import Workbook
+
+from compiled_dictionary import BIN_PATH, CompiledDictionary, DictionaryWriter
+from lexicon_store import LEXICON_PATH, LexiconStore, SQLiteStore, XlsxStore
+
+# ===================================================================
+#                             SETTINGS
+# ===================================================================
+DICTIONARY_SIZES = [10000, 100000]
+LEXICON_SIZES = [100, 1000, 10000]
+RACK_SIZES = [3, 5, 7, 9, 12]
+REPEAT = 5
+SUGGEST_LATENCY = 0.001 # Time expected of one suggest() lookup, in seconds
+OUTPUT_PATH = "benchmark_results.json"
+
+# ===================================================================
+#                        SYNTHETIC DICTIONARY
+# ===================================================================
+# French-like syllables: onset + vowel + coda, words made of 1 to 4 syllables
+# and sometimes a typical ending. The weights roughly follow French spelling.
+ONSETS = ["", "b", "c", "ch", "d", "f", "g", "gr", "j", "l", "m", "n", "p", "pl", "pr", "qu", "r", "s", "t",
+          "tr", "v", "br", "cl", "fr", "gu", "ph"]
+VOWELS = ["a", "e", "i", "o", "u", "é", "è", "ê", "ou", "ai", "an", "on", "in", "eu", "au", "oi", "â", "î", "ô", "û",
+          "ë", "ï", "y"]
+VOWEL_WEIGHTS = [14, 12, 9, 8, 5, 9, 3, 1, 4, 3, 4, 4, 3, 2, 2, 2, 0.5, 0.5, 0.5, 0.3, 0.2, 0.2, 0.8]
+CODAS = ["", "", "", "", "r", "s", "t", "n", "l", "x", "c"]
+ENDINGS = ["", "", "", "er", "ez", "ons", "ent", "ait", "é", "ée", "és", "ir", "ement", "tion", "eur", "euse",
+           "ique", "age", "ette", "ière"]
+
+# Share of compound words ("Arc-en-ciel", "Pomme de terre")
+COMPOUND_RATE = 0.05
+COMPOUND_LINKS = ["-", " ", " de ", "-en-", " à "]
+
+def _syllables(rng: np.random.Generator, count: int) -> np.ndarray:
+    """ 'count' random syllables. """
+
+    weights = np.array(VOWEL_WEIGHTS) / sum(VOWEL_WEIGHTS)
+    onsets = np.array(ONSETS, dtype=object)[rng.integers(len(ONSETS), size=count)]
+    vowels = np.array(VOWELS, dtype=object)[rng.choice(len(VOWELS), size=count, p=weights)]
+    codas = np.array(CODAS, dtype=object)[rng.integers(len(CODAS), size=count)]
+    return onsets + vowels + codas
+
+def generate_words(size: int, seed: int = 0) -> list:
+    """ Generates 'size' distinct French-like words, with accents and compound words, capitalized like the
+    dictionary words.
+
+    Args:
+        size (int): Number of words.
+        seed (int): Random seed.
+
+    Returns:
+        (list): Sorted words.
+    """
+
+    rng = np.random.default_rng(seed)
+    words = set()
+
+    while len(words) < size:
+        count = int((size - len(words)) * 1.3) + 16
+
+        # 1 to 4 syllables per word, and an ending
+        lengths = rng.choice([1, 2, 3, 4], size=count, p=[0.15, 0.4, 0.3, 0.15])
+        syllables = _syllables(rng, int(lengths.sum())).tolist()
+        endings = np.array(ENDINGS, dtype=object)[rng.integers(len(ENDINGS), size=count)]
+
+        simple = []
+        start = 0
+        for length, ending in zip(lengths.tolist(), endings.tolist()):
+            simple.append("".join(syllables[start:start + length]) + ending)
+            start += length
+
+        # Compound words link two simple words
+        compound = rng.random(count) < COMPOUND_RATE
+        links = rng.integers(len(COMPOUND_LINKS), size=count)
+        partners = rng.integers(count, size=count)
+        for idx in np.flatnonzero(compound).tolist():
+            simple[idx] = simple[idx] + COMPOUND_LINKS[links[idx]] + simple[partners[idx]]
+
+        words.update(word.capitalize() for word in simple)
+
+    return sorted(random.Random(seed).sample(sorted(words), size))
+
+def generate_definitions(word: str, rng: random.Random) -> list:
+    """ 1 to 3 synthetic definitions of a word. """
+    return [f"Définition {idx + 1} de « {word} », synthétique." for idx in range(rng.randint(1, 3))]
+
+def generate_dictionary(size: int, path: str, seed: int = 0) -> CompiledDictionary:
+    """ Writes a synthetic compiled dictionary of 'size' words (see 'generate_words()') and opens it.
+
+    Args:
+        size (int): Number of words.
+        path (str): Path of the compiled dictionary to write.
+        seed (int): Random seed.
+    """
+
+    rng = random.Random(seed)
+    with DictionaryWriter(path) as writer:
+        for word in generate_words(size, seed):
+            writer.add(word, generate_definitions(word, rng))
+    return CompiledDictionary(path)
+
+# ===================================================================
+#                         SYNTHETIC LEXICON
+# ===================================================================
+def generate_lexicon(store: LexiconStore, words: list, size: int, seed: int = 0) -> list:
+    """ Adds 'size' random words of the dictionary to a lexicon, in a single batch.
+
+    Returns:
+        (list): Words added.
+    """
+
+    sample = random.Random(seed).sample(words, size)
+    with store.batch():
+        for word in sample:
+            store.add(word, f"1) Définition de {word}.", str(int(time.time())))
+    return sample
+
+def open_lexicon(engine: str, directory: str) -> LexiconStore:
+    """ Empty lexicon of the given storage engine ('xlsx' or 'sqlite'), saved in 'directory'. """
+
+    if engine == "sqlite":
+        path = os.path.join(directory, "lexicon.db")
+        if os.path.exists(path):
+            os.remove(path)
+        return SQLiteStore(path)
+
+    workbook = Workbook()
+    workbook.active.append(["Mot", "Definitions", "Timestamp"])
+    return XlsxStore(workbook.active, os.path.join(directory, "lexicon.xlsx"))
+
+# ===================================================================
+#                              TIMING
+# ===================================================================
+def measure(function: Callable, repeat: int = REPEAT, number: int = 1) -> dict:
+    """ Times a function: 'repeat' measures of 'number' calls each.
+
+    Returns:
+        (dict): Time of one call in seconds (min, median, mean, max over the measures), repeat and number.
+    """
+
+    times = []
+    with contextlib.redirect_stdout(io.StringIO()): # The functions print their progress
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for _ in range(number):
+                function()
+            times.append((time.perf_counter() - start) / number)
+
+    return {"min": min(times), "median": statistics.median(times), "mean": statistics.fmean(times),
+            "max": max(times), "repeat": repeat, "number": number}
+
+def measure_each(function: Callable, items: list, repeat: int = REPEAT) -> dict:
+    """ Times a function called with each item: the time of an item is its best of 'repeat' calls.
+
+    Returns:
+        (dict): Time of one call in seconds (min, median, mean, max over the items), repeat and number of items.
+    """
+
+    times = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for item in items:
+            best = float("inf")
+            for _ in range(repeat):
+                start = time.perf_counter()
+                function(item)
+                best = min(best, time.perf_counter() - start)
+            times.append(best)
+
+    return {"min": min(times), "median": statistics.median(times), "mean": statistics.fmean(times),
+            "max": max(times), "repeat": repeat, "number": len(items)}
+
+class Results:
+    """ Benchmark results, written as JSON. """
+
+    def __init__(self):
+        self.entries = []
+
+    def add(self, group: str, name: str, size: int, timing: dict, **params):
+        entry = {"group": group, "name": name, "size": size, "params": params, **timing}
+        self.entries.append(entry)
+        print(f"{group:<10} {name:<34} {size:>9} {timing['median'] * 1000:>12.3f} ms")
+
+    def add_memory(self, size: int, usage: dict):
+        """ Memory used by a dictionary (see 'CompiledDictionary.memory_usage()'). """
+        mapped = sum(usage["mapped"].values())
+        self.entries.append({"group": "memory", "name": "dictionary", "size": size, "mapped": mapped,
+                             "private": usage["private"], "total": usage["total"]})
+        print(f"{'memory':<10} {'mapped (shared)':<34} {size:>9} {mapped / 2 ** 20:>12.1f} MiB")
+        print(f"{'memory':<10} {'private':<34} {size:>9} {usage['total'] / 2 ** 20:>12.1f} MiB")
+
+    def write(self, path: str, settings: dict):
+        document = {
+            "date": datetime.now().isoformat(timespec="seconds"),
+            "platform": platform.platform(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "settings": settings,
+            "results": self.entries,
+        }
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(document, file, ensure_ascii=False, indent=1)
+
+# ===================================================================
+#                            BENCHMARKS
+# ===================================================================
+def bench_dictionary(results: Results, dico: CompiledDictionary, df: pd.DataFrame, repeat: int, seed: int):
+    """ define() and define_many() on the compiled dictionary and on its dataframe. """
+
+    import dictionary
+    from word_index import WordIndex
+
+    words = random.Random(seed).sample(dico.words, min(1000, len(dico)))
+    size = len(dico)
+
+    results.add("define", "index build", size, measure(lambda: WordIndex(df["Mot"].tolist()).position(words[0]),
+                                                       repeat=1))
+    results.add("define", "define (compiled)", size,
+                measure(lambda: dictionary.define(dico, "Mot", "Définitions", words[0]), repeat, 100))
+    results.add("define", "define (dataframe)", size,
+                measure(lambda: dictionary.define(df, "Mot", "Définitions", words[0]), repeat, 100))
+    results.add("define", "define missing word", size,
+                measure(lambda: dictionary.define(dico, "Mot", "Définitions", "Zzzzz"), repeat, 100))
+    results.add("define", "define_many (1000 words)", size,
+                measure(lambda: dictionary.define_many(dico, "Mot", "Définitions", words), repeat), words=len(words))
+
+    # Misspelled words: a letter replaced
+    misspelled = [word[:-1] + "x" for word in words[:100]]
+    results.add("define", "suggest (100 misspelled words)", size,
+                measure(lambda: [dictionary.suggest(dico, "Mot", word) for word in misspelled], repeat),
+                words=len(misspelled))
+
+    # Latency of a single lookup, expected well under a millisecond
+    timing = measure_each(lambda word: dictionary.suggest(dico, "Mot", word), misspelled, repeat)
+    results.add("define", "suggest (per word)", size, timing, words=len(misspelled), expected=SUGGEST_LATENCY)
+    if timing["median"] > SUGGEST_LATENCY:
+        print(f"Warning: a suggest() lookup takes {timing['median'] * 1000:.3f} ms (median), more than the "
+              f"{SUGGEST_LATENCY * 1000:g} ms expected")
+
+# Each filter alone, then combined
+FILTERS = {
+    "no_comp": {},
+    "length": {"length": 7},
+    "start_with": {"start_with": "pr"},
+    "end_with": {"end_with": "er"},
+    "nth_letters": {"nth_letters": [[2, "r"], [4, "t"]]},
+    "contains": {"contains": ["a", "u"]},
+    "contains (occurrences)": {"contains": {"e": 2}},
+    "not_contain": {"not_contain": ["b", "x"]},
+    "anagram": {"anagram": ["c", "a", "r", "t", "e"]},
+    "pattern": {"pattern": "P?A??ER"},
+    "pattern (*)": {"pattern": "RE*TION"},
+    "accent_insensitive": {"contains": ["e"], "start_with": "e", "accent_insensitive": True},
+    "combined": {"start_with": "g", "end_with": "it", "contains": ["a", "u"], "not_contain": ["b"],
+                 "nth_letters": [[2, "r"], [4, "t"]], "length": 7},
+    "combined (no index)": {"contains": ["a", "u"], "not_contain": ["b"], "nth_letters": [[2, "r"]]},
+}
+
+def bench_filters(results: Results, df: pd.DataFrame, repeat: int):
+    """ multi_filters() with each filter alone and combined, on a fresh dataframe (first call, building the
+    indexes it needs) and then warm. """
+
+    import multi_filters
+
+    size = len(df)
+    fresh = df.copy() # New dataframe: new indexes
+
+    for name, filters in FILTERS.items():
+        results.add("filters", f"{name} (first call)", size,
+                    measure(lambda: multi_filters.multi_filters(fresh, "Mot", log=None, **filters), repeat=1))
+        results.add("filters", name, size,
+                    measure(lambda: multi_filters.multi_filters(fresh, "Mot", log=None, **filters), repeat),
+                    filters=filters)
+
+    queries = [dict(filters) for filters in FILTERS.values()] * 10
+    results.add("filters", f"multi_filters_batch ({len(queries)} queries)", size,
+                measure(lambda: multi_filters.multi_filters_batch(fresh, "Mot", queries, log=None), repeat),
+                queries=len(queries))
+
+def bench_anagrams(results: Results, df: pd.DataFrame, repeat: int, seed: int):
+    """ Anagram filter with racks of increasing size, with and without blank tiles. """
+
+    import multi_filters
+
+    size = len(df)
+    rng = random.Random(seed)
+    letters = "eeeeaaaiiinnorrssttuulldcmpéèg"
+
+    for rack_size in RACK_SIZES:
+        rack = [rng.choice(letters) for _ in range(rack_size)]
+        results.add("anagram", f"rack of {rack_size}", size,
+                    measure(lambda: multi_filters.multi_filters(df, "Mot", anagram=rack, log=None), repeat),
+                    rack="".join(rack))
+
+        blanks = rack[:-2] + ["?", "?"]
+        results.add("anagram", f"rack of {rack_size} (2 blanks)", size,
+                    measure(lambda: multi_filters.multi_filters(df, "Mot", anagram=blanks, log=None), repeat),
+                    rack="".join(blanks))
+
+def bench_stream(results: Results, dico: CompiledDictionary, repeat: int):
+    """ Streaming filter straight from the compiled dictionary: first word, first 100 words, whole dictionary. """
+
+    import multi_filters
+
+    size = len(dico)
+    filters = FILTERS["combined (no index)"]
+
+    def first(count: Optional[int]) -> list:
+        return list(multi_filters.stream_filters(dico, limit=count, log=None, **filters))
+
+    results.add("stream", "first word", size, measure(lambda: first(1), repeat), filters=filters)
+    results.add("stream", "first 100 words", size, measure(lambda: first(100), repeat), filters=filters)
+    results.add("stream", "whole dictionary", size, measure(lambda: first(None), repeat), filters=filters)
+
+def bench_lexicon(results: Results, dico: CompiledDictionary, lexicon_sizes: list, directory: str, repeat: int,
+                  seed: int):
+    """ Lexicon add / search / delete at growing lexicon sizes, for each storage engine. """
+
+    import lexicon
+
+    words = dico.words
+    rng = random.Random(seed)
+
+    for engine in ("xlsx", "sqlite"):
+        for lexicon_size in lexicon_sizes:
+            if lexicon_size >= len(words):
+                continue
+
+            store = open_lexicon(engine, directory)
+            results.add("lexicon", f"{engine} fill (batch)", lexicon_size,
+                        measure(lambda: generate_lexicon(store, words, lexicon_size, seed), repeat=1))
+
+            present = rng.sample(list(w for w, _, _ in store), min(100, lexicon_size))
+            absent = rng.sample([word for word in words if word not in store], 20)
+
+            results.add("lexicon", f"{engine} search ({len(present)} words)", lexicon_size,
+                        measure(lambda: [lexicon.search(store, word, log=False) for word in present], repeat),
+                        words=len(present))
+
+            # Each add is saved (no batch), then deleted, so that the size stays the same between measures
+            def add_delete():
+                for word in absent:
+                    lexicon.add_word(dico, store, word)
+                for word in absent:
+                    lexicon.delete(store, word)
+
+            results.add("lexicon", f"{engine} add + delete ({len(absent)} words)", lexicon_size,
+                        measure(add_delete, max(1, repeat // 2)), words=len(absent))
+
+            # Same modifications in a batch, saved once: the deletions are not saved one by one
+            def add_delete_batch():
+                with store.batch():
+                    add_delete()
+
+            results.add("lexicon", f"{engine} add + delete (batch)", lexicon_size,
+                        measure(add_delete_batch, max(1, repeat // 2)), words=len(absent))
+
+            if isinstance(store, SQLiteStore):
+                store.close()
+
+# ===================================================================
+#                               RUN
+# ===================================================================
+def run(sizes: list, lexicon_sizes: list, repeat: int = REPEAT, seed: int = 0, output: str = OUTPUT_PATH,
+        directory: Optional[str] = None) -> Results:
+    """ Runs all the benchmarks for each dictionary size and writes the results as JSON.
+
+    The benchmarks run in a scratch directory holding a synthetic dictionary
+    and lexicon: the modules loading 'files/dico.bin' and 'files/lexi.xlsx'
+    when imported load them instead of the real ones.
+
+    Args:
+        sizes (list): Numbers of words of the synthetic dictionaries.
+        lexicon_sizes (list): Numbers of words of the synthetic lexicons.
+        repeat (int): Number of measures of each operation.
+        seed (int): Random seed.
+        output (str): Path of the JSON results.
+        directory (str): Scratch directory, a temporary one by default.
+    """
+
+    output = os.path.abspath(output)
+    sizes = sorted(sizes)
+    results = Results()
+
+    with contextlib.ExitStack() as stack:
+        if directory is None:
+            directory = stack.enter_context(tempfile.TemporaryDirectory(prefix="benchmark-"))
+        os.makedirs(os.path.join(directory, "files"), exist_ok=True)
+        previous = os.getcwd()
+        os.chdir(directory)
+        stack.callback(os.chdir, previous)
+
+        # Dictionary and lexicon loaded by the modules when imported
+        print(f"Generating a dictionary of {sizes[0]} words...")
+        generate_dictionary(sizes[0], BIN_PATH, seed)
+        workbook = Workbook()
+        workbook.active.append(["Mot", "Definitions", "Timestamp"])
+        workbook.save(LEXICON_PATH)
+
+        for size in sizes:
+            path = BIN_PATH if size == sizes[0] else os.path.join("files", f"dico-{size}.bin")
+            if size != sizes[0]:
+                print(f"Generating a dictionary of {size} words...")
+                generate_dictionary(size, path, seed)
+
+            dico = CompiledDictionary(path)
+            opened = []
+            results.add("load", "open + dataframe view", size,
+                        measure(lambda: opened.append(CompiledDictionary(path)) or opened[0].to_dataframe(),
+                                repeat=1))
+            df = opened[0].to_dataframe()
+
+            bench_dictionary(results, dico, df, repeat, seed)
+            bench_filters(results, df, repeat)
+            bench_anagrams(results, df, repeat, seed)
+            bench_stream(results, dico, repeat)
+
+            # Dataframe view and all the structures built by the filters
+            results.add_memory(size, opened[0].memory_usage())
+
+        # Lexicons drawn from the largest dictionary
+        bench_lexicon(results, dico, lexicon_sizes, directory, repeat, seed)
+
+    results.write(output, {"sizes": sizes, "lexicon_sizes": lexicon_sizes, "repeat": repeat, "seed": seed})
+    print(f"Results written to '{output}'")
+    return results
+
+# ===================================================================
+#                               MAIN
+# ===================================================================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks the dictionary, the filters and the lexicon on "
+                                                 "synthetic data, and writes the results as JSON.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DICTIONARY_SIZES,
+                        help="numbers of words of the synthetic dictionaries (10k to 5M)")
+    parser.add_argument("--lexicon-sizes", type=int, nargs="+", default=LEXICON_SIZES,
+                        help="numbers of words of the synthetic lexicons")
+    parser.add_argument("--repeat", type=int, default=REPEAT, help="number of measures of each operation")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=OUTPUT_PATH, help="JSON results")
+    parser.add_argument("--directory", help="scratch directory (a temporary one by default)")
+    args = parser.parse_args()
+
+    run(args.sizes, args.lexicon_sizes, args.repeat, args.seed, args.output, args.directory)
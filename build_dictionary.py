@@ -0,0 +1,403 @@
+import os
+import csv
+import json
+import heapq
+import tempfile
+import argparse
+from contextlib import nullcontext
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import xml.etree.ElementTree as ET
+from time import time
+from typing import Iterator, Optional
+
+from compiled_dictionary import BIN_PATH, DictionaryWriter
+from fuzzy import MAX_DISTANCE
+
+# ===================================================================
+#                             SETTINGS
+# ===================================================================
+# Maximum number of rows held in memory while sorting. Above it, the
+# sorted rows are spilled to a temporary file (a "run") and the runs
+# are merged at the end.
+RUN_SIZE = 100000
+
+# A progress report is displayed every PROGRESS_EVERY entries
+PROGRESS_EVERY = 50000
+
+# Number of shards per worker in a parallel build: smaller shards balance
+# the load better between the workers.
+SHARDS_PER_WORKER = 4
+
+# Size of the blocks read from the XML file
+CHUNK_SIZE = 1 << 20
+
+# ===================================================================
+#                             XML PARSING
+# ===================================================================
+def _local_name(tag: str) -> str:
+    """ Tag name without its namespace. """
+    return tag.rsplit("}", 1)[-1]
+
+def _parse_entries(events: Iterator[tuple]) -> Iterator[tuple]:
+    """ Extracts the (word, definitions) of each `<entry>` from a stream of (event, element).
+
+    Each entry is removed from the tree once read, so that memory usage
+    doesn't depend on the size of the file. As in the upstream notebook,
+    the word is the capitalized 'form' attribute of the entry and the
+    definitions are the texts of its `<gloss>` elements.
+    """
+
+    parents = []
+    for event, elem in events:
+        if event == "start":
+            parents.append(elem)
+            continue
+
+        parents.pop()
+        if _local_name(elem.tag) != "entry":
+            continue
+
+        word = elem.get("form", "").capitalize()
+        definitions = [gloss.text for gloss in elem.iter()
+                       if _local_name(gloss.tag) == "gloss" and len(gloss) == 0 and gloss.text]
+
+        # Done with this entry: it is removed from its parent to free memory
+        elem.clear()
+        if parents:
+            parents[-1].remove(elem)
+
+        yield word, definitions
+
+def _keep(word: str, definitions: list) -> bool:
+    """ Some exotic words have no definition, or a single '.': they are not kept. """
+    return bool(word) and len(definitions) > 0 and definitions != ["."]
+
+def iter_entries(xml_path: str, progress: bool = True) -> Iterator[tuple]:
+    """ Streams the (word, definitions) rows of the Wiktionary XML file.
+
+    The entries without definition (or with a single '.') are skipped.
+
+    Args:
+        xml_path (str): Path of the Wiktionary XML file.
+        progress (bool): Display a progress report.
+
+    Yields:
+        (tuple): (word, list of definitions)
+    """
+
+    total_size = os.path.getsize(xml_path)
+    start_time = time()
+    entries = 0
+    skipped = 0
+
+    with open(xml_path, "rb") as file:
+        for word, definitions in _parse_entries(ET.iterparse(file, events=("start", "end"))):
+            entries += 1
+            if progress and entries % PROGRESS_EVERY == 0:
+                _report(entries, skipped, file.tell(), total_size, start_time)
+
+            if _keep(word, definitions):
+                yield word, definitions
+            else:
+                skipped += 1
+
+    if progress:
+        _report(entries, skipped, total_size, total_size, start_time)
+
+def _report(entries: int, skipped: int, position: int, total_size: int, start_time: float):
+    print(f"{entries} entries parsed ({skipped} without definition) - "
+          f"{round(position / total_size * 100, 1) if total_size else 100}% - {round(time() - start_time, 1)}s")
+
+# ===================================================================
+#                              SHARDS
+# ===================================================================
+def _is_entry_start(data: bytes, idx: int) -> bool:
+    """ '<entry' found at idx is an entry tag (and not '<entryXXX'). """
+    return data[idx + 6:idx + 7] in (b" ", b">", b"\t", b"\r", b"\n", b"/")
+
+def _next_entry(file, position: int) -> int:
+    """ Position of the first `<entry` tag at or after 'position', -1 if none. """
+
+    while True:
+        file.seek(position)
+        data = file.read(CHUNK_SIZE + 7)
+        if len(data) < 7:
+            return -1
+
+        idx = data.find(b"<entry")
+        while idx != -1 and idx < CHUNK_SIZE:
+            if _is_entry_start(data, idx):
+                return position + idx
+            idx = data.find(b"<entry", idx + 1)
+
+        if len(data) < CHUNK_SIZE + 7:
+            return -1
+        position += CHUNK_SIZE
+
+def _last_entry_end(file, size: int) -> int:
+    """ Position right after the last `</entry>` tag of the file. """
+
+    position = size
+    while position > 0:
+        start = max(0, position - CHUNK_SIZE)
+        file.seek(start)
+        data = file.read(position - start + 7)
+        idx = data.rfind(b"</entry>")
+        if idx != -1:
+            return start + idx + len(b"</entry>")
+        position = start
+    return -1
+
+def shard_ranges(xml_path: str, shards: int) -> list:
+    """ Splits the XML file into byte ranges starting on `<entry>` boundaries.
+
+    The entries must be siblings: each range contains a sequence of whole
+    entries (and what lies between them), which can be parsed on its own.
+
+    Args:
+        xml_path (str): Path of the Wiktionary XML file.
+        shards (int): Desired number of ranges (less ranges are returned for a small file).
+
+    Returns:
+        (list): (start, end) byte positions of each range.
+    """
+
+    size = os.path.getsize(xml_path)
+    with open(xml_path, "rb") as file:
+        first = _next_entry(file, 0)
+        end = _last_entry_end(file, size)
+        if first == -1 or end == -1:
+            return []
+
+        starts = [first]
+        for idx in range(1, shards):
+            start = _next_entry(file, max(first + (end - first) * idx // shards, starts[-1] + 1))
+            if start == -1 or start >= end:
+                break
+            if start != starts[-1]:
+                starts.append(start)
+
+    return list(zip(starts, starts[1:] + [end]))
+
+def _shard_events(xml_path: str, start: int, end: int, header_end: int) -> Iterator[tuple]:
+    """ Parsing events of a byte range of the XML file.
+
+    The range is preceded by the beginning of the file, up to the first
+    entry: the prolog (with its entity declarations) and the start tags of
+    the elements containing the entries (with their namespace declarations),
+    so that the entries of the shard are parsed as in the whole file.
+    """
+
+    parser = ET.XMLPullParser(events=("start", "end"))
+
+    with open(xml_path, "rb") as file:
+        for position, stop in ((0, header_end), (start, end)):
+            file.seek(position)
+            remaining = stop - position
+            while remaining > 0:
+                chunk = file.read(min(CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                parser.feed(chunk)
+                yield from parser.read_events()
+
+    # The elements containing the entries are left open: the parser isn't closed, there is nothing more to read
+
+def _build_shard(xml_path: str, start: int, end: int, header_end: int, directory: str, run_size: int) -> tuple:
+    """ Worker: parses a shard and writes its rows as sorted run files.
+
+    Returns:
+        (tuple): (run files, entries parsed, entries skipped)
+    """
+
+    runs = []
+    buffer = []
+    entries = 0
+    skipped = 0
+    for word, definitions in _parse_entries(_shard_events(xml_path, start, end, header_end)):
+        entries += 1
+        if not _keep(word, definitions):
+            skipped += 1
+            continue
+
+        buffer.append((word, definitions))
+        if len(buffer) >= run_size:
+            runs.append(_write_run(buffer, directory))
+            buffer = []
+
+    if buffer:
+        runs.append(_write_run(buffer, directory))
+
+    return runs, entries, skipped
+
+def parallel_sorted_rows(xml_path: str, directory: str, workers: int, run_size: int = RUN_SIZE,
+                         progress: bool = True) -> Iterator[tuple]:
+    """ Parses the XML file in a process pool and merges the sorted rows of all the shards.
+
+    Args:
+        xml_path (str): Path of the Wiktionary XML file.
+        directory (str): Directory of the temporary run files.
+        workers (int): Number of worker processes.
+        run_size (int): Maximum number of rows held in memory by each worker.
+        progress (bool): Display a progress report.
+    """
+
+    start_time = time()
+    ranges = shard_ranges(xml_path, workers * SHARDS_PER_WORKER)
+    if not ranges:
+        # No `<entry` tag to split on (entries written with a namespace prefix, for instance): single process
+        yield from sorted_rows(iter_entries(xml_path, progress), directory, run_size)
+        return
+    total_size = sum(end - start for start, end in ranges)
+
+    runs = []
+    entries = 0
+    skipped = 0
+    done_size = 0
+    header_end = ranges[0][0] # Beginning of the file, parsed before each shard
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(_build_shard, xml_path, start, end, header_end, directory, run_size): end - start
+                   for start, end in ranges}
+
+        for future in as_completed(futures):
+            shard_runs, shard_entries, shard_skipped = future.result()
+            runs.extend(shard_runs)
+            entries += shard_entries
+            skipped += shard_skipped
+            done_size += futures[future]
+            if progress:
+                _report(entries, skipped, done_size, total_size, start_time)
+
+    yield from heapq.merge(*[_read_run(run) for run in runs], key=_sort_key)
+
+# ===================================================================
+#                           EXTERNAL SORT
+# ===================================================================
+def _sort_key(row: tuple) -> tuple:
+    """ Rows are sorted by word, then by definitions so that identical rows are adjacent. """
+    return row[0], row[1]
+
+def _write_run(rows: list, directory: str) -> str:
+    """ Sorts rows and writes them to a temporary run file (JSON lines). """
+
+    rows.sort(key=_sort_key)
+    with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=directory, suffix=".run", delete=False) as run:
+        for row in rows:
+            run.write(json.dumps(row, ensure_ascii=False) + "\n")
+    return run.name
+
+def _read_run(path: str) -> Iterator[tuple]:
+    with open(path, encoding="utf-8") as run:
+        for line in run:
+            word, definitions = json.loads(line)
+            yield word, definitions
+
+def sorted_rows(rows: Iterator[tuple], directory: str, run_size: int = RUN_SIZE) -> Iterator[tuple]:
+    """ Sorts (word, definitions) rows with a bounded memory usage.
+
+    Rows are sorted by batches of 'run_size', each batch being written to a
+    temporary run file, then the runs are merged while being read.
+
+    Args:
+        rows (Iterator[tuple]): Rows to sort.
+        directory (str): Directory of the temporary run files.
+        run_size (int): Maximum number of rows held in memory.
+    """
+
+    runs = []
+    buffer = []
+    for row in rows:
+        buffer.append(row)
+        if len(buffer) >= run_size:
+            runs.append(_write_run(buffer, directory))
+            buffer = []
+
+    # Everything fits in memory: no run needed
+    if not runs:
+        yield from sorted(buffer, key=_sort_key)
+        return
+
+    if buffer:
+        runs.append(_write_run(buffer, directory))
+
+    yield from heapq.merge(*[_read_run(run) for run in runs], key=_sort_key)
+
+# ===================================================================
+#                               BUILD
+# ===================================================================
+def build_dictionary(xml_path: str, target: str = BIN_PATH, csv_path: Optional[str] = None,
+                     run_size: int = RUN_SIZE, progress: bool = True, workers: Optional[int] = None,
+                     fuzzy_distance: int = MAX_DISTANCE) -> str:
+    """ Builds the compiled dictionary from the Wiktionary XML file.
+
+    Replaces the upstream notebook: the XML file is stream-parsed and the
+    sorted rows are written directly to the compiled dictionary. With
+    several workers, the file is split into shards parsed in parallel, and
+    the sorted rows of all the shards are merged. Identical rows are only
+    written once.
+
+    Args:
+        xml_path (str): Path of the Wiktionary XML file.
+        target (str): Path of the compiled dictionary to write.
+        csv_path (str): If given, the dictionary is also written in .csv format (same format as the upstream file).
+        run_size (int): Maximum number of rows held in memory while sorting (by each worker).
+        progress (bool): Display a progress report.
+        workers (int): Number of worker processes, all the CPU cores by default. With 1, the file is parsed in
+        the current process.
+        fuzzy_distance (int): Largest edit distance of the fuzzy index, 0 not to build it (the fuzzy index is the
+        only structure built in memory, its size depending on the number of words).
+
+    Returns:
+        (str): Path of the compiled dictionary.
+    """
+
+    start_time = time()
+    workers = workers or os.cpu_count() or 1
+    print(f"Dictionary build ({workers} worker{'s' if workers > 1 else ''})...")
+
+    with tempfile.TemporaryDirectory() as directory:
+        if workers > 1:
+            rows = parallel_sorted_rows(xml_path, directory, workers, run_size, progress)
+        else:
+            rows = sorted_rows(iter_entries(xml_path, progress), directory, run_size)
+
+        # The .csv file is closed before the compiled dictionary, which must stay the most recent
+        # (otherwise it would be compiled again from the .csv file on load)
+        with DictionaryWriter(target, fuzzy_distance) as writer:
+            with open(csv_path, "w", newline="", encoding="utf-8") if csv_path else nullcontext() as csv_file:
+                writer_csv = csv.writer(csv_file) if csv_file else None
+                if writer_csv:
+                    writer_csv.writerow(["Mot", "Définitions"])
+
+                previous = None
+                for word, definitions in rows:
+                    # Duplicates are adjacent once the rows are sorted
+                    if (word, definitions) == previous:
+                        continue
+                    previous = (word, definitions)
+
+                    writer.add(word, definitions)
+                    if writer_csv:
+                        writer_csv.writerow([word, definitions])
+
+    print(f"{writer.count} words written in '{target}' ({round(time() - start_time, 1)}s)")
+    return target
+
+# ===================================================================
+#                               MAIN
+# ===================================================================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Builds the compiled dictionary from the Wiktionary XML file.")
+    parser.add_argument("xml", help="Wiktionary XML file")
+    parser.add_argument("target", nargs="?", default=BIN_PATH, help="compiled dictionary")
+    parser.add_argument("--csv", help="also write the dictionary in .csv format")
+    parser.add_argument("--run-size", type=int, default=RUN_SIZE, help="maximum number of rows held in memory")
+    parser.add_argument("--workers", type=int, help="number of worker processes (all the CPU cores by default)")
+    parser.add_argument("--quiet", action="store_true", help="no progress report")
+    parser.add_argument("--fuzzy-distance", type=int, default=MAX_DISTANCE,
+                        help="largest edit distance of the fuzzy index, 0 not to build it")
+    args = parser.parse_args()
+
+    build_dictionary(args.xml, args.target, args.csv, args.run_size, progress=not args.quiet, workers=args.workers,
+                     fuzzy_distance=args.fuzzy_distance)
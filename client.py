@@ -0,0 +1,148 @@
+import json
+import socket
+import argparse
+from itertools import count
+from typing import Optional
+
+# ===================================================================
+#                             SETTINGS
+# ===================================================================
+# The server listens on a Unix socket where available, on localhost otherwise. The client only needs these
+# settings: it doesn't import the dictionary modules.
+SOCKET_PATH = "files/server.sock"
+HOST = "127.0.0.1"
+PORT = 8765
+
+# ===================================================================
+#                              CLIENT
+# ===================================================================
+class ServerError(Exception):
+    """ Error returned by the server for a request. """
+
+class Client:
+    """ Thin client of the dictionary server (see server.py).
+
+    It doesn't load the dictionary: each call is a request to the server,
+    which answers from the dictionary and indexes it already has in memory.
+
+    Args:
+        path (str): Unix socket of the server. None to connect to 'host':'port'.
+        host (str): Address of the server.
+        port (int): Port of the server.
+        timeout (float): Maximum time to wait for an answer, in seconds.
+
+    Example:
+        with Client() as client:
+            client.define("manga")
+            client.multi_filters(length=5, start_with="g")
+    """
+
+    def __init__(self, path: Optional[str] = SOCKET_PATH, host: str = HOST, port: int = PORT,
+                 timeout: Optional[float] = 60):
+        if path is not None and hasattr(socket, "AF_UNIX"):
+            self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self._socket.settimeout(timeout)
+            self._socket.connect(path)
+        else:
+            self._socket = socket.create_connection((host, port), timeout=timeout)
+        self._file = self._socket.makefile("rwb")
+        self._ids = count(1)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._file.close()
+        self._socket.close()
+
+    def request(self, op: str, **args):
+        """ Sends a request and waits for its answer.
+
+        Raises:
+            ServerError: The server couldn't answer the request.
+        """
+
+        request_id = next(self._ids)
+        self._file.write(json.dumps({"id": request_id, "op": op, "args": args}, ensure_ascii=False).encode() + b"\n")
+        self._file.flush()
+
+        line = self._file.readline()
+        if not line:
+            raise ConnectionError("connection closed by the server")
+
+        response = json.loads(line)
+        if "error" in response:
+            raise ServerError(response["error"])
+        return response["result"]
+
+    # -------------------------------------------------------------------
+    #                            OPERATIONS
+    # -------------------------------------------------------------------
+    def ping(self) -> dict:
+        """ Server statistics: number of words, requests served, filters result cache. """
+        return self.request("ping")
+
+    def memory(self) -> dict:
+        """ Memory used by the dictionary of the server (see 'CompiledDictionary.memory_usage()'). """
+        return self.request("memory")
+
+    def define(self, word: str, strict: bool = True) -> Optional[list]:
+        """ Definitions of a word, None if it is not in the dictionary (see 'dictionary.define()'). """
+        return self.request("define", word=word, strict=strict)
+
+    def define_many(self, words: list, strict: bool = True) -> dict:
+        """ Definitions of several words (see 'dictionary.define_many()'). """
+        return self.request("define_many", words=list(words), strict=strict)
+
+    def suggest(self, word: str, max_distance: int = 2, limit: Optional[int] = 10) -> list:
+        """ [word, distance] of the words close to a misspelled word (see 'dictionary.suggest()'). """
+        return self.request("suggest", word=word, max_distance=max_distance, limit=limit)
+
+    def multi_filters(self, **filters) -> Optional[list]:
+        """ Words kept by the filters (see 'multi_filters.multi_filters()'), None for wrong filters. """
+        return self.request("multi_filters", **filters)
+
+    def multi_filters_batch(self, queries: list) -> Optional[list]:
+        """ Words kept by each query (see 'multi_filters.multi_filters_batch()'). """
+        return self.request("multi_filters_batch", queries=queries)
+
+    def match_patterns(self, patterns: list, **options) -> Optional[dict]:
+        """ Words matching each pattern (see 'multi_filters.match_patterns()'). """
+        return self.request("match_patterns", patterns=patterns, **options)
+
+    def add_word(self, word: str, strict: bool = True) -> Optional[list]:
+        """ Adds a word of the dictionary to the lexicon. Returns its lexicon entry, None if not in dictionary. """
+        return self.request("add_word", word=word, strict=strict)
+
+    def insert(self, word: str, definition) -> Optional[list]:
+        """ Adds a word and its definition(s) to the lexicon. Returns its lexicon entry. """
+        return self.request("insert", word=word, definition=definition)
+
+    def search(self, word: str, strict: bool = True) -> Optional[list]:
+        """ Lexicon entry of a word: [index, word, definitions, timestamp], None if not in lexicon. """
+        return self.request("search", word=word, strict=strict)
+
+    def delete(self, word: str) -> bool:
+        """ Deletes a word from the lexicon. Returns False if it wasn't in it. """
+        return self.request("delete", word=word)
+
+# ===================================================================
+#                               MAIN
+# ===================================================================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sends a request to the dictionary server (see server.py).")
+    parser.add_argument("op", help="operation: define, define_many, suggest, multi_filters, multi_filters_batch, "
+                                   "match_patterns, add_word, insert, search, delete, ping, memory")
+    parser.add_argument("args", nargs="?", default="{}",
+                        help='arguments as a JSON object, e.g. \'{"word": "manga"}\' or \'{"length": 5}\'')
+    parser.add_argument("--socket", default=SOCKET_PATH, help="Unix socket path")
+    parser.add_argument("--tcp", action="store_true", help="connect to --host:--port instead of a Unix socket")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    args = parser.parse_args()
+
+    with Client(None if args.tcp else args.socket, args.host, args.port) as client:
+        print(json.dumps(client.request(args.op, **json.loads(args.args)), ensure_ascii=False, indent=2))
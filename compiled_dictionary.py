@@ -0,0 +1,635 @@
+import os
+import ast
+import mmap
+import zlib
+import struct
+import shutil
+import tempfile
+import argparse
+from array import array
+from collections.abc import Sequence
+from functools import lru_cache
+from typing import Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from fuzzy import MAX_DISTANCE, PREFIX_LENGTH, FuzzyIndex
+from word_index import WordIndex, deep_size, fold, register
+
+# ===================================================================
+#                            FILE FORMAT
+# ===================================================================
+# The compiled dictionary is a single binary file made of a header, a
+# table of sections and the sections themselves. Every section starts
+# on an 8 bytes boundary so that numpy arrays can be mapped directly
+# onto the file without any copy.
+#
+#   header   : magic (8s) | format version (u32) | words (u32) | sections (u32)
+#   table    : one (name (16s), offset (u64), size (u64)) entry per section
+#   sections : see below
+#
+# Sections:
+#   word_offsets : (words + 1) u32, offsets of each word in 'words'
+#   words        : UTF-8 words, sorted, each one followed by '\n'
+#   folded_offsets : (words + 1) u32, offsets of each normalized word in 'folded'
+#   folded       : normalized words (no accents, lower case, see 'word_index.fold()'), in the order of 'words',
+#                  each one followed by '\n'
+#   word_defs    : (words + 1) u32, index in 'def_offsets' of the first definition of each word
+#   def_offsets  : (definitions + 1) u64, offsets of each definition in the UTF-8 definitions
+#   definitions  : UTF-8 definitions, stored in the same order as the words, compressed by blocks if 'def_blocks'
+#                  is present
+#   def_params   : 1 u32, number of words whose definitions are compressed together (optional)
+#   def_blocks   : (blocks + 1) u64, offsets of each compressed block in 'definitions' (optional)
+#   fuzzy_params : 2 u32, largest edit distance and prefix length of the fuzzy index (see 'fuzzy.FuzzyIndex')
+#   fuzzy_keys   : u32, sorted hashes of the deletes of the beginnings of the normalized words
+#   fuzzy_offsets : (keys + 1) u32, offsets of the groups of each key in 'fuzzy_groups'
+#   fuzzy_groups : u32, groups (words sharing the same beginning) of each key
+#   fuzzy_group_offs : (groups + 1) u32, offsets of the rows of each group in 'fuzzy_rows'
+#   fuzzy_rows   : (words) u32, rows of the words, by group
+#
+# The definitions of the word at row i are the definitions word_defs[i]
+# to word_defs[i + 1] - 1: they are decoded without any parsing. When they
+# are compressed, the block i // block size is decompressed first (zlib),
+# the offsets then being relative to the first definition of the block.
+# The fuzzy sections are optional.
+CSV_PATH = "files/dico.csv"
+BIN_PATH = "files/dico.bin"
+
+MAGIC = b"FRDICO\x00\x00"
+FORMAT_VERSION = 5
+HEADER = struct.Struct("<8sIII4x")
+SECTION = struct.Struct("<16sQQ")
+ALIGNMENT = 8
+
+# Number of decoded definitions lists kept in memory by each dictionary
+DEFINITIONS_CACHE = 4096
+
+# Number of words whose definitions are compressed together: larger blocks compress better, but each lookup
+# decompresses a whole block
+DEFINITIONS_BLOCK = 32
+
+# Number of decompressed blocks kept in memory by each dictionary
+BLOCKS_CACHE = 64
+
+# Number of strings decoded at once when iterating over a 'PackedStrings'
+DECODE_CHUNK = 65536
+
+# ===================================================================
+#                              WRITER
+# ===================================================================
+class DictionaryWriter:
+    """ Writes a compiled dictionary file, one word at a time.
+
+    Words must be added in alphabetical order. The heaps are spooled to
+    temporary files while writing, so memory usage only depends on the
+    offset arrays, not on the size of the definitions. The fuzzy index is
+    the exception: it is built in memory when closing, from the first
+    letters of all the words (see 'fuzzy.FuzzyIndex').
+
+    Args:
+        path (str): Path of the compiled dictionary to write.
+        fuzzy_distance (int): Largest edit distance of the fuzzy index built with the dictionary, 0 not to build it.
+        block_size (int): Number of words whose definitions are compressed together, 0 not to compress them.
+    """
+
+    def __init__(self, path: str, fuzzy_distance: int = MAX_DISTANCE, block_size: int = DEFINITIONS_BLOCK):
+        self.path = path
+        self.fuzzy_distance = fuzzy_distance
+        self.block_size = block_size
+        self.count = 0
+        self._last_word = None
+        self._word_offsets = array("I", [0])
+        self._folded_offsets = array("I", [0])
+        self._word_defs = array("I", [0])
+        self._def_offsets = array("Q", [0])
+        self._block = bytearray() # Definitions of the current block, not compressed yet
+        self._def_blocks = array("Q", [0])
+        self._words = tempfile.TemporaryFile()
+        self._folded = tempfile.TemporaryFile()
+        self._definitions = tempfile.TemporaryFile()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self._words.close()
+            self._folded.close()
+            self._definitions.close()
+
+    def add(self, word: str, definitions: list):
+        """ Adds a word and its definitions at the end of the dictionary.
+
+        Args:
+            word (str): Word to add, must not be lower than the previous one.
+            definitions (list): Definitions of the word.
+        """
+
+        if "\n" in word:
+            raise ValueError(f"'{word}' contains a line break")
+
+        if self._last_word is not None and word < self._last_word:
+            raise ValueError(f"'{word}' added after '{self._last_word}' : words must be sorted")
+
+        self._last_word = word
+
+        self._word_offsets.append(self._word_offsets[-1] + self._words.write(word.encode() + b"\n"))
+        self._folded_offsets.append(self._folded_offsets[-1] + self._folded.write(fold(word).encode() + b"\n"))
+        for definition in definitions:
+            encoded = definition.encode()
+            if self.block_size:
+                self._block += encoded
+            else:
+                self._definitions.write(encoded)
+            self._def_offsets.append(self._def_offsets[-1] + len(encoded))
+        self._word_defs.append(len(self._def_offsets) - 1)
+        self.count += 1
+
+        if self.block_size and self.count % self.block_size == 0:
+            self._flush_block()
+
+    def _flush_block(self):
+        """ Compresses the definitions of the current block at the end of the definitions heap. """
+        self._def_blocks.append(self._def_blocks[-1] + self._definitions.write(zlib.compress(bytes(self._block))))
+        self._block.clear()
+
+    def close(self):
+        """ Assembles the header, the sections table and the sections into the final file. """
+
+        if self.block_size and self.count % self.block_size:
+            self._flush_block()
+
+        sections = [
+            ("word_offsets", self._word_offsets),
+            ("words", self._words),
+            ("folded_offsets", self._folded_offsets),
+            ("folded", self._folded),
+            ("word_defs", self._word_defs),
+            ("def_offsets", self._def_offsets),
+            ("definitions", self._definitions),
+        ]
+        if self.block_size:
+            sections += [
+                ("def_params", array("I", [self.block_size])),
+                ("def_blocks", self._def_blocks),
+            ]
+
+        # The fuzzy index is built in memory, once all the words are known: only their first letters are read back
+        if self.fuzzy_distance:
+            print("Fuzzy index building...")
+            self._folded.seek(0)
+            prefixes = [line[:-1].decode()[:PREFIX_LENGTH] for line in self._folded]
+            fuzzy = FuzzyIndex.build(prefixes, self.fuzzy_distance)
+            del prefixes
+            sections += [
+                ("fuzzy_params", array("I", [fuzzy.max_distance, fuzzy.prefix_length])),
+                ("fuzzy_keys", fuzzy.keys),
+                ("fuzzy_offsets", fuzzy.offsets),
+                ("fuzzy_groups", fuzzy.groups),
+                ("fuzzy_group_offs", fuzzy.group_offsets),
+                ("fuzzy_rows", fuzzy.rows),
+            ]
+
+        # The file is first written next to its final destination, then moved,
+        # so that processes currently mapping the old file are not disturbed.
+        # Its name is unique: two builds of the same file don't write into each other.
+        descriptor, tmp_path = tempfile.mkstemp(suffix=".tmp", dir=os.path.dirname(self.path) or ".")
+        try:
+            with os.fdopen(descriptor, "wb") as file:
+                position = _align(HEADER.size + SECTION.size * len(sections))
+                table = []
+                for name, content in sections:
+                    size = _size(content)
+                    table.append(SECTION.pack(name.encode(), position, size))
+                    position = _align(position + size)
+
+                file.write(HEADER.pack(MAGIC, FORMAT_VERSION, self.count, len(sections)))
+                file.write(b"".join(table))
+
+                for name, content in sections:
+                    file.write(b"\x00" * (_align(file.tell()) - file.tell()))
+                    if isinstance(content, array):
+                        file.write(_little_endian(content).tobytes())
+                    elif isinstance(content, np.ndarray):
+                        file.write(content.astype(content.dtype.newbyteorder("<")).tobytes())
+                    else:
+                        content.seek(0)
+                        shutil.copyfileobj(content, file)
+                        content.close()
+
+            # mkstemp creates the file readable by its owner only
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+def _align(position: int) -> int:
+    """ Returns the first position aligned on ALIGNMENT after 'position'. """
+    return -(-position // ALIGNMENT) * ALIGNMENT
+
+def _size(content) -> int:
+    """ Size in bytes of an offsets array or of a spooled heap. """
+    if isinstance(content, array):
+        return len(content) * content.itemsize
+    if isinstance(content, np.ndarray):
+        return content.nbytes
+    return content.seek(0, os.SEEK_END)
+
+def _little_endian(content: array) -> array:
+    """ Offsets are always stored little-endian, whatever the platform. """
+    if np.little_endian:
+        return content
+    content = array(content.typecode, content)
+    content.byteswap()
+    return content
+
+def compile_dictionary(source: str = CSV_PATH, target: str = BIN_PATH, fuzzy_distance: int = MAX_DISTANCE,
+                       block_size: int = DEFINITIONS_BLOCK) -> str:
+    """ Converts the .csv dictionary into a compiled dictionary file.
+
+    The words are sorted, the rows without definition are removed and the
+    definitions are parsed once and for all, so that neither loading the
+    dictionary nor looking up a word requires any parsing. The definitions
+    are compressed by blocks of words, and the fuzzy index of the words is
+    built too (see 'fuzzy.FuzzyIndex').
+
+    Args:
+        source (str): Path of the .csv dictionary.
+        target (str): Path of the compiled dictionary to write.
+        fuzzy_distance (int): Largest edit distance of the fuzzy index, 0 not to build it.
+        block_size (int): Number of words whose definitions are compressed together, 0 not to compress them.
+
+    Returns:
+        (str): Path of the compiled dictionary.
+    """
+
+    print("Dictionary compilation...")
+    df = pd.read_csv(source)
+    df = df.sort_values("Mot")
+    df = df.dropna()
+
+    with DictionaryWriter(target, fuzzy_distance, block_size) as writer:
+        for word, definitions in zip(df["Mot"], df["Définitions"]):
+            writer.add(word, ast.literal_eval(definitions))
+
+    print(f"{writer.count} words compiled in '{target}'")
+    return target
+
+# ===================================================================
+#                              READER
+# ===================================================================
+class PackedStrings(Sequence):
+    """ Read-only sequence of the strings of a section ('words', 'folded'), decoded on access.
+
+    The strings stay in the mapping of the file: the sequence holds no
+    Python object per string, only a view on their offsets. Iterating
+    decodes the strings by chunks, so that the whole column is never held
+    in memory at once.
+
+    Args:
+        buffer (mmap.mmap): Mapping of the compiled dictionary.
+        start (int): Position of the section in the mapping.
+        offsets (numpy.ndarray): (strings + 1) offsets of each string in the section, each string being followed by
+        '\n'.
+    """
+
+    def __init__(self, buffer: mmap.mmap, start: int, offsets: np.ndarray):
+        self._buffer = buffer
+        self._start = start
+        self._offsets = offsets
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            start, stop, step = idx.indices(len(self))
+            if step != 1:
+                return [self[i] for i in range(start, stop, step)]
+            return self._decode(start, max(start, stop))
+
+        idx = int(idx)
+        if idx < 0:
+            idx += len(self)
+        if not 0 <= idx < len(self):
+            raise IndexError("string index out of range")
+        start = self._start + int(self._offsets[idx])
+        end = self._start + int(self._offsets[idx + 1]) - 1 # without the '\n'
+        return self._buffer[start:end].decode()
+
+    def __iter__(self):
+        for start in range(0, len(self), DECODE_CHUNK):
+            yield from self._decode(start, min(start + DECODE_CHUNK, len(self)))
+
+    def _decode(self, start: int, stop: int) -> list:
+        """ Strings from 'start' to 'stop' (excluded), decoded in a single call. """
+        if start == stop:
+            return []
+        begin, end = self._start + int(self._offsets[start]), self._start + int(self._offsets[stop])
+        return self._buffer[begin:end].decode().split("\n")[:-1]
+
+    def take(self, rows: Sequence[int]) -> list:
+        """ Strings of some rows, decoded in a single call (without the bounds checks of an access by row). """
+        if not len(rows):
+            return []
+        rows = np.asarray(rows)
+        begins = (self._offsets[rows].astype(np.int64) + self._start).tolist()
+        ends = (self._offsets[rows + 1].astype(np.int64) + self._start).tolist()
+        buffer = self._buffer
+        return b"".join([buffer[begin:end] for begin, end in zip(begins, ends)]).decode().split("\n")[:-1]
+
+    def tolist(self) -> list:
+        """ All the strings, as a list. """
+        return self._decode(0, len(self))
+
+class CompiledDictionary:
+    """ Read-only dictionary memory-mapped from a compiled dictionary file.
+
+    Nothing is parsed when the file is opened: the offset arrays are numpy
+    views on the mapping and the words are decoded on demand. The pages of
+    the file are shared between all the processes that open it, and the
+    memory used by each process can be checked with 'memory_usage()'.
+
+    Args:
+        path (str): Path of the compiled dictionary.
+    """
+
+    def __init__(self, path: str = BIN_PATH):
+        self.path = path
+
+        with open(path, "rb") as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, count, sections = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            raise ValueError(f"'{path}' is not a compiled dictionary")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"'{path}' format version is {version}, {FORMAT_VERSION} expected")
+
+        self.version = version
+        self._count = count
+        self._sections = {}
+        for idx in range(sections):
+            name, offset, size = SECTION.unpack_from(self._mmap, HEADER.size + idx * SECTION.size)
+            self._sections[name.rstrip(b"\x00").decode()] = (offset, size)
+
+        self._word_offsets = self._array("word_offsets", "<u4")
+        self._words_start = self._sections["words"][0]
+        self._word_defs = self._array("word_defs", "<u4")
+        self._def_offsets = self._array("def_offsets", "<u8")
+        self._definitions_start = self._sections["definitions"][0]
+        self._dataframes = {} # Dataframe views, with or without their definitions
+        self._word_index = None
+
+        # Definitions compressed by blocks of words
+        self._block_size = 0
+        if "def_blocks" in self._sections:
+            self._block_size = int(self._array("def_params", "<u4")[0])
+            self._def_blocks = self._array("def_blocks", "<u8")
+
+        # Hot words are decoded only once
+        self._cached_definitions = lru_cache(maxsize=DEFINITIONS_CACHE)(self._decode_definitions)
+        self._cached_block = lru_cache(maxsize=BLOCKS_CACHE)(self._decompress_block)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, idx: int) -> str:
+        return self.word(idx)
+
+    def _array(self, name: str, dtype: str) -> np.ndarray:
+        """ Numpy view on a section of the file. """
+        offset, size = self._sections[name]
+        dtype = np.dtype(dtype)
+        return np.frombuffer(self._mmap, dtype=dtype, count=size // dtype.itemsize, offset=offset)
+
+    def _word_bytes(self, idx: int) -> bytes:
+        start = self._words_start + int(self._word_offsets[idx])
+        end = self._words_start + int(self._word_offsets[idx + 1]) - 1 # without the '\n'
+        return self._mmap[start:end]
+
+    def word(self, idx: int) -> str:
+        """ Word stored at the given row. """
+        return self._word_bytes(idx).decode()
+
+    @property
+    def words(self) -> PackedStrings:
+        """ All the words of the dictionary, in alphabetical order, decoded on access. """
+        return PackedStrings(self._mmap, self._words_start, self._word_offsets)
+
+    @property
+    def folded(self) -> PackedStrings:
+        """ Normalized form of all the words (no accents, lower case), computed at compile time. """
+        return PackedStrings(self._mmap, self._sections["folded"][0], self._array("folded_offsets", "<u4"))
+
+    def definitions(self, idx: int) -> list:
+        """ Definitions of the word stored at the given row.
+
+        Only the definitions of this word are decoded, and the most recently
+        requested ones are kept in a cache.
+        """
+        return list(self._cached_definitions(idx))
+
+    def _decode_definitions(self, idx: int) -> tuple:
+        first, last = int(self._word_defs[idx]), int(self._word_defs[idx + 1])
+        offsets = self._def_offsets[first:last + 1].tolist()
+
+        if self._block_size:
+            block = idx // self._block_size
+            buffer = self._cached_block(block)
+            start = -int(self._def_offsets[self._word_defs[block * self._block_size]])
+        else:
+            buffer = self._mmap
+            start = self._definitions_start
+        return tuple(buffer[start + offsets[i]:start + offsets[i + 1]].decode() for i in range(last - first))
+
+    def _decompress_block(self, block: int) -> bytes:
+        start = self._definitions_start + int(self._def_blocks[block])
+        end = self._definitions_start + int(self._def_blocks[block + 1])
+        return zlib.decompress(self._mmap[start:end])
+
+    def find(self, word: str) -> int:
+        """ Row of the first occurrence of a word, found by binary search.
+
+        Args:
+            word (str): Word to search, exactly as stored.
+
+        Returns:
+            (int): Row of the word, -1 if the word isn't in the dictionary.
+        """
+
+        target = word.encode()
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            if self._word_bytes(middle) < target:
+                low = middle + 1
+            else:
+                high = middle
+
+        if low < self._count and self._word_bytes(low) == target:
+            return low
+        return -1
+
+    def fuzzy_index(self) -> Optional[FuzzyIndex]:
+        """ Fuzzy index stored in the file, mapped without any copy. None if the dictionary was compiled without. """
+
+        if "fuzzy_keys" not in self._sections:
+            return None
+        max_distance, prefix_length = self._array("fuzzy_params", "<u4").tolist()
+        return FuzzyIndex(self._array("fuzzy_keys", "<u4"), self._array("fuzzy_offsets", "<u4"),
+                          self._array("fuzzy_groups", "<u4"), self._array("fuzzy_group_offs", "<u4"),
+                          self._array("fuzzy_rows", "<u4"), max_distance, prefix_length)
+
+    def word_index(self) -> WordIndex:
+        """ Word index of the dictionary, built on the first call. """
+
+        if self._word_index is None:
+            self._word_index = WordIndex(self.words, folded=self.folded, fuzzy=self.fuzzy_index(), ordered=True)
+        return self._word_index
+
+    def to_dataframe(self, definitions: bool = True) -> pd.DataFrame:
+        """ Pandas dataframe view of the dictionary, with a 'Mot' and a 'Définitions' column.
+
+        The dataframe is built on the first call only, the following calls return the same object.
+        It shares the word index of the dictionary.
+
+        Args:
+            definitions (bool): False for a dataframe with the 'Mot' column only. Decoding all the definitions
+            takes most of the memory of the dataframe, whereas the filters only need the words.
+        """
+
+        if definitions not in self._dataframes:
+            if not definitions:
+                dataframe = pd.DataFrame({"Mot": self.words.tolist()})
+            else:
+                # The words are shared with the dataframe without definitions
+                dataframe = self.to_dataframe(definitions=False).assign(
+                    Définitions=[list(self._decode_definitions(idx)) for idx in range(self._count)])
+            register(dataframe, "Mot", self.word_index())
+            self._dataframes[definitions] = dataframe
+        return self._dataframes[definitions]
+
+    def memory_usage(self) -> dict:
+        """ Memory used by the dictionary, in bytes.
+
+        Returns:
+            (dict):
+                "mapped": size of the file, mapped and shared between all the processes using it (only the pages
+                read are actually loaded), by section.
+                "private": memory held by this process: the structures of the word index built so far, the columns
+                of the dataframe views, and the cached definitions and decompressed blocks (estimated).
+                "total": total of the private memory.
+        """
+
+        # The words shared by the index and the dataframes are counted once
+        seen = set()
+        private = {}
+        if self._word_index is not None:
+            private.update({f"index.{name}": size for name, size in self._word_index.memory_usage(seen).items()})
+        for dataframe in self._dataframes.values():
+            for column in dataframe.columns:
+                private[f"dataframe.{column}"] = (private.get(f"dataframe.{column}", 0)
+                                                  + deep_size(dataframe[column].to_numpy(), seen))
+
+        cached_definitions = self._cached_definitions.cache_info().currsize
+        cached_blocks = self._cached_block.cache_info().currsize
+        # The caches can't be inspected: their size is estimated from an average entry
+        private["definitions_cache"] = cached_definitions * deep_size(self._decode_definitions(0)) if len(self) else 0
+        private["blocks_cache"] = cached_blocks * (deep_size(self._decompress_block(0)) if self._block_size else 0)
+
+        return {
+            "mapped": {name: size for name, (_, size) in self._sections.items()},
+            "private": private,
+            "total": sum(private.values()),
+        }
+
+@lru_cache(maxsize=DEFINITIONS_CACHE)
+def _literal_definitions(value: str) -> tuple:
+    return tuple(ast.literal_eval(value))
+
+def parse_definitions(value: Union[str, list]) -> list:
+    """ Definitions list of a dataframe cell.
+
+    The dataframe view of the compiled dictionary stores lists, whereas a
+    dataframe read from the .csv dictionary stores strings representing
+    lists, which are parsed with `ast.literal_eval` (and cached).
+
+    Args:
+        value (str or list): Content of the definitions cell.
+    """
+
+    if isinstance(value, str):
+        return list(_literal_definitions(value))
+    return list(value)
+
+# ===================================================================
+#                              LOADING
+# ===================================================================
+_loaded = {}
+
+def load_dictionary(path: str = BIN_PATH, source: Optional[str] = CSV_PATH) -> CompiledDictionary:
+    """ Opens a compiled dictionary, compiling it first if needed.
+
+    The dictionary is opened once per process: the modules loading the
+    same path share the same object.
+
+    Args:
+        path (str): Path of the compiled dictionary.
+        source (str): Path of the .csv dictionary used to (re)compile the file when it is
+        missing or outdated. Can be set at None to disable the compilation.
+
+    Returns:
+        (CompiledDictionary): The opened dictionary.
+    """
+
+    key = os.path.abspath(path)
+    if key in _loaded:
+        return _loaded[key]
+
+    if source is not None and os.path.exists(source) and _needs_compilation(path, source):
+        compile_dictionary(source, path)
+
+    _loaded[key] = CompiledDictionary(path)
+    return _loaded[key]
+
+def _needs_compilation(path: str, source: str) -> bool:
+    """ The compiled file is missing, older than its source or in an older format. """
+
+    if not os.path.exists(path) or os.path.getmtime(path) < os.path.getmtime(source):
+        return True
+
+    with open(path, "rb") as file:
+        magic, version, _, _ = HEADER.unpack(file.read(HEADER.size))
+    return magic != MAGIC or version != FORMAT_VERSION
+
+# ===================================================================
+#                               MAIN
+# ===================================================================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compiles the .csv dictionary into a memory-mappable file.")
+    parser.add_argument("source", nargs="?", default=CSV_PATH, help=".csv dictionary")
+    parser.add_argument("target", nargs="?", default=BIN_PATH, help="compiled dictionary")
+    parser.add_argument("--fuzzy-distance", type=int, default=MAX_DISTANCE,
+                        help="largest edit distance of the fuzzy index, 0 not to build it")
+    parser.add_argument("--block-size", type=int, default=DEFINITIONS_BLOCK,
+                        help="number of words whose definitions are compressed together, 0 not to compress them")
+    parser.add_argument("--memory", action="store_true",
+                        help="print the memory used by the compiled dictionary and its word index instead of compiling")
+    args = parser.parse_args()
+
+    if args.memory:
+        dictionary = CompiledDictionary(args.target)
+        usage = dictionary.memory_usage()
+        print(f"Mapped (shared) : {sum(usage['mapped'].values()) / 2 ** 20:.1f} MiB")
+        for name, size in usage["mapped"].items():
+            print(f"    {name:<18}{size / 2 ** 20:>10.1f} MiB")
+        print(f"Private : {usage['total'] / 2 ** 20:.1f} MiB")
+        for name, size in usage["private"].items():
+            print(f"    {name:<18}{size / 2 ** 20:>10.1f} MiB")
+    else:
+        compile_dictionary(args.source, args.target, args.fuzzy_distance, args.block_size)
@@ -0,0 +1,101 @@
+import os
+import importlib
+from collections import Counter
+
+import pytest
+from openpyxl import Workbook
+
+from benchmark import generate_dictionary
+from compiled_dictionary import BIN_PATH
+from lexicon_store import LEXICON_PATH
+from word_index import fold
+
+# ===================================================================
+#                             SETTINGS
+# ===================================================================
+DICTIONARY_SIZE = 3000
+
+# ===================================================================
+#                             REFERENCE
+# ===================================================================
+def reference(words: list, no_comp: bool = True, length=None, start_with=None, end_with=None, nth_letters=None,
+              contains=None, not_contain=None, accent_insensitive: bool = False) -> list:
+    """ Positions of the words matching the filters, checked one word at a time as documented in 'multi_filters()'. """
+
+    def letters(text: str) -> str:
+        return fold(text) if accent_insensitive else text
+
+    # The letters of a list once each, a dict gives their number of occurrences
+    required = Counter()
+    for letter, count in ({letter: 1 for letter in contains} if isinstance(contains, list) else contains or {}).items():
+        required[letters(letter)] = max(required[letters(letter)], count)
+
+    found = []
+    for position, word in enumerate(words):
+        written = letters(word)
+        if no_comp and ("-" in word or any(char.isspace() for char in word)):
+            continue
+        if length is not None and len(word) != length:
+            continue
+        if start_with is not None and not written.startswith(fold(start_with) if accent_insensitive
+                                                             else start_with.capitalize()):
+            continue
+        if end_with is not None and not written.endswith(letters(end_with)):
+            continue
+        # Ranks start at 1
+        if nth_letters and not all(len(written) >= rank and written[rank - 1] == letters(letter)
+                                   for rank, letter in nth_letters):
+            continue
+        # Each letter as many times as required
+        if not all(written.count(letter) >= count for letter, count in required.items()):
+            continue
+        # None of the letters
+        if not_contain and any(letters(letter) in written for letter in not_contain):
+            continue
+        found.append(position)
+    return found
+
+# ===================================================================
+#                             FIXTURES
+# ===================================================================
+@pytest.fixture(scope="session")
+def dictionary_directory(tmp_path_factory):
+    """ Directory holding the synthetic dictionary in 'files/dico.bin' and an empty 'files/lexi.xlsx', where the
+    modules loading them when imported are imported from. """
+
+    directory = tmp_path_factory.mktemp("dictionary")
+    os.makedirs(directory / "files")
+    generate_dictionary(DICTIONARY_SIZE, str(directory / BIN_PATH), seed=1)
+
+    workbook = Workbook()
+    workbook.active.append(["Mot", "Definitions", "Timestamp"])
+    workbook.save(directory / LEXICON_PATH)
+    return directory
+
+def import_from(directory, name: str):
+    """ Imports a module from a directory, for the files it loads when imported. """
+
+    previous = os.getcwd()
+    os.chdir(directory)
+    try:
+        return importlib.import_module(name)
+    finally:
+        os.chdir(previous)
+
+@pytest.fixture(scope="session")
+def modules(dictionary_directory):
+    """ Synthetic dictionary, and the modules loading it when imported. """
+
+    multi_filters = import_from(dictionary_directory, "multi_filters")
+    dictionary = import_from(dictionary_directory, "dictionary")
+    return multi_filters.dico, multi_filters, dictionary
+
+@pytest.fixture(scope="session")
+def lexicon(dictionary_directory):
+    """ Lexicon functions, on the synthetic dictionary. The tests pass their own lexicon to them. """
+    return import_from(dictionary_directory, "lexicon")
+
+@pytest.fixture(scope="session")
+def dataframe(modules):
+    dico, _, _ = modules
+    return dico.to_dataframe(definitions=False)
@@ -1,29 +1,45 @@
-import ast
-from typing import Optional
+from typing import Iterable, Optional, Union
 
+import numpy as np
 import pandas as pd
 
+from compiled_dictionary import CompiledDictionary, load_dictionary, parse_definitions
+from fuzzy import MAX_DISTANCE
+from word_index import get_index
+
 # ===================================================================
-#                         DATAFRAME CREATION
+#                         DICTIONARY LOADING
 # ===================================================================
-print("Main dataframe creation...")
-df = pd.read_csv("files/dico.csv") # Dataframe creation
-df = df.sort_values('Mot') # Alphabetic order
-df = df.dropna() # Remove missing data
-df = df.reset_index()
+print("Dictionary loading...")
+dico = load_dictionary() # Memory-mapped, already sorted and cleaned
+
+def __getattr__(name):
+    # The dataframe view ('df') is only built when it is actually used
+    if name == "df":
+        return dico.to_dataframe()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # ===================================================================
-#                             FUNCTION
+#                             FUNCTIONS
 # ===================================================================
-def define(dataframe: pd.DataFrame, word_column_name: str, definition_column_name: str, word: str) -> Optional[list]:
+def define(dataframe: Union[pd.DataFrame, CompiledDictionary], word_column_name: str, definition_column_name: str,
+           word: str, fuzzy: int = 0, strict: bool = True) -> Optional[list]:
     """
     Displays the definition of a word in the word dictionary.
 
+    The word is found through an index built once per dictionary: a binary search in the compiled dictionary, or a
+    hash index over the word column of a dataframe. With 'strict' set to False, a word not found as written is looked
+    up regardless of case and accents ("ETRE", "etre" -> "Être") in a hash index of the normalized words.
+
     Args:
-        dataframe (pandas.DataFrame): Pandas dataframe with a word column and a definition column.
+        dataframe (pandas.DataFrame or CompiledDictionary): Pandas dataframe with a word column and a definition
+        column, or the compiled dictionary.
         word_column_name (str): Name of the column containing the words.
         definition_column_name (str): Name of column containing definitions.
         word (str): Word to search.
+        fuzzy (int): If the word is not in the dictionary, largest edit distance of the words suggested instead
+        (see 'suggest()'): the definitions of the closest one are returned. 0 to disable.
+        strict (bool): False to find the word regardless of case and accents.
 
     Returns:
         (list): List containing the definition(s) of the word searched for.
@@ -33,27 +49,117 @@ def define(dataframe: pd.DataFrame, word_column_name: str, definition_column_nam
 
     word = word.capitalize()
 
-    definition = dataframe.loc[df[word_column_name] == word][definition_column_name]
+    if isinstance(dataframe, CompiledDictionary):
+        row = dataframe.find(word)
+    else:
+        row = get_index(dataframe, word_column_name).position(word)
+
+    # Same word, other case or accents
+    if row < 0 and not strict:
+        index = get_index(dataframe, word_column_name)
+        row = index.position(word, strict=False)
+        if row >= 0:
+            print(f"'{word}' found as '{index.words[row]}'")
 
     # WORD NOT FOUND
-    if len(definition) == 0:
+    if row < 0:
         print(f"'{word}' not in dictionary")
-        return None
+        if not fuzzy:
+            return None
+
+        index = get_index(dataframe, word_column_name)
+        similar = index.similar(word, fuzzy, limit=10)
+        if not similar:
+            return None
+
+        row = similar[0][0]
+        print(f"Did you mean : {', '.join(index.words[other] for other, _ in similar)} ?")
+        print(f"Definitions of '{index.words[row]}'")
 
     # WORD FOUND
-    # Definitions in the dataframe are stored as strings representing lists. To convert these strings into usable
-    # `list` objects, we use `ast.literal_eval`, a more secure method than `eval` as it only evaluates Python literals
-    # (lists, dictionaries, etc.), without executing arbitrary code.
-    else:
-        definition = ast.literal_eval(definition.values[0])
+    return _definitions(dataframe, definition_column_name, row)
+
+def define_many(dataframe: Union[pd.DataFrame, CompiledDictionary], word_column_name: str,
+                definition_column_name: str, words: Iterable[str], strict: bool = True) -> dict:
+    """
+    Retrieves the definitions of several words at once.
+
+    All the words are resolved at once by vectorized lookups in the word index (a bisection of all of them together
+    in the compiled dictionary), which is much faster than calling `define()` for each word.
+
+    Args:
+        dataframe (pandas.DataFrame or CompiledDictionary): Pandas dataframe with a word column and a definition
+        column, or the compiled dictionary.
+        word_column_name (str): Name of the column containing the words.
+        definition_column_name (str): Name of column containing definitions.
+        words (Iterable[str]): Words to search.
+        strict (bool): False to find the words not found as written regardless of case and accents (see 'define()').
+
+    Returns:
+        (dict): Definitions list of each word searched for, None for the words not in the dictionary.
+    """
+
+    words = list(dict.fromkeys(words)) # remove duplicates, keep order
+    index = get_index(dataframe, word_column_name)
+    rows = index.positions([word.capitalize() for word in words])
 
-    return definition
+    if not strict:
+        rows = np.array([row if row >= 0 else index.position(word, strict=False)
+                         for word, row in zip(words, rows.tolist())], dtype=np.int64)
+
+    return {word: _definitions(dataframe, definition_column_name, row) if row >= 0 else None
+            for word, row in zip(words, rows.tolist())}
+
+def suggest(dataframe: Union[pd.DataFrame, CompiledDictionary], word_column_name: str, word: str,
+            max_distance: int = MAX_DISTANCE, limit: Optional[int] = 10) -> list:
+    """
+    Words of the dictionary close to a word, such as the words a misspelled word was meant to be ("did you mean").
+
+    The edit distance (insertions, deletions, substitutions, transpositions) is computed between the words without
+    accents nor case, so that "ete" finds "Été" at distance 0. The candidates are found through a deletes index:
+    stored in the compiled dictionary, or built once over the word column of a dataframe.
+
+    Args:
+        dataframe (pandas.DataFrame or CompiledDictionary): Pandas dataframe with a word column, or the compiled
+        dictionary.
+        word_column_name (str): Name of the column containing the words.
+        word (str): Word to search.
+        max_distance (int): Largest edit distance, up to the one of the fuzzy index (2 by default).
+        limit (int): Maximum number of words returned, None for all of them.
+
+    Returns:
+        (list): (word, distance) of the closest words, the closest first.
+    """
+
+    index = get_index(dataframe, word_column_name)
+    similar = index.similar(word, max_distance, limit)
+    return [(index.words[row], distance) for row, distance in similar]
+
+def _definitions(dataframe: Union[pd.DataFrame, CompiledDictionary], definition_column_name: str, row: int) -> list:
+    """ Definitions list stored at a given row (position) of the dictionary. """
+
+    # The compiled dictionary stores the definitions already parsed, only the requested word is decoded
+    if isinstance(dataframe, CompiledDictionary):
+        return dataframe.definitions(row)
+
+    return parse_definitions(dataframe[definition_column_name].iat[row])
 
 # ===================================================================
 #                              MAIN
 # ===================================================================
 if __name__ == "__main__":
+    df = dico.to_dataframe()
     word_to_define = "hallali"
     word_definition = define(df, "Mot", "Définitions", word_to_define)
     print(f"{word_to_define}:")
-    print(word_definition)
\ No newline at end of file
+    print(word_definition)
+
+    # Several words at once
+    print(define_many(dico, "Mot", "Définitions", ["manga", "hallali", "rompicher"]))
+
+    # Regardless of case and accents
+    print(define(dico, "Mot", "Définitions", "ETRE", strict=False))
+
+    # Misspelled word
+    print(define(dico, "Mot", "Définitions", "halali", fuzzy=2))
+    print(suggest(dico, "Mot", "ete"))
\ No newline at end of file
@@ -0,0 +1,211 @@
+from zlib import crc32
+from array import array
+from typing import Optional, Sequence
+
+import numpy as np
+
+# ===================================================================
+#                             SETTINGS
+# ===================================================================
+# Largest edit distance the index can answer
+MAX_DISTANCE = 2
+
+# Only the deletes of the first letters of the words are indexed: the index
+# stays small, and the candidates are checked against the whole words. 8
+# letters rather than 7 make the index 1.7 times larger, but leave about 5
+# times fewer candidates to check by lookup.
+PREFIX_LENGTH = 8
+
+# ===================================================================
+#                           EDIT DISTANCE
+# ===================================================================
+def edit_distance(a: str, b: str, max_distance: int) -> int:
+    """ Number of insertions, deletions, substitutions and transpositions of two adjacent letters turning 'a'
+    into 'b' (optimal string alignment distance).
+
+    The letters shared by the beginnings and the ends of the words are
+    skipped, then the columns of the distance matrix are computed as bit
+    vectors, one letter of 'b' at a time (Hyyrö's bit-parallel algorithm):
+    a handful of integer operations per letter instead of one cell at a
+    time. The computation stops as soon as the distance can no longer come
+    back within 'max_distance'.
+
+    Returns:
+        (int): Distance, max_distance + 1 if it is greater than max_distance.
+    """
+
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    if a == b:
+        return 0
+
+    # Common beginning and end
+    start = 0
+    shortest = min(len(a), len(b))
+    while start < shortest and a[start] == b[start]:
+        start += 1
+    end = 0
+    while end < shortest - start and a[-1 - end] == b[-1 - end]:
+        end += 1
+    a, b = a[start:len(a) - end], b[start:len(b) - end]
+    if not a or not b:
+        return min(max(len(a), len(b)), max_distance + 1)
+
+    # Positions of each letter in 'a', as bits
+    matches = {}
+    for position, letter in enumerate(a):
+        matches[letter] = matches.get(letter, 0) | 1 << position
+    last = 1 << (len(a) - 1)
+
+    # Vertical positive and negative differences of the current column, diagonal zeros of the previous one. The
+    # bits above the length of 'a' are never read, and never carry into the lower ones: they are left unmasked.
+    positive, negative, zeros, previous_match = (1 << len(a)) - 1, 0, 0, 0
+    distance = len(a)
+    unreachable = max_distance + len(b) # The distance decreases by 1 at most per remaining letter of 'b'
+    for column, letter in enumerate(b, 1):
+        match = matches.get(letter, 0)
+        zeros = ((((match & positive) + positive) ^ positive) | match | negative
+                 | ((~zeros & match) << 1) & previous_match)
+        horizontal_positive = negative | ~(zeros | positive)
+        horizontal_negative = zeros & positive
+        if horizontal_positive & last:
+            distance += 1
+        elif horizontal_negative & last:
+            distance -= 1
+        if distance + column > unreachable:
+            return max_distance + 1
+        horizontal_positive = horizontal_positive << 1 | 1
+        positive = horizontal_negative << 1 | ~(zeros | horizontal_positive)
+        negative = zeros & horizontal_positive
+        previous_match = match
+
+    return min(distance, max_distance + 1)
+
+def distance_bounds(word: str, candidates: Sequence[str]) -> np.ndarray:
+    """ Lower bound of the edit distance between a word and each candidate, computed for all of them at once.
+
+    An edit changes the letter counts of a word by 2 at most (a substitution)
+    and its length by 1 at most, so the distance is at least half the sum of
+    the differences between the letter counts, and at least the difference
+    between the lengths. Much cheaper than 'edit_distance()', it rejects most
+    of the candidates of a lookup beforehand.
+    """
+
+    if not candidates:
+        return np.empty(0, dtype=np.int64)
+
+    # numpy fixed-width unicode strings are UCS-4: viewed as uint32, they are the code points (padded with 0)
+    width = max(1, max(map(len, candidates)))
+    matrix = np.array(candidates, dtype=f"U{width}").view(np.uint32).reshape(len(candidates), width)
+    lengths = np.count_nonzero(matrix, axis=1)
+
+    letters, counts = np.unique(np.array(list(word), dtype="U1").view(np.uint32), return_counts=True)
+    found = (matrix[:, :, None] == letters).sum(axis=1) # Occurrences of each letter of the word in the candidates
+    differences = np.abs(found - counts).sum(axis=1) + lengths - found.sum(axis=1)
+    return np.maximum(np.abs(lengths - len(word)), (differences + 1) // 2)
+
+def deletes(word: str, max_distance: int) -> set:
+    """ The word and all the strings obtained by deleting up to 'max_distance' of its letters. """
+
+    variants = {word}
+    edge = {word}
+    for _ in range(max_distance):
+        edge = {variant[:idx] + variant[idx + 1:] for variant in edge for idx in range(len(variant))}
+        variants |= edge
+    return variants
+
+def _hashes(variants) -> list:
+    return [crc32(variant.encode()) for variant in variants]
+
+# ===================================================================
+#                           FUZZY INDEX
+# ===================================================================
+class FuzzyIndex:
+    """ Deletes index (SymSpell) giving the words close to a misspelled one.
+
+    Two words within an edit distance k share a string obtained by deleting
+    up to k letters from each of them. The variants of the beginnings of the
+    words (see PREFIX_LENGTH) are stored as hashes, each one along with the
+    beginnings it comes from, the words being grouped by beginning: a lookup
+    only generates the variants of the searched word and reads the words of
+    their groups. The candidates are then checked with 'edit_distance()'.
+
+    The arrays can be mapped from a compiled dictionary (see 'build()').
+
+    Args:
+        keys (numpy.ndarray): Sorted distinct hashes of the variants.
+        offsets (numpy.ndarray): Groups of the variant keys[i] are groups[offsets[i]:offsets[i + 1]].
+        groups (numpy.ndarray): Groups of the words of each variant.
+        group_offsets (numpy.ndarray): Rows of the group g are rows[group_offsets[g]:group_offsets[g + 1]].
+        rows (numpy.ndarray): Rows of the words, by group.
+        max_distance (int): Largest edit distance indexed.
+        prefix_length (int): Number of letters of the words indexed.
+    """
+
+    def __init__(self, keys: np.ndarray, offsets: np.ndarray, groups: np.ndarray, group_offsets: np.ndarray,
+                 rows: np.ndarray, max_distance: int = MAX_DISTANCE, prefix_length: int = PREFIX_LENGTH):
+        self.keys = keys
+        self.offsets = offsets
+        self.groups = groups
+        self.group_offsets = group_offsets
+        self.rows = rows
+        self.max_distance = max_distance
+        self.prefix_length = prefix_length
+
+    @classmethod
+    def build(cls, words: Sequence[str], max_distance: int = MAX_DISTANCE,
+              prefix_length: int = PREFIX_LENGTH) -> "FuzzyIndex":
+        """ Builds the index of a column of words (normalized forms, see 'word_index.fold()'). """
+
+        # Words grouped by beginning
+        prefixes = np.empty(len(words), dtype=object)
+        prefixes[:] = [word[:prefix_length] for word in words]
+        unique, inverse = np.unique(prefixes, return_inverse=True)
+        rows = np.argsort(inverse, kind="stable").astype(np.uint32)
+        group_offsets = np.searchsorted(inverse[rows], np.arange(len(unique) + 1)).astype(np.uint32)
+
+        # Variants of each beginning
+        hashes = array("I")
+        groups = array("I")
+        for group, prefix in enumerate(unique.tolist()):
+            prefix_hashes = _hashes(deletes(prefix, max_distance))
+            hashes.extend(prefix_hashes)
+            groups.extend([group] * len(prefix_hashes))
+
+        # Sorted by (hash, group) in place, as single 64-bit values: no permutation array is allocated
+        entries = np.frombuffer(hashes, dtype=np.uint32).astype(np.uint64) << np.uint64(32)
+        del hashes
+        entries |= np.frombuffer(groups, dtype=np.uint32)
+        del groups
+        entries.sort()
+        hashes = (entries >> np.uint64(32)).astype(np.uint32)
+        groups = entries.astype(np.uint32) # Low 32 bits
+        del entries
+        starts = np.flatnonzero(np.concatenate(([len(hashes) > 0], hashes[1:] != hashes[:-1])))
+        offsets = np.append(starts, len(hashes)).astype(np.uint32)
+        return cls(hashes[starts], offsets, groups, group_offsets, rows, max_distance, prefix_length)
+
+    def candidates(self, word: str, max_distance: Optional[int] = None) -> np.ndarray:
+        """ Sorted rows of the words which may be within 'max_distance' of a word (normalized form). """
+
+        max_distance = self.max_distance if max_distance is None else min(max_distance, self.max_distance)
+        hashes = np.array(_hashes(deletes(word[:self.prefix_length], max_distance)), dtype=np.uint32)
+
+        if not len(self.keys):
+            return np.empty(0, dtype=np.int64)
+
+        found = np.minimum(np.searchsorted(self.keys, hashes), len(self.keys) - 1)
+        found = found[self.keys[found] == hashes]
+        if not len(found):
+            return np.empty(0, dtype=np.int64)
+
+        groups = np.unique(_ranges(self.groups, self.offsets[found], self.offsets[found + 1]))
+        return np.sort(_ranges(self.rows, self.group_offsets[groups], self.group_offsets[groups + 1]))
+
+def _ranges(values: np.ndarray, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """ The slices values[starts[i]:ends[i]] put end to end, gathered in a single indexing. """
+
+    starts = starts.astype(np.int64)
+    lengths = ends.astype(np.int64) - starts
+    # Position of each value: the start of its slice, plus its rank in the slice
+    return values[np.repeat(starts - (np.cumsum(lengths) - lengths), lengths) + np.arange(lengths.sum())]
@@ -0,0 +1,206 @@
+import io
+import json
+import math
+import threading
+from time import time
+from contextlib import contextmanager
+from typing import Callable, Optional, Union
+
+# ===================================================================
+#                               SINKS
+# ===================================================================
+# Functions receiving the events. The tuple is replaced, never modified, so
+# that it can be read without a lock; while it is empty, the instrumented
+# functions don't measure anything.
+sinks = ()
+_sinks_lock = threading.Lock()
+
+def add_sink(sink: Callable[[dict], None]) -> Callable[[dict], None]:
+    """ Sends the events to a sink: any function taking an event (dict), such as a 'LatencyHistogram' or a
+    'JsonLinesSink'.
+
+    The events of 'multi_filters()', 'multi_filters_batch()', 'match_patterns()' and 'stream_filters()' are dicts
+    with an "event" type, a "name" and a duration in "seconds":
+        "filter": each step of a query plan. "name": filter name, "mode": "select", "filter" or "shared", "step",
+        "steps", "estimate", "rows_total", "rows_before", "rows_after".
+        "plan": planning of a query. "name": "plan", "plan": steps in evaluation order, "cache": None, "hit",
+        "partial" or "miss".
+        "query": each query. "name": function name, "filters", "rows_total", "rows_after". For 'stream_filters()',
+        sent once the generator is exhausted or closed, "rows_total" being the number of words read and "filters" the
+        filters crossed by any chunk; its "filter" and "plan" events are sent for each chunk.
+        "batch": 'multi_filters_batch()'. "name": "multi_filters_batch", "queries", "filters", "shared".
+        "patterns": 'match_patterns()'. "name": "match_patterns", "patterns", "lengths".
+
+    Returns:
+        (callable): The sink.
+    """
+
+    global sinks
+    with _sinks_lock:
+        sinks = sinks + (sink,)
+    return sink
+
+def remove_sink(sink: Callable[[dict], None]):
+    """ Stops sending the events to a sink. """
+
+    global sinks
+    with _sinks_lock:
+        sinks = tuple(other for other in sinks if other is not sink)
+
+def clear_sinks():
+    """ Removes all the sinks: nothing is measured anymore. """
+
+    global sinks
+    with _sinks_lock:
+        sinks = ()
+
+@contextmanager
+def collect(sink: Callable[[dict], None]):
+    """ Sends the events to a sink within a 'with' block.
+
+    Example:
+        with collect(LatencyHistogram()) as histogram:
+            multi_filters(df, "Mot", length=5)
+        print(histogram.summary())
+    """
+
+    add_sink(sink)
+    try:
+        yield sink
+    finally:
+        remove_sink(sink)
+
+def emit(event: dict):
+    """ Sends an event to all the sinks. """
+    for sink in sinks:
+        sink(event)
+
+# ===================================================================
+#                         LATENCY HISTOGRAM
+# ===================================================================
+class LatencyHistogram:
+    """ Sink accumulating the durations of the events in histograms, by event type and name.
+
+    The durations are counted in logarithmic buckets (BUCKETS_PER_DECADE per
+    power of ten, from MIN_SECONDS to MAX_SECONDS): the memory used doesn't
+    depend on the number of events, and the percentiles are given within
+    about 6% of the actual durations.
+
+    Example:
+        histogram = add_sink(LatencyHistogram())
+        ...
+        histogram.summary()["filter"]["length"]["p99"]
+    """
+
+    MIN_SECONDS = 1e-7
+    MAX_SECONDS = 1e3
+    BUCKETS_PER_DECADE = 20
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._buckets_count = round(math.log10(self.MAX_SECONDS / self.MIN_SECONDS) * self.BUCKETS_PER_DECADE) + 1
+        self._stats = {} # (event, name) -> [buckets, count, total seconds, max seconds, rows before, rows after]
+
+    def __call__(self, event: dict):
+        seconds = event.get("seconds")
+        if seconds is None:
+            return
+
+        key = (event["event"], event["name"])
+        bucket = self._bucket(seconds)
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = [[0] * self._buckets_count, 0, 0.0, 0.0, 0, 0]
+            stats[0][bucket] += 1
+            stats[1] += 1
+            stats[2] += seconds
+            stats[3] = max(stats[3], seconds)
+            stats[4] += event.get("rows_before", 0)
+            stats[5] += event.get("rows_after", 0)
+
+    def _bucket(self, seconds: float) -> int:
+        if seconds <= self.MIN_SECONDS:
+            return 0
+        bucket = int(math.log10(seconds / self.MIN_SECONDS) * self.BUCKETS_PER_DECADE)
+        return min(bucket, self._buckets_count - 1)
+
+    def percentile(self, event: str, name: str, q: float) -> Optional[float]:
+        """ Duration (seconds) under which 'q' percent of the events of a name fall, None if none was recorded. """
+
+        with self._lock:
+            stats = self._stats.get((event, name))
+            if stats is None:
+                return None
+            buckets, count, _, maximum = stats[:4]
+
+            rank = max(1, math.ceil(count * q / 100))
+            seen = 0
+            for bucket, bucket_count in enumerate(buckets):
+                seen += bucket_count
+                if seen >= rank:
+                    break
+
+        # Geometric middle of the bucket
+        seconds = self.MIN_SECONDS * 10 ** ((bucket + 0.5) / self.BUCKETS_PER_DECADE)
+        return min(seconds, maximum)
+
+    def summary(self, percentiles: tuple = (50, 90, 99)) -> dict:
+        """ Statistics of the durations, by event type and name.
+
+        Returns:
+            (dict): {event: {name: {"count", "total", "mean", "max", "p50", "p90", "p99", and for the filters
+            "rows_before", "rows_after": mean number of rows before and after them}}}
+        """
+
+        with self._lock:
+            keys = list(self._stats)
+
+        summary = {}
+        for event, name in keys:
+            _, count, total, maximum, rows_before, rows_after = self._stats[(event, name)]
+            stats = {"count": count, "total": total, "mean": total / count, "max": maximum}
+            stats.update({f"p{q}": self.percentile(event, name, q) for q in percentiles})
+            if event == "filter":
+                stats.update(rows_before=rows_before / count, rows_after=rows_after / count)
+            summary.setdefault(event, {})[name] = stats
+        return summary
+
+    def clear(self):
+        """ Forgets all the recorded events. """
+        with self._lock:
+            self._stats.clear()
+
+# ===================================================================
+#                            JSON LINES
+# ===================================================================
+class JsonLinesSink:
+    """ Sink writing each event as a line of JSON, along with its time ("time": Unix timestamp).
+
+    Args:
+        file (str or file): Path of the file (the events are appended to it) or text file object.
+    """
+
+    def __init__(self, file: Union[str, io.TextIOBase]):
+        self._lock = threading.Lock()
+        self._owned = isinstance(file, str)
+        self.file = open(file, "a", encoding="utf-8") if self._owned else file
+
+    def __call__(self, event: dict):
+        line = json.dumps({"time": time(), **event}, ensure_ascii=False, default=str)
+        with self._lock:
+            self.file.write(line + "\n")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """ Closes the file if it was opened by the sink, flushes it otherwise. """
+        with self._lock:
+            if self._owned:
+                self.file.close()
+            else:
+                self.file.flush()
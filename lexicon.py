@@ -1,11 +1,15 @@
 import time
 import logging
-import ast
+import weakref
 from typing import Optional, Union
 
 import pandas as pd
 from openpyxl import load_workbook, Workbook
 
+from compiled_dictionary import CompiledDictionary, load_dictionary, parse_definitions
+from lexicon_store import LEXICON_PATH, LexiconStore, XlsxStore, first_empty
+from word_index import closest_spelling, fold, get_index
+
 # ===================================================================
 #                          LOGGING INIT
 # ===================================================================
@@ -13,19 +17,22 @@ logger = logging.getLogger()
 logger.setLevel(logging.WARNING)
 
 # ===================================================================
-#                         DATAFRAME CREATION
+#                         DICTIONARY LOADING
 # ===================================================================
-print("Main dataframe creation...")
-dict_df = pd.read_csv("files/dico.csv")
-dict_df = dict_df.sort_values("Mot")
-dict_df = dict_df.dropna()
-dict_df = dict_df.reset_index(drop=True)
+print("Dictionary loading...")
+dico = load_dictionary() # Memory-mapped, already sorted and cleaned
+
+def __getattr__(name):
+    # The dataframe view ('dict_df') is only built when it is actually used
+    if name == "dict_df":
+        return dico.to_dataframe()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # ===================================================================
 #                         EXCEL FILE INIT
 # ===================================================================
 # Opening the Excel file
-excel_file = load_workbook("files/lexi.xlsx")
+excel_file = load_workbook(LEXICON_PATH)
 sheet = excel_file.active
 
 # Writing of the first line: column names
@@ -34,42 +41,72 @@ sheet["B1"] = "Definitions"
 sheet["C1"] = "Timestamp"
 
 # ===================================================================
-#                            FUNCTIONS
+#                              STORAGE
 # ===================================================================
-# In order to reduce the risks associated with too long or potentially
-# infinite iterations of the lexicon
-LIMIT_ITER = 10000
+# The functions below accept either a sheet, used through an XlsxStore, or
+# any LexiconStore (see lexicon_store.py), such as an SQLiteStore.
+_sheet_stores = weakref.WeakKeyDictionary()
 
-def first_empty(workbook: Workbook, column: str = 'A'):
-    """ Returns the index of the first empty cell in a column. This allows to target the cell on which to write.
+def get_store(workbook: Union[Workbook, LexiconStore, None] = None) -> LexiconStore:
+    """ Returns the storage of a lexicon.
 
     Args:
-        workbook (Workbook): Workbook object (openpyxl) referring to the spreadsheet.
-        column (str): Letter of the column to be analyzed to locate the first empty cell.
+        workbook (Workbook or LexiconStore): Workbook object (openpyxl) referring to the spreadsheet, or lexicon
+        storage. The sheet of 'lexi.xlsx' by default.
     """
 
-    idx = 2
-    while True:
-        # Cell is empty
-        if not isinstance(workbook[f'{column}{idx}'].value, str):
-            return idx
+    if workbook is None:
+        workbook = sheet
 
-        # Cell is full
-        else:
-            idx += 1
-            if idx == LIMIT_ITER:
-                logging.critical("Too many iterations")
-                break
-            else:
-                continue
-
-def add_word(dataframe: pd.DataFrame, workbook: Workbook, word: str) -> Optional[None]:
+    if isinstance(workbook, LexiconStore):
+        return workbook
+
+    if workbook not in _sheet_stores:
+        # Only the sheet of 'lexi.xlsx' is saved to it
+        _sheet_stores[workbook] = XlsxStore(workbook, LEXICON_PATH if workbook.parent is excel_file else None)
+    return _sheet_stores[workbook]
+
+def batch(workbook: Union[Workbook, LexiconStore, None] = None):
+    """ Groups the modifications of a lexicon: they are saved once, when leaving the block, or undone if it raises
+    an exception.
+
+    Args:
+        workbook (Workbook or LexiconStore): Lexicon sheet or storage, the sheet of 'lexi.xlsx' by default.
+
+    Example:
+        with batch():
+            for word in words:
+                add_word(dico, sheet, word)
+    """
+    return get_store(workbook).batch()
+
+def flush(workbook: Union[Workbook, LexiconStore, None] = None) -> int:
+    """ Saves the pending modifications of a lexicon now. Returns the number of modifications saved. """
+    return get_store(workbook).flush()
+
+def set_flush_interval(seconds: Optional[float], workbook: Union[Workbook, LexiconStore, None] = None):
+    """ Enables write-behind: modifications are saved at most 'seconds' after being made, instead of immediately.
+
+    Args:
+        seconds (float): Maximum delay before saving. None to save after each modification (default).
+        workbook (Workbook or LexiconStore): Lexicon sheet or storage, the sheet of 'lexi.xlsx' by default.
+    """
+    get_store(workbook).flush_interval = seconds
+
+# ===================================================================
+#                            FUNCTIONS
+# ===================================================================
+def add_word(dataframe: Union[pd.DataFrame, CompiledDictionary], workbook: Union[Workbook, LexiconStore],
+             word: str, strict: bool = True) -> Optional[None]:
     """ Addition of a word in the lexicon which is present in the dictionary.
 
     Args:
-        dataframe (pandas.Dataframe): Dictionary dataframe.
-        workbook (Workbook): Workbook object (openpyxl) referring to the spreadsheet.
+        dataframe (pandas.Dataframe or CompiledDictionary): Dictionary dataframe or compiled dictionary.
+        workbook (Workbook or LexiconStore): Workbook object (openpyxl) referring to the spreadsheet, or lexicon
+        storage.
         word (str): Word present in the dictionary to add in the lexicon.
+        strict (bool): False to find the word in the dictionary regardless of case and accents ("etre" -> "Être"),
+        the word being added as written in the dictionary.
 
     Returns:
         None: Not in dictionary or already in lexicon.
@@ -77,67 +114,70 @@ def add_word(dataframe: pd.DataFrame, workbook: Workbook, word: str) -> Optional
 
     word = word.capitalize()
 
-    definition = dataframe.loc[dataframe['Mot'] == word]['Définitions']
+    if isinstance(dataframe, CompiledDictionary):
+        row = dataframe.find(word)
+    else:
+        row = get_index(dataframe, 'Mot').position(word)
+
+    # Same word, other case or accents
+    if row < 0 and not strict:
+        index = get_index(dataframe, 'Mot')
+        row = index.position(word, strict=False)
+        if row >= 0:
+            word = index.words[row]
 
     # Word not found
-    if len(definition) == 0:
+    if row < 0:
         logging.warning(f"'{word}' not in dictionary")
         return None
 
     # Word found
     else:
-        logging.info(f"'{word}' found in dictionary at idx {dataframe.loc[dataframe['Mot'] == word].index[0]}")
-        definition = ast.literal_eval(definition.values[0])  # -> <list>
-
-        idx = 2  # Index vertical de la colonne
-
-        # Loop to first empty cell in lexicon
-        while idx <= first_empty(workbook):
-
-            # Word already present in the lexicon
-            if workbook[f"A{idx}"].value == word:
-                logging.warning(f"'{word}' not added : already in lexicon at cell A{idx}")
-                return None
-
-            # Cell is empty
-            if not isinstance(workbook[f"A{idx}"].value, (str, int, float)):
-                # All the definitions of the word contained in the list (D) are merged
-                # into a single string in order to be inserted into the sheet cell
-                definition_list = []
-                for idx_def, definition in enumerate(definition):
-                    definition_list.append(f"{idx_def + 1}) {definition}")
-
-                workbook[f"A{str(idx)}"] = word  # Add word
+        if isinstance(dataframe, CompiledDictionary):
+            logging.info(f"'{word}' found in dictionary at idx {row}")
+            definition = dataframe.definitions(row)  # -> <list>
+        else:
+            logging.info(f"'{word}' found in dictionary at idx {dataframe.index[row]}")
+            definition = parse_definitions(dataframe['Définitions'].iat[row])  # -> <list>
 
-                workbook[f"B{str(idx)}"] = "".join(definition_list)  # Add definitions
+        store = get_store(workbook)
 
-                workbook[f"C{str(idx)}"] = str(int(time.time()))  # Add timestamp
+        # Word already present in the lexicon
+        result = store.get(word)
+        if result is not None:
+            logging.warning(f"'{word}' not added : already in lexicon at idx {result[0]}")
+            return None
 
-                logging.info(f"'{word}' added in lexicon at idx A{idx}")
-                break
+        # All the definitions of the word contained in the list (D) are merged
+        # into a single string in order to be inserted into the lexicon
+        definition_list = []
+        for idx_def, definition in enumerate(definition):
+            definition_list.append(f"{idx_def + 1}) {definition}")
 
-            else:
-                idx += 1
-                if idx == LIMIT_ITER:  # watchdog
-                    logging.critical("Watchdog : too many iterations")
-                    break
+        idx = store.add(word, "".join(definition_list), str(int(time.time())))  # Saved at the end of the batch
+        logging.info(f"'{word}' added in lexicon at idx {idx}")
 
-    excel_file.save("files/lexi.xlsx")  # Save file after modification
-    logging.debug("xlsx file saved after adding a word")
     print(f"The word '{word}' has been added to the lexicon.")
 
-def search(workbook: Workbook, word: str, log: bool = True) -> Optional[tuple]:
+def search(workbook: Union[Workbook, LexiconStore], word: str, log: bool = True,
+           strict: bool = True) -> Optional[tuple]:
     """ Search a word in the lexicon.
 
     If the word is found in the lexicon, the function returns in a tuple :
     (the index, the word, its definitions, the timestamp of the addition). If no word was found, returns None.
 
+    With 'strict' set to False, a word not found as written is looked up regardless of case and accents ("etre"
+    finds "Être"), through the normalized forms stored by the lexicon: the entry written the closest to the word is
+    returned.
+
     Args:
-        workbook (Workbook): Workbook object (openpyxl) referring to the spreadsheet.
+        workbook (Workbook or LexiconStore): Workbook object (openpyxl) referring to the spreadsheet, or lexicon
+        storage.
         word (str): Word to search.
         log (bool): A word that can't be found is considered a warning logging by default, but it's not always useful
         to display the error message when this function is actually used to check whether a word is missing from the
         lexicon.
+        strict (bool): False to find the word regardless of case and accents.
 
     Returns:
         tuple: Word found. (index, word, definitions, timestamp).
@@ -146,31 +186,33 @@ def search(workbook: Workbook, word: str, log: bool = True) -> Optional[tuple]:
 
     word = word.capitalize()
 
-    idx = 2
-    found = False
-    while idx < first_empty(workbook):
-        # Word found
-        if workbook[f'A{idx}'].value == word:
-            logging.info(f"'{word}' found in lexicon at idx {idx}")
-            return idx, word, workbook[f'B{idx}'].value, workbook[f'C{idx}'].value
+    store = get_store(workbook)
+    result = store.get(word)
 
-        # Still searching
-        else:
-            idx += 1
+    # Same word, other case or accents
+    if result is None and not strict:
+        entries = store.get_folded(fold(word))
+        if entries:
+            result = entries[closest_spelling(word, [entry[1] for entry in entries])]
 
-    # End of itération : word not found
-    if not found:
-        if log:
-            logging.warning(f"'{word}' not found in lexicon")
-        return None
+    # Word found
+    if result is not None:
+        logging.info(f"'{result[1]}' found in lexicon at idx {result[0]}")
+        return tuple(result)
 
-def delete(workbook: Workbook, word: str) -> Optional[None]:
+    # Word not found
+    if log:
+        logging.warning(f"'{word}' not found in lexicon")
+    return None
+
+def delete(workbook: Union[Workbook, LexiconStore], word: str) -> Optional[None]:
     """ Delete a word from the lexicon.
 
-    The delete_rows() function from openpyxl automatically fills the void left by the deletion.
+    In a spreadsheet, the row of the word is blanked, and the rows below it move up when the lexicon is saved.
 
     Args:
-        workbook (Workbook): Workbook object (openpyxl) referring to the spreadsheet.
+        workbook (Workbook or LexiconStore): Workbook object (openpyxl) referring to the spreadsheet, or lexicon
+        storage.
         word (str): Word to delete.
 
     Returns:
@@ -179,27 +221,22 @@ def delete(workbook: Workbook, word: str) -> Optional[None]:
 
     word = word.capitalize()
 
-    result = search(workbook, word, log=False) # The function returns None if no word was found.
-
     # Word not found
-    if result is None:
+    if not get_store(workbook).remove(word):
         logging.warning(f"Word '{word}' not deleted : not in lexicon")
         return None
 
     # Word found
     else:
-        idx = result[0]
-        workbook.delete_rows(idx)
         logging.info(f"'{word}' deleted from the lexicon")
-        excel_file.save("files/lexi.xlsx")
-        logging.debug("xlsx file saved after deletion")
         print(f"The word '{word}' has been deleted from the lexicon.")
 
-def insert(workbook: Workbook, word: str, definition: Union[str, list]) -> Optional[None]:
+def insert(workbook: Union[Workbook, LexiconStore], word: str, definition: Union[str, list]) -> Optional[None]:
     """ Manual addition of a word and its definition to the lexicon.
 
     Args:
-        workbook (Workbook): Workbook object (openpyxl) referring to the spreadsheet.
+        workbook (Workbook or LexiconStore): Workbook object (openpyxl) referring to the spreadsheet, or lexicon
+        storage.
         word (str): Word to insert.
         definition (str or list): Word definition. If there are several definitions, they can be placed in a list.
 
@@ -209,7 +246,8 @@ def insert(workbook: Workbook, word: str, definition: Union[str, list]) -> Optio
 
     word = word.capitalize()
 
-    result = search(workbook, word, log=False)  # returns None if no word was found
+    store = get_store(workbook)
+    result = store.get(word)  # returns None if no word was found
 
     # Word already present
     if result is not None:
@@ -219,8 +257,6 @@ def insert(workbook: Workbook, word: str, definition: Union[str, list]) -> Optio
 
     # Word isn't present
     else:
-        row = first_empty(workbook)  # Where to write
-
         definition_txt = ""
 
         # 'definition' is a list or a tuple with multiple definitions.
@@ -228,32 +264,29 @@ def insert(workbook: Workbook, word: str, definition: Union[str, list]) -> Optio
         if isinstance(definition, (list, tuple)):
             for idx, d in enumerate(definition):
                 definition_txt += f"{idx + 1}) {d} "
-                workbook[f'A{row}'] = word
-                workbook[f'B{row}'] = definition_txt
-                workbook[f'C{row}'] = str(int(time.time()))
 
         # 'definition' is a string
         elif isinstance(definition, str):
             definition_txt = "1) " + definition
-            workbook[f'A{row}'] = word
-            workbook[f'B{row}'] = definition_txt
-            workbook[f'C{row}'] = str(int(time.time()))
 
         # Wrong type for 'definition'
         else:
             logging.critical(f"Word '{word}' not inserted : definition must be str or strs in list/tuple")
             return None
 
-        excel_file.save("files/lexi.xlsx")
-        logging.debug("xlsx file saved after insertion")
+        store.add(word, definition_txt, str(int(time.time())))
         print(f"The word '{word}' has been added to the lexicon.")
 
-def add_random_words(dataframe: pd.DataFrame, workbook: Workbook, sample_length: int, seed=None):
+def add_random_words(dataframe: pd.DataFrame, workbook: Union[Workbook, LexiconStore], sample_length: int,
+                     seed=None):
     """Adds a given number of random words to the lexicon. Mainly for test purposes.
 
+    The words are added in a single batch: the lexicon is saved once.
+
     Args:
           dataframe (pandas.Dataframe): Dictionary dataframe.
-          workbook (Workbook): Workbook object (openpyxl) referring to the spreadsheet.
+          workbook (Workbook or LexiconStore): Workbook object (openpyxl) referring to the spreadsheet, or lexicon
+          storage.
           sample_length (int): Number of words to add.
           seed (int): Random seed.
     """
@@ -263,16 +296,16 @@ def add_random_words(dataframe: pd.DataFrame, workbook: Workbook, sample_length:
     else:
         sample = dataframe.sample(sample_length, random_state=seed)
 
-    for idx, word in enumerate(sample["Mot"]):
-        add_word(dict_df, workbook, word)
+    with batch(workbook):
+        for idx, word in enumerate(sample["Mot"]):
+            add_word(dataframe, workbook, word)
 
     logging.debug(f"{sample_length} words have been added in the lexicon")
     print(f"{sample_length} words were added to the lexicon.")
 
-    excel_file.save("files/lexi.xlsx")
-    logging.debug("xlsx file saved after adding random sample")
-
 if __name__ == "__main__":
+    dict_df = dico.to_dataframe()
+
     add_random_words(dict_df, sheet, 10, seed=42) # Insert 10 randomly chosen words in the dictionary
 
     add_word(dict_df, sheet, "manga") # Add a word from the dictionary
@@ -0,0 +1,570 @@
+import os
+import atexit
+import logging
+import weakref
+import sqlite3
+import argparse
+import threading
+from abc import ABC, abstractmethod
+from contextlib import contextmanager, nullcontext
+from typing import Callable, ContextManager, Iterator, Optional
+
+from openpyxl import load_workbook, Workbook
+from openpyxl.utils import column_index_from_string
+from openpyxl.worksheet.worksheet import Worksheet
+
+from word_index import fold
+
+LEXICON_PATH = "files/lexi.xlsx"
+
+# ===================================================================
+#                            PERSISTENCE
+# ===================================================================
+class WriteBehind:
+    """ Groups the saves of a storage modified several times.
+
+    Each modification is only recorded; the storage is saved once at the end
+    of the outermost batch, or, if a flush interval is set, at most that many
+    seconds after the first pending modification (write-behind). A batch
+    left by an exception saves nothing: its modifications are undone.
+
+    Args:
+        save (Callable): Function saving the storage.
+        savepoint (Callable): Function returning a context manager which undoes the modifications made inside it if
+        it's left by an exception. None if the storage can't undo them.
+    """
+
+    def __init__(self, save: Callable[[], None], savepoint: Optional[Callable[[], ContextManager]] = None):
+        self._save = save
+        self._savepoint = savepoint or nullcontext
+        self.lock = threading.RLock()
+        self.pending = 0 # Modifications not saved yet
+        self.flush_interval = None
+        self._depth = 0
+        self._timer = None
+
+    @contextmanager
+    def batch(self):
+        """ Context manager: the modifications made inside are saved together when leaving it. If the block raises
+        an exception, they are undone and the exception is raised again. """
+
+        with self.lock:
+            pending = self.pending
+            self._depth += 1
+            try:
+                with self._savepoint():
+                    yield self
+            except BaseException:
+                self._depth -= 1
+                self.pending = pending
+                raise
+
+            self._depth -= 1
+            if self._depth == 0:
+                self._schedule()
+
+    def modified(self):
+        """ Records a modification to save. """
+        self.pending += 1
+
+    def _schedule(self):
+        if not self.pending:
+            return
+
+        if self.flush_interval is None:
+            self.flush()
+
+        elif self._timer is None:
+            self._timer = threading.Timer(self.flush_interval, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self) -> int:
+        """ Saves the pending modifications now. Inside a batch, they are saved when leaving the outermost one.
+
+        Returns:
+            int: Number of modifications saved.
+        """
+
+        with self.lock:
+            # The batch could still be undone
+            if self._depth:
+                return 0
+
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+            if not self.pending:
+                return 0
+
+            self._save()
+            saved, self.pending = self.pending, 0
+            logging.debug(f"lexicon saved after {saved} modification(s)")
+            return saved
+
+# ===================================================================
+#                          STORAGE INTERFACE
+# ===================================================================
+class LexiconStore(ABC):
+    """ Storage of the lexicon entries: (word, definitions, timestamp).
+
+    The lexicon functions only use this interface, so that the storage
+    engine can be changed. The modifications are saved through a
+    'WriteBehind' object: once per batch, or periodically if a flush
+    interval is set.
+
+    Args:
+        save (Callable): Function saving the storage.
+        savepoint (Callable): Function returning a context manager undoing the modifications made inside it on
+        exception (see 'WriteBehind').
+    """
+
+    def __init__(self, save: Callable[[], None], savepoint: Optional[Callable[[], ContextManager]] = None):
+        self.persistence = WriteBehind(save, savepoint)
+        _stores.add(self)
+
+    def batch(self):
+        """ Groups the modifications made inside the block: they are saved once, when leaving it, or undone if it
+        raises an exception. """
+        return self.persistence.batch()
+
+    def flush(self) -> int:
+        """ Saves the pending modifications now. Returns the number of modifications saved. """
+        return self.persistence.flush()
+
+    @property
+    def flush_interval(self) -> Optional[float]:
+        """ Maximum delay (s) before saving a modification. None to save at the end of each batch. """
+        return self.persistence.flush_interval
+
+    @flush_interval.setter
+    def flush_interval(self, seconds: Optional[float]):
+        self.persistence.flush_interval = seconds
+        if seconds is None:
+            self.flush()
+
+    @abstractmethod
+    def get(self, word: str) -> Optional[tuple]:
+        """ Entry of a word: (index, word, definitions, timestamp), None if the word isn't stored. """
+
+    def get_folded(self, key: str) -> list:
+        """ Entries of the words whose normalized form (see 'word_index.fold()') is 'key', in insertion order. """
+        return [self.get(word) for word, _, _ in self if isinstance(word, str) and fold(word) == key]
+
+    @abstractmethod
+    def add(self, word: str, definitions: str, timestamp: str) -> int:
+        """ Adds an entry (the word must not be stored yet) and returns its index. """
+
+    @abstractmethod
+    def remove(self, word: str) -> bool:
+        """ Removes the entry of a word. Returns False if the word isn't stored. """
+
+    @abstractmethod
+    def __iter__(self) -> Iterator[tuple]:
+        """ Iterates over the entries, in insertion order: (word, definitions, timestamp). """
+
+    @abstractmethod
+    def __len__(self) -> int:
+        """ Number of entries. """
+
+    def __contains__(self, word: str) -> bool:
+        return self.get(word) is not None
+
+# Opened stores: their pending modifications are saved on exit
+_stores = weakref.WeakSet()
+
+@atexit.register
+def _flush_all():
+    for store in list(_stores):
+        store.flush()
+
+# ===================================================================
+#                             XLSX STORE
+# ===================================================================
+def first_empty(workbook: Worksheet, column: str = 'A'):
+    """ Returns the index of the first empty cell in a column. This allows to target the cell on which to write.
+
+    Args:
+        workbook (Workbook): Workbook object (openpyxl) referring to the spreadsheet.
+        column (str): Letter of the column to be analyzed to locate the first empty cell.
+    """
+
+    col_idx = column_index_from_string(column)
+    for idx, (value,) in enumerate(workbook.iter_rows(min_row=2, min_col=col_idx, max_col=col_idx,
+                                                      values_only=True), start=2):
+        # Cell is empty
+        if not isinstance(value, str):
+            return idx
+
+    # All the cells are full
+    return max(workbook.max_row + 1, 2)
+
+class LexiconIndex:
+    """ In-memory index of a lexicon sheet: row of each word and first free row.
+
+    The index is built with a single pass over column A, then maintained on
+    each insertion and deletion, so that the sheet never needs to be walked
+    again. A deleted word leaves a blank row, so that the rows of the other
+    words don't change: the blank rows are removed at once by 'compact()'.
+
+    Args:
+        workbook (Workbook): Workbook object (openpyxl) referring to the spreadsheet.
+    """
+
+    def __init__(self, workbook: Worksheet):
+        self.rows = {}
+        self.folded = {} # Normalized form -> words
+        self.blank = set() # Rows of the deleted words, not compacted yet
+        self.next_row = first_empty(workbook)
+
+        for idx, (word,) in enumerate(workbook.iter_rows(min_row=2, max_row=self.next_row - 1, max_col=1,
+                                                         values_only=True), start=2):
+            if word not in self.rows and isinstance(word, str):
+                self.folded.setdefault(fold(word), []).append(word)
+            self.rows.setdefault(word, idx)
+
+    def add(self, word: str, row: int):
+        """ Records a word written at the first free row. """
+        self.rows[word] = row
+        self.folded.setdefault(fold(word), []).append(word)
+        self.next_row = row + 1
+
+    def remove(self, word: str):
+        """ Forgets a deleted word: its row stays blank until the next 'compact()'. """
+        row = self.rows.pop(word)
+        self._unfold(word)
+        self.blank.add(row)
+
+    def discard(self, word: str):
+        """ Forgets the last word added: its row is free again (undoes 'add()'). """
+        self.next_row = self.rows.pop(word)
+        self._unfold(word)
+
+    def restore(self, word: str, row: int):
+        """ Records again a word deleted from its row, before the next 'compact()' (undoes 'remove()'). """
+        self.blank.discard(row)
+        self.rows[word] = row
+        spellings = self.folded.setdefault(fold(word), [])
+        spellings.append(word)
+        spellings.sort(key=self.rows.get)
+
+    def _unfold(self, word: str):
+        spellings = self.folded[fold(word)]
+        spellings.remove(word)
+        if not spellings:
+            del self.folded[fold(word)]
+
+    def compact(self) -> list:
+        """ Moves the words up over the blank rows, in a single pass over the rows below the first one.
+
+        Returns:
+            list: (row, new row) of each row to move in the sheet, in this order.
+        """
+
+        if not self.blank:
+            return []
+
+        target = min(self.blank)
+        words = {row: word for word, row in self.rows.items() if row > target}
+        moves = []
+        for row in range(target, self.next_row):
+            if row in self.blank:
+                continue
+            if row in words:
+                self.rows[words[row]] = target
+            moves.append((row, target))
+            target += 1
+
+        self.next_row = target
+        self.blank.clear()
+        return moves
+
+class XlsxStore(LexiconStore):
+    """ Lexicon stored in a spreadsheet: one entry per row (word, definitions, timestamp) from row 2.
+
+    A deletion blanks the row of the word; the blank rows are removed when
+    the modifications are saved, once for all of them. The cells written by
+    a batch are recorded, to be restored if it fails. Saving rewrites the
+    whole file: for large lexicons, prefer 'SQLiteStore' and export the
+    spreadsheet when needed.
+
+    Args:
+        workbook (Workbook): Workbook object (openpyxl) referring to the spreadsheet.
+        path (str): File where the workbook is saved. None for a workbook which is never saved.
+    """
+
+    def __init__(self, workbook: Worksheet, path: Optional[str] = None):
+        super().__init__(save=self._save, savepoint=self._savepoint)
+        self.sheet = workbook
+        self.path = path
+        self.index = LexiconIndex(workbook)
+        self._undo = [] # Functions undoing the modifications not saved yet
+
+    def _save(self):
+        self._undo.clear()
+        self.compact()
+        if self.path is not None:
+            self.sheet.parent.save(self.path)
+
+    @contextmanager
+    def _savepoint(self):
+        mark = len(self._undo)
+        try:
+            yield
+        except BaseException:
+            while len(self._undo) > mark:
+                self._undo.pop()()
+            raise
+
+    def _write(self, idx: int, values: tuple):
+        """ Writes the cells of a row (word, definitions, timestamp), their previous values being restored if the
+        batch fails. """
+
+        previous = tuple(self.sheet[f'{column}{idx}'].value for column in "ABC")
+        self._undo.append(lambda: self._write_cells(idx, previous))
+        self._write_cells(idx, values)
+
+    def _write_cells(self, idx: int, values: tuple):
+        for column, value in zip("ABC", values):
+            self.sheet[f'{column}{idx}'] = value
+
+    def compact(self):
+        """ Removes the blank rows left by the deletions: the rows below them move up. """
+
+        if not self.index.blank:
+            return
+
+        start, end = min(self.index.blank), self.index.next_row
+        cells = list(self.sheet.iter_rows(min_row=start, max_row=end - 1, max_col=3))
+        for row, target in self.index.compact():
+            for source, destination in zip(cells[row - start], cells[target - start]):
+                destination.value = source.value
+        if self.index.next_row < end:
+            self.sheet.delete_rows(self.index.next_row, end - self.index.next_row)
+
+    # The reads take the lock too: the write-behind timer thread moves the rows when compacting the sheet
+    def get(self, word: str) -> Optional[tuple]:
+        with self.persistence.lock:
+            idx = self.index.rows.get(word)
+            if idx is None:
+                return None
+            return idx, word, self.sheet[f'B{idx}'].value, self.sheet[f'C{idx}'].value
+
+    def get_folded(self, key: str) -> list:
+        with self.persistence.lock:
+            return [self.get(word) for word in self.index.folded.get(key, [])]
+
+    def add(self, word: str, definitions: str, timestamp: str) -> int:
+        with self.batch():
+            idx = self.index.next_row
+            self._write(idx, (word, definitions, timestamp))
+            self.index.add(word, idx)
+            self._undo.append(lambda: self.index.discard(word))
+            self.persistence.modified()
+        return idx
+
+    def remove(self, word: str) -> bool:
+        # The row is blanked, the void is filled when saving (see 'compact()')
+        with self.batch():
+            idx = self.index.rows.get(word)
+            if idx is None:
+                return False
+            self._write(idx, (None, None, None))
+            self.index.remove(word)
+            self._undo.append(lambda: self.index.restore(word, idx))
+            self.persistence.modified()
+        return True
+
+    def __iter__(self) -> Iterator[tuple]:
+        with self.persistence.lock:
+            blank = self.index.blank
+            entries = [entry for idx, entry in enumerate(self.sheet.iter_rows(
+                min_row=2, max_row=self.index.next_row - 1, max_col=3, values_only=True), start=2) if idx not in blank]
+        yield from entries
+
+    def __len__(self) -> int:
+        with self.persistence.lock:
+            return self.index.next_row - 2 - len(self.index.blank)
+
+# ===================================================================
+#                            SQLITE STORE
+# ===================================================================
+class SQLiteStore(LexiconStore):
+    """ Lexicon stored in an SQLite database, with an index on the words.
+
+    Lookups, insertions and deletions don't depend on the size of the
+    lexicon, and a batch of modifications is a single transaction, rolled
+    back if the batch fails. The normalized form of each word is stored and
+    indexed too. The spreadsheet can be generated with 'export_xlsx()'.
+
+    Args:
+        path (str): Path of the database, created if needed.
+    """
+
+    def __init__(self, path: str):
+        # The connection is shared with the write-behind timer thread, the accesses are serialized by the lock
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        super().__init__(save=self._connection.commit, savepoint=self._savepoint)
+        self.path = path
+
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("""
+            CREATE TABLE IF NOT EXISTS lexicon (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                word TEXT NOT NULL UNIQUE,
+                definitions TEXT,
+                timestamp TEXT,
+                folded TEXT
+            )""")
+
+        # Databases created before the normalized forms were stored
+        columns = [column[1] for column in self._connection.execute("PRAGMA table_info(lexicon)")]
+        if "folded" not in columns:
+            self._connection.execute("ALTER TABLE lexicon ADD COLUMN folded TEXT")
+            self._connection.executemany("UPDATE lexicon SET folded = ? WHERE id = ?", [
+                (fold(word), idx) for idx, word in self._connection.execute("SELECT id, word FROM lexicon")])
+        self._connection.execute("CREATE INDEX IF NOT EXISTS lexicon_folded ON lexicon (folded)")
+        self._connection.commit()
+
+    @contextmanager
+    def _savepoint(self):
+        # A transaction opened by the batch is rolled back. Otherwise, it holds modifications of the previous
+        # batches, not saved yet (write-behind): only those of this batch are rolled back, to a savepoint.
+        if not self._connection.in_transaction:
+            self._connection.execute("BEGIN")
+            try:
+                yield
+            except BaseException:
+                self._connection.rollback()
+                raise
+            if not self.persistence.pending:
+                self._connection.commit()
+            return
+
+        self._connection.execute("SAVEPOINT batch")
+        try:
+            yield
+        except BaseException:
+            self._connection.execute("ROLLBACK TO batch")
+            raise
+        finally:
+            self._connection.execute("RELEASE batch")
+
+    def get(self, word: str) -> Optional[tuple]:
+        with self.persistence.lock:
+            return self._connection.execute(
+                "SELECT id, word, definitions, timestamp FROM lexicon WHERE word = ?", (word,)).fetchone()
+
+    def get_folded(self, key: str) -> list:
+        with self.persistence.lock:
+            return self._connection.execute(
+                "SELECT id, word, definitions, timestamp FROM lexicon WHERE folded = ? ORDER BY id", (key,)).fetchall()
+
+    def add(self, word: str, definitions: str, timestamp: str) -> int:
+        with self.batch():
+            cursor = self._connection.execute(
+                "INSERT INTO lexicon (word, definitions, timestamp, folded) VALUES (?, ?, ?, ?)",
+                (word, definitions, timestamp, fold(word)))
+            self.persistence.modified()
+        return cursor.lastrowid
+
+    def remove(self, word: str) -> bool:
+        with self.batch():
+            cursor = self._connection.execute("DELETE FROM lexicon WHERE word = ?", (word,))
+            if cursor.rowcount:
+                self.persistence.modified()
+        return cursor.rowcount > 0
+
+    def __iter__(self) -> Iterator[tuple]:
+        with self.persistence.lock:
+            rows = self._connection.execute("SELECT word, definitions, timestamp FROM lexicon ORDER BY id").fetchall()
+        yield from rows
+
+    def __len__(self) -> int:
+        with self.persistence.lock:
+            return self._connection.execute("SELECT COUNT(*) FROM lexicon").fetchone()[0]
+
+    def close(self):
+        """ Saves the pending modifications and closes the database. """
+        self.flush()
+        self._connection.close()
+
+# ===================================================================
+#                          IMPORT / EXPORT
+# ===================================================================
+def open_store(path: str) -> LexiconStore:
+    """ Opens a lexicon, the storage engine depending on the file extension (.xlsx or SQLite database).
+
+    Args:
+        path (str): Path of the lexicon. A missing .xlsx file is created with its column names.
+    """
+
+    if os.path.splitext(path)[1].lower() != ".xlsx":
+        return SQLiteStore(path)
+
+    if os.path.exists(path):
+        workbook = load_workbook(path)
+    else:
+        workbook = Workbook()
+        workbook.active.append(["Mot", "Definitions", "Timestamp"])
+    return XlsxStore(workbook.active, path)
+
+def copy_entries(source: LexiconStore, target: LexiconStore) -> int:
+    """ Adds the entries of a lexicon to another one, in a single batch. The words already in 'target' are skipped.
+
+    Returns:
+        int: Number of entries added.
+    """
+
+    added = 0
+    with target.batch():
+        for word, definitions, timestamp in source:
+            if isinstance(word, str) and word not in target:
+                target.add(word, definitions, timestamp)
+                added += 1
+    return added
+
+def export_xlsx(store: LexiconStore, path: str = LEXICON_PATH) -> str:
+    """ Writes a lexicon as a spreadsheet, in the format of 'lexi.xlsx'.
+
+    Args:
+        store (LexiconStore): Lexicon to export.
+        path (str): Path of the spreadsheet, overwritten if it exists.
+    """
+
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.append(["Mot", "Definitions", "Timestamp"])
+    for entry in store:
+        sheet.append(list(entry))
+
+    workbook.save(path)
+    return path
+
+def import_xlsx(path: str, store: LexiconStore) -> int:
+    """ Adds the entries of a spreadsheet (in the format of 'lexi.xlsx') to a lexicon.
+
+    Returns:
+        int: Number of entries added.
+    """
+    return copy_entries(XlsxStore(load_workbook(path).active), store)
+
+# ===================================================================
+#                               MAIN
+# ===================================================================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Converts a lexicon between the spreadsheet and SQLite formats.")
+    parser.add_argument("action", choices=["export", "import"],
+                        help="export: database -> .xlsx, import: .xlsx -> database")
+    parser.add_argument("database", help="SQLite database")
+    parser.add_argument("xlsx", nargs="?", default=LEXICON_PATH, help="spreadsheet")
+    args = parser.parse_args()
+
+    database = SQLiteStore(args.database)
+    if args.action == "export":
+        export_xlsx(database, args.xlsx)
+        print(f"{len(database)} words exported to '{args.xlsx}'")
+    else:
+        print(f"{import_xlsx(args.xlsx, database)} words imported to '{args.database}'")
+    database.close()
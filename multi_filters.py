@@ -1,22 +1,32 @@
-from time import time
-import itertools
-import unicodedata
+import os
+from time import perf_counter, time
 import logging
-from typing import Optional, Union
+from collections import Counter, deque
+from typing import Iterator, Optional, Union
 
+import numpy as np
 import pandas as pd
 
-logger = logging.getLogger()
+import instrumentation
+from compiled_dictionary import CompiledDictionary, load_dictionary
+from planner import (ANY_SEQUENCE, Anagram, Contains, EndWith, Length, NoCompound, NotContain, NthLetters, Pattern,
+                     Predicate, ResultCache, StartWith, plan)
+from word_index import WordIndex, fold, get_index, remove_accents
+
+# Logger of the module: the 'log' argument of the functions sets its level, not the one of the root logger
+logger = logging.getLogger("multi_filters")
 
 # ===================================================================
-#                         DATAFRAME CREATION
+#                         DICTIONARY LOADING
 # ===================================================================
-print("Main dataframe creation...")
-df = pd.read_csv("files/dico.csv")
-df = df.sort_values("Mot")
-df = df.dropna()
-df = df.reset_index(drop=True)
-INIT_ROWS = df.shape[0]
+print("Dictionary loading...")
+dico = load_dictionary() # Memory-mapped, already sorted and cleaned
+
+def __getattr__(name):
+    # The dataframe view ('df') is only built when it is actually used
+    if name == "df":
+        return dico.to_dataframe()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # ===================================================================
 #                           UTILS FUNCTIONS
@@ -36,49 +46,73 @@ def percent(partial: Union[int, float], total: Union[int, float], rnd=2):
     except ZeroDivisionError:
         return 0
 
-def remove_accents(input_str):
-    """
-    Removes accents from characters in a string.
+def set_log_level(log: Optional[str]):
+    """ Sets the logging level of the module from its name (debug, info, warning, critical). None or an unknown
+    name only lets the CRITICAL messages through. The other loggers, root included, are left as they are. """
+
+    if log is not None:
+        log = log.upper()
+        if log == "DEBUG":
+            logger.setLevel(logging.DEBUG)
+        elif log == "INFO":
+            logger.setLevel(logging.INFO)
+        elif log == "WARNING":
+            logger.setLevel(logging.WARNING)
+        elif log == "CRITICAL":
+            logger.setLevel(logging.CRITICAL)
+        else:
+            logger.setLevel(logging.CRITICAL)
+    else:
+        logger.setLevel(logging.CRITICAL)
+
+def _check_dataframe(dataframe: pd.DataFrame, col_name: str) -> bool:
+    """ Checks that a dataframe has the column of words to filter (logging.critical otherwise). """
+
+    if type(dataframe) != pd.DataFrame:
+        logger.critical(f"""
+        df must be a Pandas dataframe. {type(dataframe)} given """)
+        return False
+        
+    elif col_name not in dataframe.columns:
+        logger.critical(f"""
+        '{col_name}' column doesn't exist in the dataframe.
+        Columns present : {[col for col in dataframe.columns]}""")
+        return False
+
+    return True
+
+def observed() -> bool:
+    """ Whether the queries are measured: an instrumentation sink is installed (see 'instrumentation.add_sink()')
+    or the DEBUG messages are displayed. Otherwise, nothing is timed nor counted. """
+    return bool(instrumentation.sinks) or logger.isEnabledFor(logging.DEBUG)
+
+def report(event: dict):
+    """ Sends an event to the instrumentation sinks, and logs it if the DEBUG messages are displayed. """
+
+    instrumentation.emit(event)
+    if logger.isEnabledFor(logging.DEBUG):
+        debug(event)
+
+def debug(event: dict):
+    """ Logs an instrumentation event (DEBUG): the impact of a filter on
+    the rows (number of rows deleted) and its calculation time, the query
+    plan, or the final stats of a query.
 
-    The function uses the 'unicodedata' module to normalize the character string according to the NFD standard, which
-    breaks down characters into their basic components.
-    
-    Args:
-        input_str (str): Character string from which the accents must be removed.
-    """
-    # String normalization
-    # Transforms the original string into a new string where accented characters are represented by a sequence of base
-    # characters and combining characters (accents). It does not remove the accents; it simply separates them from the
-    # letters they modify. At this point, the length of the string has therefore increased if it contained accented
-    # characters, one extra character for each (although doubled characters are not visible in print).
-    # For example, the word “été” would be decomposed into “e”, “ ' ", "t”, “e”, “ ' ”. Accents have been decomposed
-    # from their base letter.
-    normalized_form = unicodedata.normalize('NFD', input_str)
-
-    # The 'combining' method returns True if 'c' is a combining character (such as an accent).
-    # List comprehension only retains characters that are not combining characters, thus eliminating accents.
-    return ''.join([c for c in normalized_form if not unicodedata.combining(c)])
-
-def debug(filter_name: str, start_time: float, end_time: float, rows_before:  int, rows_after: int):
-    """This function is called up when each filter in the 
-    'multi_filter' function is passed, to gather information 
-    on the filter's impact on the initial data (number of rows 
-    deleted), as well as on calculation time.
-    
     Args:
-        filter_name: Current filter name
-        start_time: Process start timestamp
-        end_time: End of process timestamp
-        rows_before: Number of lines before filter application
-        rows_after: Number of lines after filter application
+        event: Event sent by 'report()' (see 'instrumentation.add_sink()')
     """
-    
-    exec_time = round(end_time-start_time, 3)
-    punctual_delta_rows = percent(rows_before - rows_after, rows_before)
-    global_delta_rows = percent(INIT_ROWS - rows_after, INIT_ROWS)
 
-    logging.debug(f"""
-        --- '{filter_name}' FILTER --- 
+    exec_time = round(event["seconds"], 3)
+
+    if event["event"] == "filter":
+        rows_before, rows_after, rows_total = event["rows_before"], event["rows_after"], event["rows_total"]
+        punctual_delta_rows = percent(rows_before - rows_after, rows_before)
+        global_delta_rows = percent(rows_total - rows_after, rows_total)
+
+        logger.debug(f"""
+        --- '{event["name"]}' FILTER --- 
+        Plan step : {event["step"]}/{event["steps"]}, {event["mode"]}
+        Estimated rows : {None if event["estimate"] is None else round(event["estimate"])}
         Execution time : {exec_time}s
         Rows before : {rows_before} 
         Rows after : {rows_after}
@@ -87,6 +121,80 @@ def debug(filter_name: str, start_time: float, end_time: float, rows_before:  in
         Global rows variation : (-{global_delta_rows}%)
         """)
 
+    elif event["event"] == "plan":
+        logger.debug(f"""
+    -- QUERY PLAN -- 
+    Result cache : {event["cache"]}
+    Planning time : {exec_time}s
+    Plan : {" -> ".join(event["plan"]) if event["plan"] else None}
+    """)
+
+    elif event["event"] == "query":
+        rows_total, rows_after = event["rows_total"], event["rows_after"]
+        logger.debug(f"""
+    -- FINAL STATS -- 
+    Total execution time : {exec_time}s
+    Filters crossed = {len(event["filters"])}/9 -> {event["filters"]}
+    Total rows deleted : {rows_total - rows_after}
+    From {rows_total} to {rows_after} -> (-{percent(rows_total - rows_after, rows_total, rnd=4)}%)
+    """)
+
+    elif event["event"] == "batch":
+        logger.debug(f"""
+    -- QUERIES BATCH -- 
+    Queries : {event["queries"]}
+    Distinct filters : {event["filters"]} ({event["shared"]} shared)
+    Total execution time : {exec_time}s
+    """)
+
+    elif event["event"] == "patterns":
+        logger.debug(f"""
+    -- PATTERNS -- 
+    Patterns : {event["patterns"]} ({event["lengths"]} lengths)
+    Total execution time : {exec_time}s
+    """)
+
+# ===================================================================
+#                           RESULT CACHE
+# ===================================================================
+# Cache of the query results (see 'enable_cache()'), disabled by default
+_result_cache = None
+
+def enable_cache(maxsize: int = 1024):
+    """ Enables the cache of the results of 'multi_filters()' and 'multi_filters_batch()'.
+
+    The results are kept as arrays of row ids (not dataframe copies), the
+    least recently used being dropped beyond 'maxsize' results. The results
+    of the first steps of a query plan are cached too, so that a query
+    sharing some of its filters with a previous one starts from their
+    result.
+
+    Args:
+        maxsize (int): Maximum number of results kept.
+    """
+
+    global _result_cache
+    if _result_cache is not None:
+        _result_cache.clear()
+    _result_cache = ResultCache(maxsize)
+
+def disable_cache():
+    """ Disables and empties the cache of the results. """
+
+    global _result_cache
+    if _result_cache is not None:
+        _result_cache.clear()
+    _result_cache = None
+
+def clear_cache():
+    """ Empties the cache of the results and resets its counters. """
+    if _result_cache is not None:
+        _result_cache.clear()
+
+def cache_info() -> Optional[dict]:
+    """ Counters of the cache of the results (hits, partial_hits, misses, size, maxsize), None if disabled. """
+    return None if _result_cache is None else _result_cache.info()
+
 # ===================================================================
 #                          MULTI FILTERS
 # ===================================================================
@@ -95,9 +203,11 @@ def multi_filters(dataframe: pd.DataFrame, col_name: str, no_comp: bool=True,
                   start_with: Optional[str] = None,
                   end_with: Optional[str] = None,
                   nth_letters: Optional[list[list[int | str]]] = None,
-                  contains: Optional[list[str]] = None,
+                  contains: Optional[Union[list[str], dict[str, int]]] = None,
                   not_contain: Optional[list[str]] = None,
                   anagram: Optional[list[str]] = None,
+                  pattern: Optional[str] = None,
+                  accent_insensitive: bool = False,
                   log="info") -> Optional[pd.DataFrame]:
 
     """ Filters a column of words according to a number of filters.
@@ -110,78 +220,57 @@ def multi_filters(dataframe: pd.DataFrame, col_name: str, no_comp: bool=True,
         start_with (str): Letters to appear at the beginning of the word.
         end_with (str): Letters to appear at the end of a word.
         nth_letters (list): Letter to appear in the desired position.
-        contains (list): Letters that the word must contain.
-        not_contain (list): Letters the word must not contain.
-        anagram (list):
+        contains (list or dict): Letters that the word must contain (all of them, repeated letters counting once).
+        A dict gives the minimum number of occurrences of each letter ({"e": 2}).
+        not_contain (list): Letters the word must not contain (none of them).
+        anagram (list): Letters the word must be written with (all or some of them). "?" or "*" can be used as
+        blank tiles, standing for any letter.
+        pattern (str): Pattern the word must match, "?" standing for any letter and "*" for any sequence of letters
+        ("G?A??IT", "RE*TION"). The letters are compared like those of 'start_with'.
+        accent_insensitive (bool): The letters given to 'contains', 'not_contain', 'start_with', 'end_with',
+        'nth_letters' and 'pattern' match the words regardless of accents and case ("e" matches "é", "É", "E"...).
         log (str): Enable logging with the desired level (debug, info, warning, critical)
-        can be set at None in this case only the CRITICAL will be displayed.
+        can be set at None in this case only the CRITICAL will be displayed (and nothing is printed).
 
     Returns:
         (pandas.DataFrame): Filtered dataframe.
         (None):
+
+    Note:
+        The index of the column (and the cached results) is kept until the dataframe is deleted or the column
+        replaced. After modifying words of the column in place, call 'word_index.invalidate(dataframe)'.
     """
     # -------------------------------------------------------------------
     #                           LOGGING INIT
     # -------------------------------------------------------------------
-    if log is not None:
-        log = log.upper()
-        if log == "DEBUG":
-            logger.setLevel(logging.DEBUG)
-        elif log == "INFO":
-            logger.setLevel(logging.INFO)
-        elif log == "WARNING":
-            logger.setLevel(logging.WARNING)
-        elif log == "CRITICAL":
-            logger.setLevel(logging.CRITICAL)
-        else:
-            logger.setLevel(logging.CRITICAL)
-    else:
-        logger.setLevel(logging.CRITICAL)
+    set_log_level(log)
 
     # -------------------------------------------------------------------
     #                         DATAFRAME CHECK
     # -------------------------------------------------------------------
-    if type(dataframe) != pd.DataFrame:
-        logging.critical(f"""
-        df must be a Pandas dataframe. {type(dataframe)} given """)
+    if not _check_dataframe(dataframe, col_name):
         return None
-        
-    elif col_name not in dataframe.columns:
-        logging.critical(f"""
-        '{col_name}' column doesn't exist in the dataframe.
-        Columns present : {[col for col in dataframe.columns]}""")
-        return None
-    
-    else:
-        pass
 
     # -------------------------------------------------------------------
-    #                         CONFLICTS CHECK
+    #                          ARGUMENTS CHECK
     # -------------------------------------------------------------------
-    # contains/not_contain check
-    if contains is not None and not_contain is not None:
-        if not isinstance(contains, list) or not isinstance(not_contain, list):
-            logging.critical(f"""'contains' or 'not_contain' isn't a list.""")
-            return None
-
-        elif set(contains) & set(not_contain):
-            logging.critical(f"""
-            'contains' and 'not_contain' must not share common values.""")
-            return None
-        
-        else:
-            pass
+    index = get_index(dataframe, col_name)
+    predicates = build_predicates(index, no_comp=no_comp, length=length, start_with=start_with, end_with=end_with,
+                                  nth_letters=nth_letters, contains=contains, not_contain=not_contain,
+                                  anagram=anagram, pattern=pattern, accent_insensitive=accent_insensitive)
+    if predicates is None:
+        return None
 
     # -------------------------------------------------------------------
     #                           DEBUG INIT
     # -------------------------------------------------------------------
-    INIT_TIME = time()
+    start_time = perf_counter()
     INIT_SHAPE = dataframe.shape[0]
-    filters_crossed = []
 
-    logging.debug(f"""
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"""
     -- INITIAL VALUES --
-    Start at : {INIT_TIME}
+    Start at : {time()}
     Dataframe shape : {dataframe.shape}
     Column to filter : {col_name}
     no_comp = {no_comp}
@@ -192,263 +281,736 @@ def multi_filters(dataframe: pd.DataFrame, col_name: str, no_comp: bool=True,
     contains = {contains}
     not_contain = {not_contain}
     anagram = {anagram}
+    pattern = {pattern}
     """)
 
-    print("Filtering...")
+    if log is not None:
+        print("Filtering...")
     # -------------------------------------------------------------------
     #                             FILTERS
     # -------------------------------------------------------------------
+    rows, filters_crossed = run_plan(predicates, INIT_SHAPE, cache=_result_cache)
+
+    # The dataframe is only sliced once, with the rows left
+    dataframe = dataframe.iloc[rows]
+
     # -------------------------------------------------------------------
-    #                   FILTER 1 : NO COMPOUND WORDS
+    #                            FINAL PROCESSES
     # -------------------------------------------------------------------
-    if no_comp:
-        start_time = time()
+    # No words found
+    if dataframe.shape[0] == 0:
+        logger.info("No words found")
 
-        dataframe = dataframe.loc[
-            (~dataframe[col_name].str.contains(r'\s')) &
-            (~dataframe[col_name].str.contains(r'-'))
-            ]
+    # Final stats
+    if observed():
+        report({"event": "query", "name": "multi_filters", "filters": filters_crossed, "rows_total": INIT_SHAPE,
+                "rows_after": dataframe.shape[0], "seconds": perf_counter() - start_time})
 
-        end_time = time()
-        debug("no_comp", start_time, end_time, INIT_SHAPE, dataframe.shape[0])
-        filters_crossed.append("no_comp")
+    return dataframe
 
+def build_predicates(index: WordIndex, no_comp: bool = True,
+                     length: Optional[int] = None,
+                     start_with: Optional[str] = None,
+                     end_with: Optional[str] = None,
+                     nth_letters: Optional[list[list[int | str]]] = None,
+                     contains: Optional[Union[list[str], dict[str, int]]] = None,
+                     not_contain: Optional[list[str]] = None,
+                     anagram: Optional[list[str]] = None,
+                     pattern: Optional[str] = None,
+                     accent_insensitive: bool = False,
+                     shared: Optional[dict] = None) -> Optional[list[Predicate]]:
+    """ Checks the filters of a query and converts them into predicates over the rows of a word index.
+
+    Each filter is evaluated over the rows of the word index of the column
+    (positions in the input dataframe), never over a copy of the dataframe.
+
+    Args:
+        index (WordIndex): Index of the column to filter.
+        shared (dict): Predicates already built for other queries, by key. A predicate identical to one of them is
+        replaced by it, so that it is only evaluated once.
+        Other arguments: See 'multi_filters()'.
+
+    Returns:
+        (list): Predicates of the query.
+        (None): Wrong arguments.
+    """
     # -------------------------------------------------------------------
-    #                   FILTER 2 : BY WORD LENGTH
+    #                         CONFLICTS CHECK
     # -------------------------------------------------------------------
-    if length is not None:
-        if not isinstance(length, int):
-            logging.critical(f"""'length' must be of type int. 
-            {type(length)} given""")
+    # contains/not_contain check
+    if contains is not None and not_contain is not None:
+        if not isinstance(contains, (list, dict)) or not isinstance(not_contain, list):
+            logger.critical(f"""'contains' or 'not_contain' isn't a list.""")
             return None
 
-        punctual_shape = dataframe.shape[0]
-        start_time = time()
-
-        dataframe = dataframe.loc[dataframe[col_name].str.len() == length]
-
-        end_time = time()
-        debug("length", start_time, end_time, punctual_shape, dataframe.shape[0])
-        filters_crossed.append("length")
+        elif set(contains) & set(not_contain):
+            logger.critical(f"""
+            'contains' and 'not_contain' must not share common values.""")
+            return None
+        
+        else:
+            pass
 
     # -------------------------------------------------------------------
-    #                 FILTER 3 : BY ABSENCE OF LETTERS
+    #                          ARGUMENTS CHECK
     # -------------------------------------------------------------------
+    # All the arguments are checked before any filter is applied, since the filters are not applied in a fixed
+    # order (see 'run_plan()')
+    if length is not None:
+        if not isinstance(length, int):
+            logger.critical(f"""'length' must be of type int. 
+            {type(length)} given""")
+            return None
+
     if not_contain is not None:
         if not isinstance(not_contain, list):
-            logging.critical(f"""'not_contain' must be of type list. 
+            logger.critical(f"""'not_contain' must be of type list. 
             {type(not_contain)} given""")
             return None
 
         elif not all(type(x) == str for x in not_contain):
-            logging.critical("""One of the elements of 'not_contain' 
+            logger.critical("""One of the elements of 'not_contain' 
             is not a str.""")
             return None
-        
-        else:
-            pass
-
-        not_contain = set(not_contain) # remove duplicates
-        r = ""
-        for lettre in not_contain:
-            r = r + f"(?=.*{lettre})"
-
-        regex = f"^{r}.*$"
 
-        punctual_shape = dataframe.shape[0]
-        start_time = time()
+        if accent_insensitive:
+            not_contain = [fold(letter) for letter in not_contain]
 
-        dataframe = dataframe.loc[~dataframe[col_name].str.contains(regex)] # ~ for negation
-
-        end_time = time()
-        debug("not_contain", start_time, end_time, punctual_shape, dataframe.shape[0])
-        filters_crossed.append("not_contain")
+        not_contain = set(not_contain) # remove duplicates
 
-    # -------------------------------------------------------------------
-    #                 FILTER 4 : BY PRESENCE OF LETTERS
-    # -------------------------------------------------------------------
     if contains is not None:
-        if not isinstance(contains, list):
-            logging.critical(f"""'contains' must be of type list. 
+        if not isinstance(contains, (list, dict)):
+            logger.critical(f"""'contains' must be of type list or dict. 
             {type(contains)} given""")
             return None
 
         elif not all(type(x) == str for x in contains):
-            logging.critical("""One of the elements of 'contains' 
+            logger.critical("""One of the elements of 'contains' 
             is not a str.""")
             return None
 
-        contains = set(contains) # remove duplicates
-        r = ""
-        for lettre in contains:
-            r = r + f"(?=.*{lettre})"
-
-        regex = f"^{r}.*$"
-
-        punctual_shape = dataframe.shape[0]
-        start_time = time()
-
-        dataframe = dataframe.loc[dataframe[col_name].str.contains(regex)]
+        elif isinstance(contains, dict) and not all(type(x) == int and x >= 1 for x in contains.values()):
+            logger.critical("""The numbers of occurrences of 'contains' 
+            must be int greater than 0.""")
+            return None
 
-        end_time = time()
-        debug("contains", start_time, end_time, punctual_shape, dataframe.shape[0])
-        filters_crossed.append("contains")
+        # Minimum number of occurrences of each letter
+        if isinstance(contains, list):
+            contains = {letter: 1 for letter in set(contains)} # remove duplicates
+        if accent_insensitive:
+            folded = Counter()
+            for letter, minimum in contains.items():
+                folded[fold(letter)] = max(folded[fold(letter)], minimum)
+            contains = folded
 
-    # -------------------------------------------------------------------
-    #                FILTER 5 : BY BEGINNING OF WORD
-    # -------------------------------------------------------------------
     if start_with is not None:
         if not isinstance(start_with, str):
-            logging.critical(f"""'start_with' must be of type str. 
+            logger.critical(f"""'start_with' must be of type str. 
             {type(start_with)} given""")
             return None
 
-        start_with = start_with.capitalize()
+        start_with = fold(start_with) if accent_insensitive else start_with.capitalize()
 
-        punctual_shape = dataframe.shape[0]
-        start_time = time()
-
-        dataframe = dataframe.loc[dataframe[col_name].str.startswith(start_with)]
-
-        end_time = time()
-        debug("start_with", start_time, end_time, punctual_shape, dataframe.shape[0])
-        filters_crossed.append("start_with")
-
-    # -------------------------------------------------------------------
-    #                   FILTER 6 : BY LETTERS POSITION
-    # -------------------------------------------------------------------
     if nth_letters is not None:
         if not isinstance(nth_letters, list):
-            logging.critical(f"""'nth_letters' must be of type list. 
+            logger.critical(f"""'nth_letters' must be of type list. 
             {type(nth_letters)} given""")
             return None
         
         elif not all(type(x)==list and len(x)==2 for x in nth_letters):
-            logging.critical(f"""All elements of the 'nth letters' list 
+            logger.critical(f"""All elements of the 'nth letters' list 
             must be lists of 2 elements: [rank, letter]""")
             return None
         
         elif not all(type(x[0])==int and type(x[1])==str 
         and len(x[1])==1 for x in nth_letters):
-            logging.critical(f"""Each sub-element of nth_letters must be a list 
+            logger.critical(f"""Each sub-element of nth_letters must be a list 
             composed of 2 elements [rank(int), 1 letter (str)]""")
             return None
-        
-        else:
-            pass
 
-        nth_letters = dict(nth_letters)
-        
-        punctual_shape = dataframe.shape[0]
-        start_time = time()
-
-        for rank, letter in nth_letters.items():
-            dataframe = dataframe.loc[dataframe[col_name].apply(lambda x: len(x) >
-                                                                          int(rank) and x[int(rank) - 1] == letter)]
+        elif not all(x[0] >= 1 for x in nth_letters):
+            logger.critical(f"""The ranks of 'nth_letters' start at 1.""")
+            return None
 
-        end_time = time()
-        debug("nth_letters", start_time, end_time, punctual_shape, dataframe.shape[0])
-        filters_crossed.append("nth_letters")
+        nth_letters = dict(nth_letters)
+        if accent_insensitive:
+            nth_letters = {rank: fold(letter) for rank, letter in nth_letters.items()}
 
-    # -------------------------------------------------------------------
-    #                    FILTER 7 : BY ENDING OF WORD
-    # -------------------------------------------------------------------
     if end_with is not None:
-        if not isinstance(start_with, str):
-            logging.critical(f"""'start_with' must be of type str. 
-            {type(start_with)} given""")
+        if not isinstance(end_with, str):
+            logger.critical(f"""'end_with' must be of type str. 
+            {type(end_with)} given""")
             return None
 
-        punctual_shape = dataframe.shape[0]
-        start_time = time()
-
-        dataframe = dataframe.loc[dataframe[col_name].str.endswith(end_with)]
-
-        end_time = time()
-        debug("end_with", start_time, end_time, punctual_shape, dataframe.shape[0])
-        filters_crossed.append("end_with")
+        if accent_insensitive:
+            end_with = fold(end_with)
 
-    # -------------------------------------------------------------------
-    #                     FILTER 8 : BY ANAGRAM
-    # -------------------------------------------------------------------
     if anagram is not None:
         # Check that 'anagram' is a list
         if not isinstance(anagram, list):
-            logging.critical(f"""'anagram' must be of type list. 
+            logger.critical(f"""'anagram' must be of type list. 
             {type(anagram)} given""")
             return None
 
         # Check that all elements of 'anagram' are strings
         elif not all(type(x) == str for x in anagram):
-            logging.critical("""One of the elements of 'anagram' 
+            logger.critical("""One of the elements of 'anagram' 
             is not a str.""")
             return None
 
-        start_time = time()
-        punctual_shape = dataframe.shape[0]
-
-        # Initialization of a dictionary to store the generated anagrams.
-        anagrams_dict = {}
-
-        # Standardization of anagram letters: removal of accents and conversion to lower case.
-        normalized_anagram = [remove_accents(letter).lower() for letter in anagram]
-
-        # Generate permutations of the letters in the 'normalized_anagram' list to form words of different lengths.
-        # Permutations are generated for words of length 1 up to the maximum length (total number of letters in the
-        # list). The anagrams generated for each length are added to the 'anagrams_dict' dictionary.
-        for i in range(len(normalized_anagram)):
-            # Generation of permutations for words of length i+1
-            permute = itertools.permutations(normalized_anagram, i+1)
-            anagrams_of_length_i = set() # Initialize a set to store anagrams of length i+1.
-            # Path of each generated permutation
-            for word_tuple in permute:
-                word = "".join(word_tuple) # Converting permutations to strings
-                word = word.capitalize() # Word capitalization (first letter in uppercase)
-                anagrams_of_length_i.add(word) # Add the word to the set of anagrams of length i+1
-            # Add all anagrams of length i+1 to the dictionary
-            anagrams_dict[i+1] = anagrams_of_length_i
-
-        # Group all anagram sets in a list
-        all_anagrams = [] # all sets
-        for anag in anagrams_dict.values():
-            all_anagrams.append(anag)
-        
-        # Merge all anagram sets into a single set
-        merged_sets = all_anagrams[0] # # Initialization with the first set
-        for set_i in all_anagrams[1:]:
-            merged_sets.update(set_i) # Add elements from other sets
+    if pattern is not None:
+        if not isinstance(pattern, str) or not pattern:
+            logger.critical(f"""'pattern' must be a non-empty str. 
+            {type(pattern)} given""")
+            return None
+
+        pattern = _pattern_case(pattern, accent_insensitive)
 
-        # Dataframe filtering: only those words are retained which, once normalized (without accents and capitalized),
-        # correspond to one of the anagrams generated.
-        dataframe = dataframe[dataframe[col_name].apply(lambda x: remove_accents(x).lower().capitalize()
-                                                        ).isin(merged_sets)]
+    # -------------------------------------------------------------------
+    #                            PREDICATES
+    # -------------------------------------------------------------------
+    predicates = []
 
-        end_time = time()
-        debug("anagram", start_time, end_time, punctual_shape, dataframe.shape[0])
-        filters_crossed.append("anagram")
+    if no_comp:
+        predicates.append(NoCompound(index))
+
+    if length is not None:
+        predicates.append(Length(index, length))
+
+    if not_contain is not None:
+        predicates.append(NotContain(index, not_contain, folded=accent_insensitive))
+
+    if contains is not None:
+        predicates.append(Contains(index, contains, folded=accent_insensitive))
+
+    if start_with is not None:
+        predicates.append(StartWith(index, start_with, folded=accent_insensitive))
+
+    if nth_letters is not None:
+        predicates.append(NthLetters(index, nth_letters, folded=accent_insensitive))
+
+    if end_with is not None:
+        predicates.append(EndWith(index, end_with, folded=accent_insensitive))
+
+    if anagram is not None:
+        predicates.append(Anagram(index, anagram, length))
+
+    if pattern is not None:
+        predicates.append(Pattern(index, pattern, folded=accent_insensitive))
+
+    # Predicates identical to those of another query of the batch are shared
+    if shared is not None:
+        predicates = [shared.setdefault(predicate.key, predicate) for predicate in predicates]
+
+    return predicates
+
+def run_plan(predicates: list[Predicate], size: int, shared: Union[set, dict] = (),
+             cache: Optional[ResultCache] = None, rows: Optional[np.ndarray] = None) -> tuple:
+    """ Plans and evaluates the predicates of a query.
+
+    Args:
+        predicates (list): Predicates of the query (see 'build_predicates()').
+        size (int): Number of rows of the column.
+        shared (set): Predicates shared with other queries, evaluated once over the whole column.
+        cache (ResultCache): Cache of the results of the query and of its partial queries.
+        rows (numpy.ndarray): Sorted rows the predicates are applied to, all the rows of the column by default. All
+        the predicates then filter these rows, and the cache isn't used (the results don't cover the whole column).
+
+    Returns:
+        (tuple): (sorted rows kept by all the predicates, names of the predicates in evaluation order)
+    """
+
+    filters_crossed = []
+    done = [] # Predicates already applied to 'rows'
+    if rows is not None:
+        cache = None
+
+    # Nothing is timed nor counted without instrumentation sink or DEBUG messages
+    measured = observed()
+    cache_status = None
 
     # -------------------------------------------------------------------
-    #                            FINAL PROCESSES
+    #                           RESULT CACHE
     # -------------------------------------------------------------------
-    # No words found
-    if dataframe.shape[0] == 0:
-        logging.info("No words found")
+    if cache is not None and predicates:
+        index = predicates[0].index
+        rows = cache.get(index, predicates)
+        if rows is not None:
+            if measured:
+                report({"event": "plan", "name": "plan", "plan": [predicate.name for predicate in predicates],
+                        "cache": "hit", "seconds": 0.0})
+            return rows, [predicate.name for predicate in predicates]
+
+        # Result of the largest part of the query already computed
+        done, rows = cache.get_partial(index, predicates)
+        if rows is not None:
+            cache_status = "partial"
+            filters_crossed += [predicate.name for predicate in done]
+            predicates = [predicate for predicate in predicates if predicate not in done]
+        else:
+            cache_status = "miss"
+            done = []
 
-    # Final stats
-    logging.debug(f"""
-    -- FINAL STATS -- 
-    Total execution time : {round(time() - INIT_TIME, 3)}s
-    Filters crossed = {len(filters_crossed)}/8 -> {filters_crossed}
-    Total rows deleted : {INIT_SHAPE - dataframe.shape[0]}
-    From {INIT_SHAPE} to {dataframe.shape[0]} -> (-{percent(INIT_SHAPE - dataframe.shape[0], INIT_SHAPE, rnd=4)}%)
-    """)
+    # -------------------------------------------------------------------
+    #                            QUERY PLAN
+    # -------------------------------------------------------------------
+    # The most selective index-backed filter (length, start_with, end_with, anagram, pattern) gives the initial
+    # rows, the other filters are then applied to the remaining rows, the most selective first
+    total = len(done) + len(predicates) # Number of steps of the query
+    start_time = perf_counter() if measured else 0.0
+    driver, steps, estimates = plan(predicates)
+    if rows is not None and driver is not None:
+        # Rows already given by the cache: all the predicates are filters
+        steps = sorted([driver] + steps, key=lambda predicate: estimates[predicate])
+        driver = None
+
+    if measured:
+        query_plan = [f"{predicate.name} (cached)" for predicate in done]
+        query_plan += [f"{predicate.name} (select by {predicate.describe()}, ~{round(estimates[predicate])} rows)"
+                       for predicate in [driver] if predicate is not None]
+        query_plan += [f"{predicate.name} (filter, ~{round(estimates[predicate])} rows)" for predicate in steps]
+        report({"event": "plan", "name": "plan", "plan": query_plan, "cache": cache_status,
+                "seconds": perf_counter() - start_time})
 
-    return dataframe
+    # -------------------------------------------------------------------
+    #                             FILTERS
+    # -------------------------------------------------------------------
+    if driver is not None:
+        start_time = perf_counter() if measured else 0.0
+        rows = driver.selected()
+        if measured:
+            report({"event": "filter", "name": driver.name, "mode": "select", "step": 1, "steps": total,
+                    "estimate": estimates[driver], "rows_total": size, "rows_before": size, "rows_after": len(rows),
+                    "seconds": perf_counter() - start_time})
+        filters_crossed.append(driver.name)
+        done.append(driver)
+        if cache is not None:
+            rows = cache.put(driver.index, done, rows)
+    elif rows is None:
+        rows = np.arange(size)
+
+    for predicate in steps:
+        punctual_shape = len(rows)
+        start_time = perf_counter() if measured else 0.0
+
+        # A predicate shared with other queries is evaluated once over the whole column
+        rows = rows[predicate.shared_filter(rows) if predicate in shared else predicate.filter(rows)]
+
+        if measured:
+            report({"event": "filter", "name": predicate.name, "mode": "shared" if predicate in shared else "filter",
+                    "step": len(filters_crossed) + 1, "steps": total, "estimate": estimates[predicate],
+                    "rows_total": size, "rows_before": punctual_shape, "rows_after": len(rows),
+                    "seconds": perf_counter() - start_time})
+        filters_crossed.append(predicate.name)
+
+        # Each step of the plan is a partial query other queries can start from
+        done.append(predicate)
+        if cache is not None:
+            rows = cache.put(predicate.index, done, rows)
+
+    return rows, filters_crossed
+
+# ===================================================================
+#                           QUERIES BATCH
+# ===================================================================
+# Filters accepted in the queries of 'multi_filters_batch()'
+QUERY_ARGUMENTS = ("no_comp", "length", "start_with", "end_with", "nth_letters", "contains", "not_contain", "anagram",
+                   "pattern", "accent_insensitive")
+
+def multi_filters_batch(dataframe: pd.DataFrame, col_name: str, queries: list[dict],
+                        log="info") -> Optional[list[Optional[pd.DataFrame]]]:
+    """ Evaluates many 'multi_filters()' queries on the same column at once.
+
+    The dataframe and the logging level are only checked and set once. The
+    queries are converted into predicates, and the identical predicates of
+    different queries (same length, same prefix, same letters...) are
+    shared: each distinct predicate is evaluated once, vectorized over the
+    whole column, and its result reused by all the queries using it. The
+    predicates used by a single query are only evaluated on its remaining
+    rows.
+
+    Args:
+        dataframe (pandas.DataFrame): Pandas dataframe containing the column of words to be filtered
+        col_name (str): Name of column to filter.
+        queries (list): Filters of each query, as dicts of 'multi_filters()' arguments (see QUERY_ARGUMENTS), such
+        as {"length": 5, "start_with": "g"}.
+        log (str): Logging level (debug, info, warning, critical), None to only display the CRITICAL.
+
+    Returns:
+        (list): Filtered dataframe of each query, in the order of the queries. None for the queries with wrong
+        arguments.
+        (None): Wrong dataframe or column.
+
+    Example:
+        multi_filters_batch(df, "Mot", [{"length": 5, "start_with": "g"}, {"length": 5, "end_with": "it"}])
+    """
+
+    set_log_level(log)
+
+    if not _check_dataframe(dataframe, col_name):
+        return None
+
+    start_time = perf_counter()
+    index = get_index(dataframe, col_name)
+
+    # Predicates of each query, the identical ones being shared
+    shared = {}
+    queries_predicates = []
+    for query in queries:
+        if not isinstance(query, dict) or not set(query) <= set(QUERY_ARGUMENTS):
+            logger.critical(f"""Each query must be a dict of filters among {QUERY_ARGUMENTS}. 
+            {query} given""")
+            queries_predicates.append(None)
+        else:
+            queries_predicates.append(build_predicates(index, shared=shared, **query))
+
+    # Predicates used by several queries
+    uses = Counter(predicate for predicates in queries_predicates if predicates is not None
+                   for predicate in predicates)
+    common = {predicate for predicate, count in uses.items() if count > 1}
+
+    results = []
+    for predicates in queries_predicates:
+        if predicates is None:
+            results.append(None)
+            continue
+
+        query_time = perf_counter()
+        rows, filters_crossed = run_plan(predicates, len(dataframe), shared=common, cache=_result_cache)
+        results.append(dataframe.iloc[rows])
+
+        if observed():
+            report({"event": "query", "name": "multi_filters_batch", "filters": filters_crossed,
+                    "rows_total": len(dataframe), "rows_after": len(rows), "seconds": perf_counter() - query_time})
+
+    if observed():
+        report({"event": "batch", "name": "multi_filters_batch", "queries": len(queries), "filters": len(uses),
+                "shared": len(common), "seconds": perf_counter() - start_time})
+
+    return results
+
+# ===================================================================
+#                           PATTERNS BATCH
+# ===================================================================
+def _pattern_case(pattern: str, accent_insensitive: bool) -> str:
+    """ Pattern letters compared like those of 'start_with': normalized, or capitalized like the dictionary words. """
+    return fold(pattern) if accent_insensitive else pattern.capitalize()
+
+def match_patterns(dataframe: pd.DataFrame, col_name: str, patterns: list[str], no_comp: bool = True,
+                   accent_insensitive: bool = False, log="info") -> Optional[dict]:
+    """ Finds the words matching each of several patterns, such as the slots of a crossword grid.
+
+    The patterns without "*" are grouped by length: the words of each length
+    are selected once, and the letters of their code point matrix are read
+    once for all the patterns of the group, each pattern then being a few
+    vectorized comparisons over these words. The other patterns are passed
+    to 'multi_filters()'.
+
+    Args:
+        dataframe (pandas.DataFrame): Pandas dataframe containing the column of words to be filtered
+        col_name (str): Name of column to filter.
+        patterns (list): Patterns, "?" standing for any letter and "*" for any sequence of letters.
+        no_comp (bool): Remove compound words from the analysis.
+        accent_insensitive (bool): The letters of the patterns match the words regardless of accents and case.
+        log (str): Logging level (debug, info, warning, critical), None to only display the CRITICAL.
+
+    Returns:
+        (dict): Filtered dataframe of each pattern.
+        (None): Wrong arguments.
+    """
+
+    set_log_level(log)
+
+    if not _check_dataframe(dataframe, col_name):
+        return None
+
+    elif not isinstance(patterns, list) or not all(isinstance(x, str) and x for x in patterns):
+        logger.critical("""'patterns' must be a list of non-empty str.""")
+        return None
+
+    start_time = perf_counter()
+    index = get_index(dataframe, col_name)
+    results = {}
+
+    # Patterns of fixed length, by length
+    groups = {}
+    for pattern in dict.fromkeys(patterns): # remove duplicates, keep the order
+        if ANY_SEQUENCE in pattern:
+            results[pattern] = multi_filters(dataframe, col_name, no_comp=no_comp, pattern=pattern,
+                                             accent_insensitive=accent_insensitive, log=log)
+        else:
+            compiled = Pattern(index, _pattern_case(pattern, accent_insensitive), folded=accent_insensitive)
+            groups.setdefault(compiled.length, []).append((pattern, compiled))
+
+    matrix = index.folded_codepoints if accent_insensitive else index.codepoints
+    for length, group in groups.items():
+        # Shared by the patterns of the group: the words of this length and their letters
+        rows = index.length_rows(length, folded=accent_insensitive)
+        if no_comp:
+            rows = rows[~index.compound[rows]]
+        letters = matrix[rows] if length <= matrix.shape[1] else None
+
+        for pattern, compiled in group:
+            mask = np.ones(len(rows), dtype=bool)
+            for rank, letter in compiled.letters.items():
+                if letters is not None:
+                    mask &= letters[:, rank - 1] == ord(letter)
+                else:
+                    mask &= index.letter_mask(rows, rank, letter, folded=accent_insensitive)
+            results[pattern] = dataframe.iloc[rows[mask]]
+
+    if observed():
+        report({"event": "patterns", "name": "match_patterns", "patterns": len(results), "lengths": len(groups),
+                "seconds": perf_counter() - start_time})
+
+    return {pattern: results[pattern] for pattern in patterns}
+
+# ===================================================================
+#                          STREAMING FILTERS
+# ===================================================================
+# Number of words filtered at once by 'stream_filters()'
+STREAM_CHUNK = 50000
+
+def stream_filters(source: Optional[Union[CompiledDictionary, str]] = None, no_comp: bool = True,
+                   length: Optional[int] = None,
+                   start_with: Optional[str] = None,
+                   end_with: Optional[str] = None,
+                   nth_letters: Optional[list[list[int | str]]] = None,
+                   contains: Optional[Union[list[str], dict[str, int]]] = None,
+                   not_contain: Optional[list[str]] = None,
+                   anagram: Optional[list[str]] = None,
+                   pattern: Optional[str] = None,
+                   accent_insensitive: bool = False,
+                   limit: Optional[int] = None,
+                   definitions: bool = False,
+                   chunk_size: int = STREAM_CHUNK,
+                   log="info") -> Optional[Iterator]:
+    """ Filters the words of a compiled dictionary chunk by chunk, yielding the matching words as they are found.
+
+    Unlike 'multi_filters()', no dataframe is built: the words are read
+    from the file 'chunk_size' at a time, and each chunk is filtered with
+    the same predicates and query plan, over an index of the chunk only.
+    Memory usage thus depends on the size of the chunks, not on the size of
+    the dictionary. The first words are yielded once the first chunk has
+    been filtered, and the dictionary isn't read any further once 'limit'
+    words have been found.
+
+    Args:
+        source (CompiledDictionary or str): Compiled dictionary, or path of a compiled dictionary file. The
+        dictionary of the module by default.
+        limit (int): Maximum number of words yielded, None for all of them.
+        definitions (bool): Yield (word, definitions list) tuples instead of the words.
+        chunk_size (int): Number of words filtered at once.
+        Other arguments: See 'multi_filters()'.
+
+    Returns:
+        (generator): Matching words (or (word, definitions) tuples), in alphabetical order.
+        (None): Wrong arguments.
+
+    Example:
+        for word in stream_filters(length=7, start_with="g", limit=10):
+            print(word)
+    """
+
+    set_log_level(log)
+
+    # -------------------------------------------------------------------
+    #                          ARGUMENTS CHECK
+    # -------------------------------------------------------------------
+    if source is None:
+        source = dico
+    elif isinstance(source, str):
+        if not os.path.exists(source):
+            logger.critical(f"""
+            '{source}' doesn't exist.""")
+            return None
+        source = CompiledDictionary(source)
+    elif not isinstance(source, CompiledDictionary):
+        logger.critical(f"""'source' must be a CompiledDictionary or the path of a compiled dictionary. 
+        {type(source)} given""")
+        return None
+
+    if limit is not None and (not isinstance(limit, int) or limit < 1):
+        logger.critical(f"""'limit' must be an int greater than 0. 
+        {limit} given""")
+        return None
+
+    if not isinstance(chunk_size, int) or chunk_size < 1:
+        logger.critical(f"""'chunk_size' must be an int greater than 0. 
+        {chunk_size} given""")
+        return None
+
+    # The filters are checked once, before anything is read (the predicates only hold them)
+    filters = {"no_comp": no_comp, "length": length, "start_with": start_with, "end_with": end_with,
+               "nth_letters": nth_letters, "contains": contains, "not_contain": not_contain, "anagram": anagram,
+               "pattern": pattern, "accent_insensitive": accent_insensitive}
+    if build_predicates(WordIndex([]), **filters) is None:
+        return None
+
+    if log is not None:
+        print("Filtering...")
+    return _stream(source, filters, limit, definitions, chunk_size)
+
+def _stream(source: CompiledDictionary, filters: dict, limit: Optional[int], definitions: bool,
+            chunk_size: int) -> Iterator:
+    """ Generator of 'stream_filters()'. """
+
+    start_time = perf_counter()
+    filters_crossed = {} # Filters crossed by any chunk, in order of first use (the plan depends on the chunk)
+    read = found = 0
+
+    try:
+        for start in range(0, len(source), chunk_size):
+            stop = min(start + chunk_size, len(source))
+
+            # Index of the chunk only, dropped with it
+            index = WordIndex(source.words[start:stop], folded=source.folded[start:stop], ordered=True)
+            rows, chunk_filters = run_plan(build_predicates(index, **filters), stop - start)
+            filters_crossed.update(dict.fromkeys(chunk_filters))
+            read = stop
+
+            for row in rows.tolist():
+                word = index.words[row]
+                found += 1 # Counted before being yielded: the consumer may stop at this word
+                yield (word, source.definitions(start + row)) if definitions else word
+                if found == limit:
+                    return
+    finally:
+        # Also sent when the consumer stops early
+        if observed():
+            report({"event": "query", "name": "stream_filters", "filters": list(filters_crossed), "rows_total": read,
+                    "rows_after": found, "seconds": perf_counter() - start_time})
+
+# ===================================================================
+#                        REFINEMENT SESSIONS
+# ===================================================================
+# Number of refinements a session can undo
+UNDO_HISTORY = 32
+
+class FilterSession:
+    """ Query refined one set of filters at a time, such as the guesses of a Motus or Wordle game.
+
+    The session keeps the rows of the current candidates. Each refinement
+    only filters them, so that it takes a time proportional to the number
+    of candidates left, not to the size of the dictionary; the first one
+    starts from the indexes of the column, like 'multi_filters()'. The
+    previous candidates are kept in a stack, so that the last refinements
+    can be undone.
+
+    Args:
+        dataframe (pandas.DataFrame): Pandas dataframe containing the column of words to be filtered.
+        col_name (str): Name of column to filter.
+        no_comp (bool): Remove compound words from the candidates.
+        accent_insensitive (bool): The letters of all the refinements match the words regardless of accents and case
+        (see 'multi_filters()').
+        history (int): Number of refinements that can be undone.
+        log (str): Logging level (debug, info, warning, critical), None to only display the CRITICAL.
+
+    Example:
+        session = FilterSession(df, "Mot")
+        session.refine(length=5, start_with="t")
+        session.refine(not_contain=["a", "e"], nth_letters=[[3, "r"]])
+        session.words()
+        session.undo()
+    """
+
+    def __init__(self, dataframe: pd.DataFrame, col_name: str, no_comp: bool = True,
+                 accent_insensitive: bool = False, history: int = UNDO_HISTORY, log="info"):
+        set_log_level(log)
+        if not _check_dataframe(dataframe, col_name):
+            raise ValueError(f"'{col_name}' column of a Pandas dataframe expected")
+
+        self.dataframe = dataframe
+        self.col_name = col_name
+        self.no_comp = no_comp
+        self.accent_insensitive = accent_insensitive
+        self.log = log
+        self.index = get_index(dataframe, col_name)
+        self._rows = None # Rows of the candidates, None before the first refinement (all the rows)
+        self._history = deque(maxlen=history) # Rows before each refinement
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    @property
+    def rows(self) -> np.ndarray:
+        """ Sorted rows of the current candidates (positions in the dataframe). """
+        if self._rows is not None:
+            return self._rows
+        rows = np.arange(self.index.size)
+        return rows[~self.index.compound] if self.no_comp else rows
+
+    def refine(self, length: Optional[int] = None,
+               start_with: Optional[str] = None,
+               end_with: Optional[str] = None,
+               nth_letters: Optional[list[list[int | str]]] = None,
+               contains: Optional[Union[list[str], dict[str, int]]] = None,
+               not_contain: Optional[list[str]] = None,
+               anagram: Optional[list[str]] = None,
+               pattern: Optional[str] = None) -> Optional[pd.DataFrame]:
+        """ Keeps the candidates matching new filters (see 'multi_filters()' for the filters).
+
+        Returns:
+            (pandas.DataFrame): Candidates left.
+            (None): Wrong arguments, the candidates are left unchanged.
+        """
+
+        set_log_level(self.log)
+        start_time = perf_counter()
+
+        # The compound words are removed along with the first filters
+        predicates = build_predicates(self.index, no_comp=self.no_comp and self._rows is None, length=length,
+                                      start_with=start_with, end_with=end_with, nth_letters=nth_letters,
+                                      contains=contains, not_contain=not_contain, anagram=anagram, pattern=pattern,
+                                      accent_insensitive=self.accent_insensitive)
+        if predicates is None:
+            return None
+
+        rows_before = len(self.rows)
+        rows, filters_crossed = run_plan(predicates, self.index.size, rows=self._rows)
+        self._history.append(self._rows)
+        self._rows = rows
+
+        if not len(rows):
+            logger.info("No words found")
+
+        if observed():
+            report({"event": "query", "name": "refine", "filters": filters_crossed, "rows_total": rows_before,
+                    "rows_after": len(rows), "seconds": perf_counter() - start_time})
+
+        return self.result()
+
+    def undo(self) -> bool:
+        """ Restores the candidates before the last refinement.
+
+        Returns:
+            (bool): False if there was no refinement to undo (or the history was exceeded).
+        """
+
+        if not self._history:
+            return False
+        self._rows = self._history.pop()
+        return True
+
+    def reset(self):
+        """ Back to all the words of the column, without history. """
+        self._rows = None
+        self._history.clear()
+
+    def result(self) -> pd.DataFrame:
+        """ Dataframe of the current candidates. """
+        return self.dataframe.iloc[self.rows]
+
+    def words(self) -> list:
+        """ Current candidates, as a list of words. """
+        return self.dataframe[self.col_name].iloc[self.rows].tolist()
 
 # ===================================================================
 #                               MAIN
 # ===================================================================
 if __name__ == "__main__":
+    df = dico.to_dataframe()
+
     # Various filters
     dict_filtered = multi_filters(df,
                                   col_name="Mot",
@@ -471,4 +1033,23 @@ if __name__ == "__main__":
                                col_name="Mot",
                                anagram=["c","a","r","t","e"],
                                length=5)
-    print(by_anagram)
\ No newline at end of file
+    print(by_anagram)
+
+    # By pattern
+    by_pattern = multi_filters(df,
+                               col_name="Mot",
+                               pattern="G?A??IT")
+    print(by_pattern)
+
+    # Several patterns at once (slots of a crossword grid)
+    for slot, words in match_patterns(df, col_name="Mot", patterns=["C?R?E", "?RAC?", "RE*TION"]).items():
+        print(slot, words["Mot"].tolist())
+
+    # Streamed from the dictionary file, without dataframe
+    print(list(stream_filters(start_with="g", end_with="it", length=7, limit=10)))
+
+    # Refined guess after guess
+    session = FilterSession(df, "Mot")
+    session.refine(length=5, start_with="t")
+    session.refine(not_contain=["a", "e"], nth_letters=[[3, "r"]])
+    print(session.words())
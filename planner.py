@@ -0,0 +1,528 @@
+import re
+import weakref
+import threading
+from abc import ABC, abstractmethod
+from itertools import combinations, count
+from collections import Counter, OrderedDict
+from typing import Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from word_index import BLANK_TILES, WordIndex, fold
+
+# Pattern wildcards: any letter, any sequence of letters
+ANY_LETTER = "?"
+ANY_SEQUENCE = "*"
+WILDCARDS = (ANY_LETTER, ANY_SEQUENCE)
+WILDCARDS_REGEX = r"[?*]"
+
+# ===================================================================
+#                             UTILS
+# ===================================================================
+def in_rows(positions: np.ndarray, rows: np.ndarray) -> np.ndarray:
+    """ Which of the positions are in 'rows' (both sorted), by binary search.
+
+    Returns:
+        (numpy.ndarray): Boolean mask over 'positions'.
+    """
+
+    if not len(rows):
+        return np.zeros(len(positions), dtype=bool)
+    found = np.searchsorted(rows, positions)
+    return rows[np.minimum(found, len(rows) - 1)] == positions
+
+# ===================================================================
+#                            PREDICATES
+# ===================================================================
+class Predicate(ABC):
+    """ A filter of 'multi_filters()', evaluated over the rows of a word index.
+
+    Each predicate can estimate, from cheap statistics of the index, how
+    many words of the column it keeps. The predicates backed by a lookup
+    structure ('indexed') can also select their rows directly, without
+    reading the other rows; the others can only filter a set of rows.
+
+    Args:
+        index (WordIndex): Index of the column of words.
+        folded (bool): The letters are compared with the normalized words (see 'word_index.fold()').
+    """
+
+    name = ""
+    indexed = False
+
+    def __init__(self, index: WordIndex, folded: bool = False):
+        self.index = index
+        self.folded = folded
+        self._selected = None # Result of 'select()'
+        self._mask = None # Result of 'filter()' over the whole column
+
+    @property
+    def key(self) -> tuple:
+        """ Identifies the predicate: two predicates with the same key keep the same words. """
+        return type(self).__name__, self.folded
+
+    @abstractmethod
+    def estimate(self) -> float:
+        """ Expected number of words of the column kept by the predicate. """
+
+    def select(self) -> np.ndarray:
+        """ Sorted rows of the column kept by the predicate. """
+        rows = np.arange(self.index.size)
+        return rows[self.filter(rows)]
+
+    def filter(self, rows: np.ndarray) -> np.ndarray:
+        """ Which of the given rows are kept by the predicate.
+
+        Returns:
+            (numpy.ndarray): Boolean mask over 'rows'.
+        """
+        return in_rows(rows, self.selected())
+
+    def selected(self) -> np.ndarray:
+        """ Same as 'select()', computed once. """
+        if self._selected is None:
+            self._selected = self.select()
+        return self._selected
+
+    def shared_filter(self, rows: np.ndarray) -> np.ndarray:
+        """ Same as 'filter()', from the result of the predicate over the whole column, computed once and reused by
+        all the queries sharing the predicate. """
+
+        if self.indexed:
+            return in_rows(rows, self.selected())
+        if self._mask is None:
+            self._mask = self.filter(np.arange(self.index.size))
+        return self._mask[rows]
+
+    def describe(self) -> str:
+        """ Access method of the predicate, as shown in the query plan. """
+        return "index lookup" if self.indexed else "scan"
+
+    def _words(self, rows: np.ndarray) -> pd.Series:
+        """ Words (or normalized words) of the given rows. """
+        words = self.index.folded_array if self.folded else self.index.word_array
+        return pd.Series(words[rows], dtype=object)
+
+class NoCompound(Predicate):
+    """ Words without a space or a hyphen. """
+
+    name = "no_comp"
+
+    def estimate(self) -> float:
+        return self.index.size - self.index.compound_count
+
+    def filter(self, rows: np.ndarray) -> np.ndarray:
+        return ~self.index.compound[rows]
+
+class Length(Predicate):
+    """ Words of a given length. """
+
+    name = "length"
+    indexed = True
+
+    def __init__(self, index: WordIndex, length: int):
+        super().__init__(index)
+        self.length = length
+
+    @property
+    def key(self) -> tuple:
+        return super().key + (self.length,)
+
+    def estimate(self) -> float:
+        histogram = self.index.length_histogram
+        return int(histogram[self.length]) if 0 <= self.length < len(histogram) else 0
+
+    def select(self) -> np.ndarray:
+        return self.index.length_rows(self.length)
+
+    def filter(self, rows: np.ndarray) -> np.ndarray:
+        return self.index.lengths[rows] == self.length
+
+class StartWith(Predicate):
+    """ Words beginning with a prefix: a range of the sorted words. """
+
+    name = "start_with"
+    indexed = True
+
+    def __init__(self, index: WordIndex, prefix: str, folded: bool = False):
+        super().__init__(index, folded)
+        self.prefix = prefix
+
+    @property
+    def key(self) -> tuple:
+        return super().key + (self.prefix,)
+
+    def estimate(self) -> float:
+        return self.index.prefix_count(self.prefix, self.folded)
+
+    def select(self) -> np.ndarray:
+        return self.index.prefix_rows(self.prefix, self.folded)
+
+    def filter(self, rows: np.ndarray) -> np.ndarray:
+        # Fewer rows left than words in the range: the rows are read instead of sorting the range
+        if len(rows) < self.estimate():
+            return self._words(rows).str.startswith(self.prefix).to_numpy(dtype=bool)
+        return super().filter(rows)
+
+class EndWith(Predicate):
+    """ Words ending with a suffix: a range of the sorted reversed words. """
+
+    name = "end_with"
+    indexed = True
+
+    def __init__(self, index: WordIndex, suffix: str, folded: bool = False):
+        super().__init__(index, folded)
+        self.suffix = suffix
+
+    @property
+    def key(self) -> tuple:
+        return super().key + (self.suffix,)
+
+    def estimate(self) -> float:
+        return self.index.suffix_count(self.suffix, self.folded)
+
+    def select(self) -> np.ndarray:
+        return self.index.suffix_rows(self.suffix, self.folded)
+
+    def filter(self, rows: np.ndarray) -> np.ndarray:
+        if len(rows) < self.estimate():
+            return self._words(rows).str.endswith(self.suffix).to_numpy(dtype=bool)
+        return super().filter(rows)
+
+class NthLetters(Predicate):
+    """ Words having given letters at given positions. """
+
+    name = "nth_letters"
+
+    def __init__(self, index: WordIndex, letters: dict, folded: bool = False):
+        super().__init__(index, folded)
+        self.letters = letters
+
+    @property
+    def key(self) -> tuple:
+        return super().key + (tuple(sorted(self.letters.items())),)
+
+    def estimate(self) -> float:
+        # Positions assumed independent
+        estimate = self.index.size
+        for rank, letter in self.letters.items():
+            estimate *= self.index.position_frequency(rank, letter, self.folded) / max(self.index.size, 1)
+        return estimate
+
+    def filter(self, rows: np.ndarray) -> np.ndarray:
+        mask = np.ones(len(rows), dtype=bool)
+        for rank, letter in self.letters.items():
+            mask &= self.index.letter_mask(rows, rank, letter, folded=self.folded)
+        return mask
+
+class Contains(Predicate):
+    """ Words containing letters, at least a given number of times each. Items of several letters are searched as
+    substrings. """
+
+    name = "contains"
+
+    def __init__(self, index: WordIndex, letters: Counter, folded: bool = False):
+        super().__init__(index, folded)
+        self.letters = {x: n for x, n in letters.items() if len(x) == 1}
+        self.strings = [x for x in letters if len(x) != 1]
+
+    @property
+    def key(self) -> tuple:
+        return super().key + (tuple(sorted(self.letters.items())), tuple(sorted(self.strings)))
+
+    def estimate(self) -> float:
+        # Letters assumed independent. A substring is at most as frequent as each of its letters.
+        estimate = self.index.size
+        for letter in list(self.letters) + self.strings:
+            frequency = min((self.index.letter_frequency(char, self.folded) for char in letter), default=0)
+            estimate *= frequency / max(self.index.size, 1)
+        return estimate
+
+    def filter(self, rows: np.ndarray) -> np.ndarray:
+        mask = self.index.contains_mask(rows, self.letters, folded=self.folded)
+        for string in self.strings:
+            candidates = np.flatnonzero(mask)
+            mask[candidates] = self._words(rows[candidates]).str.contains(string, regex=False).to_numpy(dtype=bool)
+        return mask
+
+class NotContain(Predicate):
+    """ Words containing none of the given letters. Items of several letters are searched as substrings. """
+
+    name = "not_contain"
+
+    def __init__(self, index: WordIndex, letters: set, folded: bool = False):
+        super().__init__(index, folded)
+        self.letters = [x for x in letters if len(x) == 1]
+        self.strings = [x for x in letters if len(x) != 1]
+
+    @property
+    def key(self) -> tuple:
+        return super().key + (tuple(sorted(self.letters)), tuple(sorted(self.strings)))
+
+    def estimate(self) -> float:
+        estimate = self.index.size
+        for letter in self.letters:
+            estimate *= 1 - self.index.letter_frequency(letter, self.folded) / max(self.index.size, 1)
+        return estimate
+
+    def filter(self, rows: np.ndarray) -> np.ndarray:
+        mask = self.index.excludes_mask(rows, self.letters, folded=self.folded)
+        for string in self.strings:
+            candidates = np.flatnonzero(mask)
+            mask[candidates] = ~self._words(rows[candidates]).str.contains(string, regex=False).to_numpy(dtype=bool)
+        return mask
+
+class Anagram(Predicate):
+    """ Words that can be written with some or all of the given tiles (see 'WordIndex.anagram_rows()'). """
+
+    name = "anagram"
+    indexed = True
+
+    def __init__(self, index: WordIndex, tiles: Sequence[str], length: Optional[int] = None):
+        super().__init__(index)
+        self.tiles = tiles
+        self.length = length
+
+    @property
+    def key(self) -> tuple:
+        # The letters are compared without accents nor case, and their order doesn't matter: the rack is identified
+        # by its sorted normalized letters and its number of blank tiles
+        letters = fold("".join(tile for tile in self.tiles if tile not in BLANK_TILES))
+        blanks = sum(tile in BLANK_TILES for tile in self.tiles)
+        return super().key + ("".join(sorted(letters)), blanks, self.length)
+
+    def estimate(self) -> float:
+        # The search costs about as much as its answers: they are computed once and counted exactly
+        return len(self.selected())
+
+    def select(self) -> np.ndarray:
+        return self.index.anagram_rows(self.tiles, self.length)
+
+    def filter(self, rows: np.ndarray) -> np.ndarray:
+        return in_rows(rows, self.selected())
+
+class Pattern(Predicate):
+    """ Words matching a pattern in which "?" stands for any letter and "*" for any sequence of letters (possibly
+    empty), such as "G?A??IT" or "RE*TION".
+
+    A pattern without "*" is compiled into a length and letters at given
+    positions; otherwise, into a minimum length, the letters it begins and
+    ends with, and a regular expression checked on the remaining words only.
+    """
+
+    name = "pattern"
+    indexed = True
+
+    def __init__(self, index: WordIndex, pattern: str, folded: bool = False):
+        super().__init__(index, folded)
+        self.pattern = pattern
+        self.fixed = ANY_SEQUENCE not in pattern
+        self.length = len(pattern.replace(ANY_SEQUENCE, "")) # Exact length if 'fixed', minimum length otherwise
+        self.letters = {rank: char for rank, char in enumerate(pattern, 1) if char not in WILDCARDS} \
+            if self.fixed else {}
+
+        # Letters before the first wildcard and after the last one
+        self.prefix = re.split(WILDCARDS_REGEX, pattern)[0]
+        self.suffix = re.split(WILDCARDS_REGEX, pattern)[-1] if not self.fixed else ""
+        self.regex = "".join(".*" if char == ANY_SEQUENCE else "." if char == ANY_LETTER else re.escape(char)
+                             for char in pattern)
+
+    @property
+    def key(self) -> tuple:
+        return super().key + (self.pattern,)
+
+    def estimate(self) -> float:
+        if self.fixed:
+            # Positions assumed independent
+            histogram = self.index.folded_length_histogram if self.folded else self.index.length_histogram
+            estimate = int(histogram[self.length]) if self.length < len(histogram) else 0
+            for rank, letter in self.letters.items():
+                estimate *= self.index.position_frequency(rank, letter, self.folded) / max(self.index.size, 1)
+            return estimate
+        return min(self.index.prefix_count(self.prefix, self.folded), self.index.suffix_count(self.suffix, self.folded))
+
+    def _candidates(self) -> np.ndarray:
+        """ Smallest set of rows given by an index: words of the right length, or beginning or ending with the
+        letters of the pattern. """
+
+        if self.fixed:
+            rows = self.index.length_rows(self.length, self.folded)
+            if self.prefix and self.index.prefix_count(self.prefix, self.folded) < len(rows):
+                rows = self.index.prefix_rows(self.prefix, self.folded)
+            return rows
+
+        if self.index.prefix_count(self.prefix, self.folded) <= self.index.suffix_count(self.suffix, self.folded):
+            return self.index.prefix_rows(self.prefix, self.folded)
+        return self.index.suffix_rows(self.suffix, self.folded)
+
+    def select(self) -> np.ndarray:
+        rows = self._candidates()
+        return rows[self.filter(rows)]
+
+    def filter(self, rows: np.ndarray) -> np.ndarray:
+        lengths = self.index.folded_lengths if self.folded else self.index.lengths
+
+        if self.fixed:
+            mask = lengths[rows] == self.length
+            for rank, letter in self.letters.items():
+                candidates = np.flatnonzero(mask)
+                mask[candidates] = self.index.letter_mask(rows[candidates], rank, letter, folded=self.folded)
+            return mask
+
+        mask = lengths[rows] >= self.length
+        candidates = np.flatnonzero(mask)
+        mask[candidates] = self._words(rows[candidates]).str.fullmatch(self.regex, flags=re.DOTALL) \
+            .to_numpy(dtype=bool)
+        return mask
+
+# ===================================================================
+#                              PLANNER
+# ===================================================================
+def plan(predicates: Sequence[Predicate]) -> tuple:
+    """ Chooses the order in which the predicates of a query are evaluated.
+
+    The indexed predicate expected to keep the fewest words selects the
+    initial rows; without any, all the rows of the column are taken. The
+    other predicates then filter the remaining rows, the most selective
+    first, so that each one reads as few rows as possible.
+
+    Args:
+        predicates (Sequence[Predicate]): Predicates of the query.
+
+    Returns:
+        (tuple): (predicate selecting the initial rows or None, other predicates in evaluation order, estimate of
+        each predicate).
+    """
+
+    estimates = {predicate: predicate.estimate() for predicate in predicates}
+    ordered = sorted(predicates, key=lambda predicate: estimates[predicate])
+
+    driver = next((predicate for predicate in ordered if predicate.indexed), None)
+    return driver, [predicate for predicate in ordered if predicate is not driver], estimates
+
+# ===================================================================
+#                            RESULT CACHE
+# ===================================================================
+class ResultCache:
+    """ Bounded cache of query results, as row ids of a word index, with LRU eviction.
+
+    A result is identified by the index it was computed on and by the
+    canonical form of its predicates: the sorted keys of the predicates,
+    whose arguments are already normalized (sorted letters, capitalized or
+    folded case...), so that equivalent queries written differently share
+    their result. The results of partial queries (the first steps of a plan)
+    are cached too, and reused by the queries sharing these predicates.
+
+    The results of an index are dropped when the index is garbage collected:
+    a dictionary, a dataframe or a column replaced (or 'word_index.invalidate()'
+    called after modifying words in place) gets a new index, and new results.
+
+    Args:
+        maxsize (int): Maximum number of results kept.
+    """
+
+    # Largest number of predicates for which all the partial queries are looked up
+    MAX_PARTIAL = 8
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.partial_hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.RLock() # Reentrant: the keys are computed with it held, and take it for the tokens
+        self._tokens = weakref.WeakKeyDictionary() # Identifier of each index
+        self._finalizers = {} # Token -> finalizer dropping the results of the index when it is collected
+        self._next_token = count()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _token(self, index: WordIndex) -> int:
+        with self._lock:
+            token = self._tokens.get(index)
+            if token is None:
+                token = self._tokens[index] = next(self._next_token)
+                # Through a weak reference: the index must not keep the cache alive
+                self._finalizers[token] = weakref.finalize(index, _discard, weakref.ref(self), token)
+            return token
+
+    def _key(self, index: WordIndex, predicates: Sequence[Predicate]) -> tuple:
+        """ Canonical form of a query. """
+        return (self._token(index),) + tuple(sorted({predicate.key for predicate in predicates}, key=repr))
+
+    def get(self, index: WordIndex, predicates: Sequence[Predicate]) -> Optional[np.ndarray]:
+        """ Rows kept by the predicates, None if not cached. """
+
+        key = self._key(index, predicates)
+        with self._lock:
+            rows = self._entries.get(key)
+            if rows is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return rows
+
+    def get_partial(self, index: WordIndex, predicates: Sequence[Predicate]) -> tuple:
+        """ Cached result of the largest subset of the predicates.
+
+        Returns:
+            (tuple): (predicates of the subset, their rows), (None, None) if no subset is cached.
+        """
+
+        if len(predicates) > self.MAX_PARTIAL:
+            return None, None
+
+        with self._lock:
+            for size in range(len(predicates) - 1, 0, -1):
+                for subset in combinations(predicates, size):
+                    key = self._key(index, subset)
+                    if key in self._entries:
+                        self._entries.move_to_end(key)
+                        self.partial_hits += 1
+                        return list(subset), self._entries[key]
+        return None, None
+
+    def put(self, index: WordIndex, predicates: Sequence[Predicate], rows: np.ndarray) -> np.ndarray:
+        """ Caches the rows kept by the predicates, as a compact read-only array. Returns the cached array. """
+
+        rows = np.array(rows, dtype=np.int32 if index.size < 2 ** 31 else np.int64)
+        rows.setflags(write=False)
+
+        key = self._key(index, predicates)
+        with self._lock:
+            self._entries[key] = rows
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return rows
+
+    def discard(self, token: int):
+        """ Drops the results of an index. """
+        with self._lock:
+            self._finalizers.pop(token, None)
+            for key in [key for key in self._entries if key[0] == token]:
+                del self._entries[key]
+
+    def clear(self):
+        """ Drops all the results and resets the counters. """
+        with self._lock:
+            for finalizer in self._finalizers.values():
+                finalizer.detach()
+            self._finalizers.clear()
+            self._tokens.clear()
+            self._entries.clear()
+            self.hits = self.partial_hits = self.misses = 0
+
+    def info(self) -> dict:
+        """ Counters of the cache: hits, partial_hits, misses, size, maxsize. """
+        return {"hits": self.hits, "partial_hits": self.partial_hits, "misses": self.misses,
+                "size": len(self._entries), "maxsize": self.maxsize}
+
+def _discard(cache_ref: weakref.ref, token: int):
+    """ Finalizer of an index: drops its results from the cache, if the cache still exists. """
+    cache = cache_ref()
+    if cache is not None:
+        cache.discard(token)
@@ -0,0 +1,235 @@
+import os
+import json
+import asyncio
+import logging
+import argparse
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+import dictionary
+import lexicon
+import multi_filters
+from client import HOST, PORT, SOCKET_PATH
+from lexicon_store import LexiconStore, open_store
+
+# ===================================================================
+#                             SETTINGS
+# ===================================================================
+# Threads evaluating the lookups and the filters, so that the event loop keeps answering the other requests
+FILTER_WORKERS = 4
+
+# Largest request accepted (one JSON object per line)
+LINE_LIMIT = 1 << 24
+
+# ===================================================================
+#                              SERVER
+# ===================================================================
+class DictionaryServer:
+    """ Long-running server answering dictionary, filter and lexicon requests.
+
+    The dictionary is loaded once (see 'compiled_dictionary.load_dictionary()'),
+    along with the indexes built by the first queries, and shared by all the
+    clients. The protocol is one JSON object per line in both directions:
+
+        request  : {"id": 1, "op": "define", "args": {"word": "manga"}}
+        response : {"id": 1, "result": [...]} or {"id": 1, "error": "..."}
+
+    The requests of a connection are handled concurrently, the responses
+    carrying the id of their request. Only 'ping' is answered directly by
+    the event loop; the lookups, the suggestions and the filters are
+    evaluated in a pool of threads, so that a large 'define_many' doesn't
+    hold the other clients, and the lexicon operations in a single thread,
+    one after the other.
+
+    Args:
+        store (LexiconStore): Lexicon storage, the sheet of 'lexi.xlsx' by default.
+    """
+
+    def __init__(self, store: Optional[LexiconStore] = None):
+        self.dico = dictionary.dico
+        self.df = self.dico.to_dataframe(definitions=False) # The filters only return the words
+        self.store = lexicon.get_store(store)
+        self.filters_executor = ThreadPoolExecutor(FILTER_WORKERS, thread_name_prefix="filters")
+        self.lexicon_executor = ThreadPoolExecutor(1, thread_name_prefix="lexicon")
+        self.requests = 0
+
+        # Operation name -> (handler, executor: None to run it in the event loop)
+        self.operations = {
+            "ping": (self.ping, None),
+            "memory": (self.memory, self.filters_executor), # Reads all the words held by the process
+            "define": (self.define, self.filters_executor),
+            "define_many": (self.define_many, self.filters_executor),
+            "suggest": (self.suggest, self.filters_executor),
+            "multi_filters": (self.multi_filters, self.filters_executor),
+            "multi_filters_batch": (self.multi_filters_batch, self.filters_executor),
+            "match_patterns": (self.match_patterns, self.filters_executor),
+            "add_word": (self.add_word, self.lexicon_executor),
+            "insert": (self.insert, self.lexicon_executor),
+            "search": (self.search, self.lexicon_executor),
+            "delete": (self.delete, self.lexicon_executor),
+        }
+
+    # -------------------------------------------------------------------
+    #                            OPERATIONS
+    # -------------------------------------------------------------------
+    def ping(self) -> dict:
+        return {"words": len(self.dico), "requests": self.requests, "cache": multi_filters.cache_info()}
+
+    def memory(self) -> dict:
+        return self.dico.memory_usage()
+
+    def define(self, word: str, strict: bool = True) -> Optional[list]:
+        return self.define_many([word], strict)[word]
+
+    def define_many(self, words: list, strict: bool = True) -> dict:
+        return dictionary.define_many(self.dico, "Mot", "Définitions", words, strict)
+
+    def suggest(self, word: str, max_distance: int = 2, limit: Optional[int] = 10) -> list:
+        return [list(suggestion) for suggestion in dictionary.suggest(self.dico, "Mot", word, max_distance, limit)]
+
+    def multi_filters(self, **filters) -> Optional[list]:
+        result = multi_filters.multi_filters(self.df, "Mot", log=None, **filters)
+        return None if result is None else result["Mot"].tolist()
+
+    def multi_filters_batch(self, queries: list) -> Optional[list]:
+        results = multi_filters.multi_filters_batch(self.df, "Mot", queries, log=None)
+        if results is None:
+            return None
+        return [None if result is None else result["Mot"].tolist() for result in results]
+
+    def match_patterns(self, patterns: list, **options) -> Optional[dict]:
+        results = multi_filters.match_patterns(self.df, "Mot", patterns, log=None, **options)
+        if results is None:
+            return None
+        return {pattern: result["Mot"].tolist() for pattern, result in results.items()}
+
+    def add_word(self, word: str, strict: bool = True) -> Optional[list]:
+        lexicon.add_word(self.dico, self.store, word, strict)
+        return self.search(word, strict)
+
+    def insert(self, word: str, definition) -> Optional[list]:
+        lexicon.insert(self.store, word, definition)
+        return self.search(word)
+
+    def search(self, word: str, strict: bool = True) -> Optional[list]:
+        result = lexicon.search(self.store, word, log=False, strict=strict)
+        return None if result is None else list(result)
+
+    def delete(self, word: str) -> bool:
+        found = self.search(word) is not None
+        lexicon.delete(self.store, word)
+        return found
+
+    # -------------------------------------------------------------------
+    #                             PROTOCOL
+    # -------------------------------------------------------------------
+    async def handle_request(self, line: bytes) -> dict:
+        """ Answers a request line. """
+
+        request_id = None
+        try:
+            request = json.loads(line)
+            request_id = request.get("id")
+            if request.get("op") not in self.operations:
+                return {"id": request_id, "error": f"unknown operation: {request.get('op')!r}"}
+
+            handler, executor = self.operations[request["op"]]
+            call = partial(handler, **request.get("args", {}))
+
+            if executor is None:
+                result = call()
+            else:
+                result = await asyncio.get_running_loop().run_in_executor(executor, call)
+            return {"id": request_id, "result": result}
+
+        except Exception as error:
+            logging.warning(f"Request failed: {error!r}")
+            return {"id": request_id, "error": f"{type(error).__name__}: {error}"}
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """ Answers the requests of a client until it disconnects. """
+
+        lock = asyncio.Lock()
+        tasks = set()
+
+        async def answer(line: bytes):
+            response = await self.handle_request(line)
+            async with lock:
+                writer.write(json.dumps(response, ensure_ascii=False).encode() + b"\n")
+                await writer.drain()
+
+        try:
+            while line := await reader.readline():
+                if not line.strip():
+                    continue
+                self.requests += 1
+                task = asyncio.create_task(answer(line))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+
+            if tasks:
+                await asyncio.gather(*tasks)
+        except (ConnectionError, asyncio.LimitOverrunError, ValueError) as error:
+            logging.warning(f"Connection closed: {error!r}")
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def serve(self, path: Optional[str] = SOCKET_PATH, host: str = HOST, port: int = PORT):
+        """ Serves the clients until cancelled.
+
+        Args:
+            path (str): Unix socket path. None, or a system without Unix sockets, to listen on 'host':'port'.
+            host (str): Address to listen on.
+            port (int): Port to listen on.
+        """
+
+        if path is not None and hasattr(asyncio, "start_unix_server"):
+            if os.path.exists(path):
+                os.remove(path) # Left by a previous server
+            server = await asyncio.start_unix_server(self.handle_connection, path, limit=LINE_LIMIT)
+            print(f"Listening on {path}")
+        else:
+            server = await asyncio.start_server(self.handle_connection, host, port, limit=LINE_LIMIT)
+            print(f"Listening on {host}:{port}")
+
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self.filters_executor.shutdown(wait=False)
+            self.lexicon_executor.shutdown(wait=True)
+            self.store.flush()
+            if path is not None and os.path.exists(path):
+                os.remove(path)
+
+# ===================================================================
+#                               MAIN
+# ===================================================================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serves the dictionary, the filters and the lexicon to local "
+                                                 "clients (see client.py).")
+    parser.add_argument("--socket", default=SOCKET_PATH, help="Unix socket path")
+    parser.add_argument("--tcp", action="store_true", help="listen on --host:--port instead of a Unix socket")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--lexicon", help="lexicon file (.xlsx or SQLite database), 'lexi.xlsx' by default")
+    parser.add_argument("--flush-interval", type=float,
+                        help="save the lexicon at most this many seconds after a modification (write-behind)")
+    parser.add_argument("--cache", type=int, default=1024, help="size of the filters result cache, 0 to disable")
+    args = parser.parse_args()
+
+    if args.cache:
+        multi_filters.enable_cache(args.cache)
+
+    dictionary_server = DictionaryServer(open_store(args.lexicon) if args.lexicon else None)
+    dictionary_server.store.flush_interval = args.flush_interval
+
+    try:
+        asyncio.run(dictionary_server.serve(None if args.tcp else args.socket, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
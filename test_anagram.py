@@ -0,0 +1,50 @@
+import random
+from collections import Counter
+
+import pytest
+
+from word_index import fold
+
+# ===================================================================
+#                             REFERENCE
+# ===================================================================
+def written_with(word: str, tiles: list) -> bool:
+    """ The word can be written with some or all of the tiles, a blank standing for any letter. """
+
+    letters = Counter(fold("".join(tile for tile in tiles if tile not in ("?", "*"))))
+    blanks = len(tiles) - sum(letters.values())
+    missing = Counter(fold(word)) - letters
+    return all(char.isalpha() for char in missing) and sum(missing.values()) <= blanks
+
+# ===================================================================
+#                               TESTS
+# ===================================================================
+@pytest.mark.parametrize("blanks", [0, 1, 2])
+@pytest.mark.parametrize("length", [None, 5])
+def test_anagram(modules, dataframe, blanks, length):
+    _, multi_filters, _ = modules
+    words = dataframe["Mot"].tolist()
+    rng = random.Random(blanks)
+
+    for word in rng.sample(words, 10):
+        # Letters of a word, with its accents and case, shuffled, and some other letters
+        tiles = list(word) + rng.sample("abcdefghijklmnopqrstuvwxyzé", 3)
+        rng.shuffle(tiles)
+        tiles = tiles[:8 - blanks] + rng.choices(["?", "*"], k=blanks)
+
+        result = multi_filters.multi_filters(dataframe, "Mot", no_comp=False, anagram=tiles, length=length, log=None)
+        expected = [word for word in words if written_with(word, tiles) and length in (None, len(word))]
+        assert (result["Mot"].tolist() if result is not None else []) == expected, tiles
+
+def test_anagram_finds_words(modules, dataframe):
+    _, multi_filters, _ = modules
+    word = next(word for word in dataframe["Mot"].tolist() if len(word) > 6 and fold(word) != word.lower())
+
+    # The exact letters of the word, without accents nor case
+    result = multi_filters.multi_filters(dataframe, "Mot", anagram=list(fold(word).upper())[::-1], log=None)
+    assert word in result["Mot"].tolist()
+
+    # A blank for each letter
+    result = multi_filters.multi_filters(dataframe, "Mot", anagram=["?"] * len(word), length=len(word), log=None)
+    assert result["Mot"].tolist() == [other for other in dataframe["Mot"].tolist()
+                                      if len(other) == len(word) and "-" not in other and " " not in other]
@@ -0,0 +1,41 @@
+from conftest import reference
+from instrumentation import collect
+from test_filters import QUERIES
+
+# ===================================================================
+#                               TESTS
+# ===================================================================
+def test_multi_filters_batch(modules, dataframe):
+    _, multi_filters, _ = modules
+    # Queries sharing some of their filters, and queries of the other filters
+    queries = QUERIES + [dict(query, length=7) for query in QUERIES if "length" not in query] + \
+        [{"anagram": ["a", "r", "t", "e", "?"]}, {"pattern": "?r*e", "length": 6}]
+
+    events = []
+    with collect(events.append):
+        results = multi_filters.multi_filters_batch(dataframe, "Mot", queries, log=None)
+    assert len(results) == len(queries)
+
+    # The filters of several queries are evaluated once
+    batch = next(event for event in events if event["event"] == "batch")
+    assert batch["queries"] == len(queries)
+    assert batch["shared"] > 0
+
+    for query, result in zip(queries, results):
+        if "anagram" in query or "pattern" in query:
+            expected = multi_filters.multi_filters(dataframe, "Mot", log=None, **query)
+        else:
+            expected = dataframe.iloc[reference(dataframe["Mot"].tolist(), **query)]
+        assert result.index.tolist() == expected.index.tolist(), query
+
+def test_multi_filters_batch_arguments(modules, dataframe):
+    _, multi_filters, _ = modules
+    results = multi_filters.multi_filters_batch(dataframe, "Mot", [{"length": 7}, {"size": 7}, [7], {"length": "7"}],
+                                                log=None)
+
+    # Only the queries with wrong arguments have no result
+    assert results[0]["Mot"].tolist() == dataframe["Mot"].iloc[reference(dataframe["Mot"].tolist(), length=7)].tolist()
+    assert results[1:] == [None, None, None]
+
+    assert multi_filters.multi_filters_batch(dataframe, "Absent", [{"length": 7}], log=None) is None
+    assert multi_filters.multi_filters_batch(dataframe, "Mot", [], log=None) == []
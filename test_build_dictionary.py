@@ -0,0 +1,133 @@
+import csv
+import random
+import xml.etree.ElementTree as ET
+
+import pytest
+
+from benchmark import generate_definitions, generate_words
+from build_dictionary import build_dictionary, shard_ranges, sorted_rows
+from compiled_dictionary import CompiledDictionary, parse_definitions
+
+# ===================================================================
+#                             SETTINGS
+# ===================================================================
+WORDS = generate_words(400, seed=3)
+
+# Rows held in memory while sorting: small enough for the words to be sorted in several runs
+RUN_SIZE = 50
+
+# ===================================================================
+#                              UTILS
+# ===================================================================
+def write_xml(path, words: list = WORDS, seed: int = 0, prolog: str = "", root: str = "<wiktionary>",
+              entry_attributes: str = "", gloss_suffix: str = "") -> None:
+    """ Writes a Wiktionary-like XML file: one `<entry>` per word (lowercase 'form'), with duplicated entries,
+    entries without definition and nested glosses. """
+
+    rng = random.Random(seed)
+    lines = ['<?xml version="1.0" encoding="utf-8"?>', prolog, root, "<meta>Not an entry</meta>"]
+    for word in words:
+        glosses = [f"<gloss>{definition}{gloss_suffix}</gloss>" for definition in generate_definitions(word, rng)]
+        draw = rng.random()
+        if draw < 0.05:
+            glosses = [] # No definition
+        elif draw < 0.08:
+            glosses = ["<gloss>.</gloss>"]
+        elif draw < 0.12:
+            # Only the innermost glosses are definitions
+            glosses.append("<gloss><gloss>Imbriquée &amp; co</gloss></gloss>")
+
+        entry = (f'<entry form="{word.lower()}"{entry_attributes}>'
+                 f'<pos><definitions>{"".join(glosses)}</definitions></pos></entry>')
+        # Identical entries, written once in the dictionary
+        lines += [entry] * (2 if draw > 0.95 else 1)
+    lines.append("</wiktionary>")
+    path.write_text("\n".join(lines), encoding="utf-8")
+
+def expected_rows(path) -> list:
+    """ Rows of the dictionary built from an XML file, from the whole parsed tree. """
+
+    rows = set()
+    for entry in ET.parse(path).getroot().iter():
+        if not entry.tag.endswith("entry"):
+            continue
+        definitions = [gloss.text for gloss in entry.iter()
+                       if gloss.tag.endswith("gloss") and len(gloss) == 0 and gloss.text]
+        if definitions and definitions != ["."]:
+            rows.add((entry.get("form").capitalize(), tuple(definitions)))
+    return [(word, list(definitions)) for word, definitions in sorted(rows)]
+
+def read_rows(path) -> list:
+    dico = CompiledDictionary(str(path))
+    return [(dico.word(row), dico.definitions(row)) for row in range(len(dico))]
+
+# ===================================================================
+#                               TESTS
+# ===================================================================
+def test_build(tmp_path):
+    write_xml(tmp_path / "dico.xml")
+    build_dictionary(str(tmp_path / "dico.xml"), str(tmp_path / "dico.bin"), str(tmp_path / "dico.csv"),
+                     run_size=RUN_SIZE, progress=False, workers=1)
+
+    expected = expected_rows(tmp_path / "dico.xml")
+    assert len(expected) < len(WORDS) # Some entries are skipped
+    assert read_rows(tmp_path / "dico.bin") == expected
+
+    # Same rows in the .csv file, in the format of the upstream file
+    with open(tmp_path / "dico.csv", newline="", encoding="utf-8") as file:
+        rows = list(csv.reader(file))
+    assert rows[0] == ["Mot", "Définitions"]
+    assert [(word, parse_definitions(definitions)) for word, definitions in rows[1:]] == expected
+
+def test_build_without_fuzzy_index(tmp_path):
+    write_xml(tmp_path / "dico.xml", WORDS[:50])
+    build_dictionary(str(tmp_path / "dico.xml"), str(tmp_path / "dico.bin"), progress=False, workers=1,
+                     fuzzy_distance=0)
+
+    dico = CompiledDictionary(str(tmp_path / "dico.bin"))
+    assert dico.fuzzy_index() is None
+    assert len(dico) == len(expected_rows(tmp_path / "dico.xml"))
+
+@pytest.mark.parametrize("run_size", [1, 7, 1000])
+def test_sorted_rows(tmp_path, run_size):
+    rng = random.Random(run_size)
+    rows = [(rng.choice(WORDS[:30]), [f"Définition {rng.randint(1, 3)}"]) for _ in range(200)]
+
+    assert list(sorted_rows(iter(rows), str(tmp_path), run_size)) == sorted(rows)
+
+def test_shard_ranges(tmp_path):
+    write_xml(tmp_path / "dico.xml")
+    data = (tmp_path / "dico.xml").read_bytes()
+    ranges = shard_ranges(str(tmp_path / "dico.xml"), 8)
+
+    # Contiguous ranges of whole entries, from the first one to the last one
+    assert len(ranges) == 8
+    assert [start for start, _ in ranges[1:]] == [end for _, end in ranges[:-1]]
+    assert all(data[start:start + 7] == b"<entry " for start, _ in ranges)
+    assert ranges[0][0] == data.find(b"<entry ")
+    assert ranges[-1][1] == data.rfind(b"</entry>") + len(b"</entry>")
+
+@pytest.mark.parametrize("options", [
+    {},
+    # Entities declared in the prolog, namespaces declared by the root element
+    {"prolog": '<!DOCTYPE wiktionary [<!ENTITY co "et compagnie">]>', "gloss_suffix": " &co;"},
+    {"root": '<wiktionary xmlns="urn:wiktionary" xmlns:x="urn:x">', "entry_attributes": ' x:id="1"'},
+], ids=["plain", "entities", "namespaces"])
+def test_parallel_build(tmp_path, options):
+    write_xml(tmp_path / "dico.xml", **options)
+    build_dictionary(str(tmp_path / "dico.xml"), str(tmp_path / "dico.bin"), run_size=RUN_SIZE, progress=False,
+                     workers=3)
+
+    assert read_rows(tmp_path / "dico.bin") == expected_rows(tmp_path / "dico.xml")
+
+def test_parallel_build_prefixed_entries(tmp_path):
+    """ Entries with a namespace prefix can't be split into shards: the file is parsed in a single process. """
+
+    write_xml(tmp_path / "dico.xml", WORDS[:50])
+    xml = (tmp_path / "dico.xml").read_text(encoding="utf-8")
+    xml = xml.replace("<wiktionary>", '<wiktionary xmlns:w="urn:w">').replace("entry", "w:entry")
+    (tmp_path / "dico.xml").write_text(xml, encoding="utf-8")
+    assert shard_ranges(str(tmp_path / "dico.xml"), 4) == []
+
+    build_dictionary(str(tmp_path / "dico.xml"), str(tmp_path / "dico.bin"), progress=False, workers=3)
+    assert read_rows(tmp_path / "dico.bin") == expected_rows(tmp_path / "dico.xml")
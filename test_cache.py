@@ -0,0 +1,104 @@
+import gc
+
+import pandas as pd
+import pytest
+
+from conftest import reference
+from word_index import invalidate
+
+# ===================================================================
+#                             FIXTURES
+# ===================================================================
+@pytest.fixture
+def cached(modules):
+    """ 'multi_filters' module with the cache of the results enabled during the test. """
+
+    _, multi_filters, _ = modules
+    multi_filters.enable_cache()
+    yield multi_filters
+    multi_filters.disable_cache()
+
+# ===================================================================
+#                               TESTS
+# ===================================================================
+def test_hits(cached, dataframe):
+    first = cached.multi_filters(dataframe, "Mot", start_with="pr", contains=["a", "u"], log=None)
+    assert cached.cache_info()["hits"] == 0
+
+    # Same query written differently
+    second = cached.multi_filters(dataframe, "Mot", start_with="PR", contains=["u", "a", "u"], log=None)
+    assert cached.cache_info()["hits"] == 1
+    assert second.index.tolist() == first.index.tolist()
+
+    # Starts from the result of its first filters
+    result = cached.multi_filters(dataframe, "Mot", start_with="pr", contains=["a", "u"], length=8, log=None)
+    assert cached.cache_info()["partial_hits"] == 1
+    assert result.index.tolist() == \
+        reference(dataframe["Mot"].tolist(), start_with="pr", contains=["a", "u"], length=8)
+
+def test_anagram_keys(cached, dataframe):
+    first = cached.multi_filters(dataframe, "Mot", anagram=["é", "t", "a", "?"], log=None)
+    hits = cached.cache_info()["hits"]
+
+    # The letters are compared without accents nor case
+    second = cached.multi_filters(dataframe, "Mot", anagram=["A", "*", "E", "t"], log=None)
+    assert cached.cache_info()["hits"] == hits + 1
+    assert second.index.tolist() == first.index.tolist()
+
+    cached.multi_filters(dataframe, "Mot", anagram=["a", "t", "e", "?", "?"], log=None)
+    assert cached.cache_info()["hits"] == hits + 1
+
+def test_batch_hits(cached, dataframe):
+    queries = [{"length": 7}, {"end_with": "er"}, {"length": 7, "end_with": "er"}]
+    first = cached.multi_filters_batch(dataframe, "Mot", queries, log=None)
+    second = cached.multi_filters_batch(dataframe, "Mot", queries, log=None)
+
+    assert cached.cache_info()["hits"] >= len(queries)
+    assert [result.index.tolist() for result in second] == [result.index.tolist() for result in first]
+
+def test_modified_words(cached, dataframe):
+    words = dataframe["Mot"].tolist()[:500]
+    df = pd.DataFrame({"Mot": words})
+    assert cached.multi_filters(df, "Mot", length=7, log=None).index.tolist() == reference(words, length=7)
+
+    # Column replaced: new index, new results
+    words = words[::-1]
+    df["Mot"] = words
+    assert cached.multi_filters(df, "Mot", length=7, log=None).index.tolist() == reference(words, length=7)
+
+    # Words modified in place, then the index forgotten
+    words[0] = "Abcdefg"
+    df.loc[0, "Mot"] = "Abcdefg"
+    invalidate(df)
+    assert cached.multi_filters(df, "Mot", length=7, log=None).index.tolist() == reference(words, length=7)
+
+def test_dropped_results(cached, dataframe):
+    df = pd.DataFrame({"Mot": dataframe["Mot"].tolist()[:500]})
+    cached.multi_filters(df, "Mot", length=7, log=None)
+    size = cached.cache_info()["size"]
+    assert size > 0
+
+    # With the index of the dataframe
+    del df
+    gc.collect()
+    assert cached.cache_info()["size"] < size
+
+def test_maxsize(cached, dataframe):
+    cached.enable_cache(maxsize=2)
+    for length in range(4, 9):
+        result = cached.multi_filters(dataframe, "Mot", length=length, log=None)
+        assert result.index.tolist() == reference(dataframe["Mot"].tolist(), length=length)
+    assert cached.cache_info()["size"] == 2
+
+    # Least recently used dropped
+    cached.multi_filters(dataframe, "Mot", length=4, log=None)
+    assert cached.cache_info()["hits"] == 0
+
+def test_disabled(modules, dataframe):
+    _, multi_filters, _ = modules
+    multi_filters.enable_cache()
+    multi_filters.disable_cache()
+
+    assert multi_filters.cache_info() is None
+    assert multi_filters.multi_filters(dataframe, "Mot", length=7, log=None).index.tolist() == \
+        reference(dataframe["Mot"].tolist(), length=7)
@@ -0,0 +1,214 @@
+import os
+import csv
+import random
+
+import pytest
+
+import compiled_dictionary
+from benchmark import generate_definitions, generate_words
+from compiled_dictionary import (HEADER, MAGIC, CompiledDictionary, DictionaryWriter, load_dictionary,
+                                 parse_definitions, _needs_compilation)
+from word_index import fold
+
+# ===================================================================
+#                             SETTINGS
+# ===================================================================
+WORDS = generate_words(500, seed=2)
+
+# ===================================================================
+#                              UTILS
+# ===================================================================
+def write(path, words: list = WORDS, seed: int = 0, **options) -> dict:
+    """ Writes a compiled dictionary of some words and returns their definitions, by word. """
+
+    rng = random.Random(seed)
+    entries = {word: generate_definitions(word, rng) for word in words}
+    with DictionaryWriter(str(path), **options) as writer:
+        for word in words:
+            writer.add(word, entries[word])
+    return entries
+
+# ===================================================================
+#                               TESTS
+# ===================================================================
+def test_round_trip(tmp_path):
+    entries = write(tmp_path / "dico.bin")
+    dico = CompiledDictionary(str(tmp_path / "dico.bin"))
+
+    assert len(dico) == len(WORDS)
+    assert [dico.word(row) for row in range(len(dico))] == WORDS
+    assert [dico.definitions(row) for row in range(len(dico))] == [entries[word] for word in WORDS]
+
+def test_find(tmp_path):
+    write(tmp_path / "dico.bin")
+    dico = CompiledDictionary(str(tmp_path / "dico.bin"))
+
+    assert [dico.find(word) for word in WORDS] == list(range(len(WORDS)))
+    assert dico.find("Zzzzzz") == -1
+    assert dico.find("") == -1
+    assert dico.find(WORDS[0].lower()) == -1 # Exact lookup, as stored
+
+def test_writer_checks_the_words(tmp_path):
+    with pytest.raises(ValueError):
+        with DictionaryWriter(str(tmp_path / "unsorted.bin")) as writer:
+            writer.add("Bateau", ["Définition"])
+            writer.add("Arbre", ["Définition"])
+    with pytest.raises(ValueError):
+        with DictionaryWriter(str(tmp_path / "break.bin")) as writer:
+            writer.add("Deux\nmots", ["Définition"])
+
+    # Nothing is left behind by the failed writers
+    assert os.listdir(tmp_path) == []
+
+def test_rejects_other_files(tmp_path):
+    (tmp_path / "other.bin").write_bytes(b"\x00" * 64)
+    with pytest.raises(ValueError):
+        CompiledDictionary(str(tmp_path / "other.bin"))
+
+    (tmp_path / "old.bin").write_bytes(HEADER.pack(MAGIC, 1, 0, 0))
+    with pytest.raises(ValueError):
+        CompiledDictionary(str(tmp_path / "old.bin"))
+
+def test_rewrite_while_open(tmp_path):
+    """ A dictionary written again doesn't disturb the processes which mapped the previous file. """
+
+    path = tmp_path / "dico.bin"
+    write(path, WORDS[:100])
+    old = CompiledDictionary(str(path))
+
+    write(path, WORDS[100:300])
+    new = CompiledDictionary(str(path))
+
+    assert old.words.tolist() == WORDS[:100]
+    assert new.words.tolist() == WORDS[100:300]
+    assert os.listdir(tmp_path) == ["dico.bin"] # No temporary file left
+
+def test_failed_write_keeps_the_previous_file(tmp_path, monkeypatch):
+    path = tmp_path / "dico.bin"
+    write(path, WORDS[:100])
+
+    def fail(content):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(compiled_dictionary, "_little_endian", fail)
+    with pytest.raises(OSError):
+        write(path, WORDS[100:300])
+
+    assert os.listdir(tmp_path) == ["dico.bin"]
+    assert CompiledDictionary(str(path)).words.tolist() == WORDS[:100]
+
+def test_packed_strings(tmp_path):
+    write(tmp_path / "dico.bin")
+    words = CompiledDictionary(str(tmp_path / "dico.bin")).words
+
+    assert len(words) == len(WORDS)
+    assert [words[row] for row in [0, 1, 250, -1, -len(WORDS)]] == [WORDS[row] for row in [0, 1, 250, -1, 0]]
+    for idx in [len(WORDS), -len(WORDS) - 1]:
+        with pytest.raises(IndexError):
+            words[idx]
+
+    # Slices, with or without step, and out of bounds
+    for bounds in [(10, 20), (None, 5), (490, None), (-3, None), (20, 10), (0, 1000), (5, 50, 7), (None, None, -1)]:
+        assert words[slice(*bounds)] == WORDS[slice(*bounds)], bounds
+
+    assert words.take([3, 0, 499, 3]) == [WORDS[3], WORDS[0], WORDS[499], WORDS[3]]
+    assert words.take([]) == []
+
+def test_packed_strings_chunks(tmp_path, monkeypatch):
+    """ Iterating decodes the strings by chunks: the last one may be incomplete. """
+
+    monkeypatch.setattr(compiled_dictionary, "DECODE_CHUNK", 64)
+    write(tmp_path / "dico.bin")
+    dico = CompiledDictionary(str(tmp_path / "dico.bin"))
+
+    assert list(dico.words) == WORDS
+    assert list(dico.folded) == [fold(word) for word in WORDS]
+
+def test_memory_usage(tmp_path):
+    write(tmp_path / "dico.bin", block_size=8)
+    dico = CompiledDictionary(str(tmp_path / "dico.bin"))
+
+    usage = dico.memory_usage()
+    assert sum(usage["mapped"].values()) <= os.path.getsize(tmp_path / "dico.bin")
+    assert usage["total"] == sum(usage["private"].values())
+
+    # The structures built and the definitions read are counted
+    dico.word_index().lengths
+    dataframe = dico.to_dataframe(definitions=False)
+    for row in range(0, 100, 3):
+        dico.definitions(row)
+    grown = dico.memory_usage()
+    assert grown["private"]["definitions_cache"] > 0
+    assert grown["private"]["blocks_cache"] > 0
+    assert any(name.startswith("index.") for name in grown["private"])
+    assert "dataframe.Mot" in grown["private"]
+    assert grown["total"] > usage["total"]
+    assert dataframe["Mot"].tolist() == WORDS
+
+def test_load_dictionary_compiles_the_csv(tmp_path):
+    source, target = tmp_path / "dico.csv", tmp_path / "dico.bin"
+    entries = {word: generate_definitions(word, random.Random(0)) for word in WORDS[:50]}
+
+    # Unsorted, with a row without definition
+    with open(source, "w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(["Mot", "Définitions"])
+        for word in reversed(WORDS[:50]):
+            writer.writerow([word, repr(entries[word])])
+        writer.writerow(["Orphelin", ""])
+
+    dico = load_dictionary(str(target), str(source))
+    assert dico.words.tolist() == WORDS[:50]
+    assert [dico.definitions(row) for row in range(len(dico))] == [entries[word] for word in WORDS[:50]]
+
+    # Opened once per process
+    assert load_dictionary(str(target), str(source)) is dico
+
+def test_outdated_dictionary(tmp_path):
+    source, target = tmp_path / "dico.csv", tmp_path / "dico.bin"
+    write(target, WORDS[:10])
+    source.write_text("Mot,Définitions\n", encoding="utf-8")
+
+    # The .csv file is more recent
+    os.utime(target, (0, 0))
+    assert _needs_compilation(str(target), str(source))
+
+    os.utime(source, (0, 0))
+    assert not _needs_compilation(str(target), str(source))
+    assert _needs_compilation(str(tmp_path / "missing.bin"), str(source))
+
+@pytest.mark.parametrize("block_size", [0, 1, 7, 32, 1000])
+def test_definitions_blocks(tmp_path, block_size):
+    """ Definitions compressed by blocks of words (or not compressed), whatever the position of the word in its
+    block. """
+
+    words = WORDS[:100]
+    rng = random.Random(0)
+    entries = {word: generate_definitions(word, rng) for word in words}
+    # Words without definitions, and definitions with quotes and line breaks
+    entries[words[3]] = []
+    entries[words[50]] = ["« Cité » l'a dit.\nDeuxième ligne", ""]
+    with DictionaryWriter(str(tmp_path / "dico.bin"), block_size=block_size) as writer:
+        for word in words:
+            writer.add(word, entries[word])
+    dico = CompiledDictionary(str(tmp_path / "dico.bin"))
+
+    # In reverse order: the blocks are decompressed in another order than written
+    for row in reversed(range(len(words))):
+        assert dico.definitions(row) == entries[words[row]], row
+
+    # The cached definitions can't be modified through the returned lists
+    dico.definitions(0).append("Ajout")
+    assert dico.definitions(0) == entries[words[0]]
+
+def test_dataframe_definitions(tmp_path):
+    entries = write(tmp_path / "dico.bin")
+    dataframe = CompiledDictionary(str(tmp_path / "dico.bin")).to_dataframe()
+
+    assert dataframe["Mot"].tolist() == WORDS
+    assert dataframe["Définitions"].tolist() == [entries[word] for word in WORDS]
+
+def test_parse_definitions():
+    # Strings of the .csv dictionary, lists of the compiled one
+    assert parse_definitions("['Végétal.', \"L'arbre.\"]") == ["Végétal.", "L'arbre."]
+    assert parse_definitions(["Végétal."]) == ["Végétal."]
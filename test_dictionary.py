@@ -0,0 +1,84 @@
+import random
+from collections import Counter
+
+import pandas as pd
+import pytest
+
+from word_index import fold
+
+# ===================================================================
+#                             FIXTURES
+# ===================================================================
+@pytest.fixture(scope="module")
+def csv_dataframe():
+    """ Dataframe read from a .csv dictionary: unsorted words, a duplicate, definitions stored as strings. """
+    return pd.DataFrame({"Mot": ["Tarte", "Arbre", "Manga", "Arbre"],
+                         "Définitions": ["['Pâtisserie.']", "['Végétal.', 'Schéma.']", "['Bande dessinée.']",
+                                         "['Autre.']"]})
+
+# ===================================================================
+#                               TESTS
+# ===================================================================
+def test_define(modules, dataframe):
+    dico, _, dictionary = modules
+    words = dataframe["Mot"].tolist()
+
+    for row in [0, 1, len(words) // 2, len(words) - 1]:
+        assert dictionary.define(dico, "Mot", "Définitions", words[row]) == dico.definitions(row)
+        assert dictionary.define(dico.to_dataframe(), "Mot", "Définitions", words[row]) == dico.definitions(row)
+        # Capitalized like the dictionary words
+        assert dictionary.define(dico, "Mot", "Définitions", words[row].lower()) == dico.definitions(row)
+
+    assert dictionary.define(dico, "Mot", "Définitions", "Zzzzz") is None
+    assert dictionary.define(dico.to_dataframe(), "Mot", "Définitions", "Zzzzz") is None
+
+def test_define_csv_dataframe(modules, csv_dataframe):
+    _, _, dictionary = modules
+
+    assert dictionary.define(csv_dataframe, "Mot", "Définitions", "manga") == ["Bande dessinée."]
+    # First row of a duplicated word
+    assert dictionary.define(csv_dataframe, "Mot", "Définitions", "Arbre") == ["Végétal.", "Schéma."]
+    assert dictionary.define(csv_dataframe, "Mot", "Définitions", "Poire") is None
+
+def test_define_regardless_of_accents(modules, dataframe):
+    dico, _, dictionary = modules
+    words = dataframe["Mot"].tolist()
+    keys = Counter(fold(word) for word in words)
+    accented = [row for row, word in enumerate(words) if fold(word) != word.lower() and keys[fold(word)] == 1]
+    assert accented
+
+    for row in accented[:20]:
+        searched = fold(words[row]).upper()
+        assert dictionary.define(dico, "Mot", "Définitions", searched) is None
+        assert dictionary.define(dico, "Mot", "Définitions", searched, strict=False) == dico.definitions(row)
+        assert dictionary.define(dico.to_dataframe(), "Mot", "Définitions", searched, strict=False) == \
+            dico.definitions(row)
+
+    searched = [fold(words[row]) for row in accented[:20]] + ["Zzzzz"]
+    result = dictionary.define_many(dico, "Mot", "Définitions", searched, strict=False)
+    assert result == {**{fold(words[row]): dico.definitions(row) for row in accented[:20]}, "Zzzzz": None}
+
+def test_define_many(modules, dataframe):
+    dico, _, dictionary = modules
+    words = dataframe["Mot"].tolist()
+    searched = random.Random(0).sample(words, 200) + [words[0], words[-1], "Zzzzz", "", "Aaaaaaaaaaaaa"]
+    searched += [word.lower() for word in searched[:20]] # Capitalized like the dictionary words
+
+    result = dictionary.define_many(dico, "Mot", "Définitions", searched)
+
+    # Naive lookup: first row of each word
+    rows = {}
+    for row, word in enumerate(words):
+        rows.setdefault(word, row)
+    for word in searched:
+        row = rows.get(word.capitalize())
+        assert result[word] == (None if row is None else dico.definitions(row)), word
+
+    # Same result on the dataframe with its definitions
+    assert dictionary.define_many(dico.to_dataframe(), "Mot", "Définitions", searched) == result
+
+def test_define_many_csv_dataframe(modules, csv_dataframe):
+    _, _, dictionary = modules
+    result = dictionary.define_many(csv_dataframe, "Mot", "Définitions", ["arbre", "Tarte", "Poire", "arbre"])
+
+    assert result == {"arbre": ["Végétal.", "Schéma."], "Tarte": ["Pâtisserie."], "Poire": None}
@@ -0,0 +1,51 @@
+import pytest
+
+from conftest import reference
+
+# ===================================================================
+#                             SETTINGS
+# ===================================================================
+# The words are capitalized: their first letter is never a lowercase one
+NEVER_MATCHES = {"nth_letters": [[1, "a"]]}
+
+# Queries checked against the reference implementation
+QUERIES = [
+    {"length": 7},
+    {"start_with": "pr"},
+    {"end_with": "er"},
+    NEVER_MATCHES,
+    {"nth_letters": [[2, "r"]]},
+    {"nth_letters": [[2, "r"], [4, "a"]]},
+    {"nth_letters": [[12, "e"]]}, # Only the words of 12 letters or more
+    {"contains": ["a", "u"]},
+    {"contains": ["e", "e"]},
+    {"contains": ["e", "e", "a"]},
+    {"contains": {"e": 3}},
+    {"contains": {"e": 2, "r": 1}},
+    {"not_contain": ["a"]},
+    {"not_contain": ["a", "e"]},
+    {"start_with": "g", "not_contain": ["b"], "contains": ["a"]},
+    {"length": 6, "end_with": "er", "nth_letters": [[3, "u"]]},
+    {"no_comp": False, "contains": ["a"]},
+    {"accent_insensitive": True, "contains": ["e", "e"]},
+    {"accent_insensitive": True, "start_with": "e", "not_contain": ["a"]},
+    {"accent_insensitive": True, "nth_letters": [[2, "e"]], "end_with": "e"},
+]
+
+# ===================================================================
+#                               TESTS
+# ===================================================================
+@pytest.mark.parametrize("query", QUERIES, ids=str)
+def test_multi_filters(modules, dataframe, query):
+    _, multi_filters, _ = modules
+    result = multi_filters.multi_filters(dataframe, "Mot", log=None, **query)
+
+    expected = reference(dataframe["Mot"].tolist(), **query)
+    assert result["Mot"].tolist() == dataframe["Mot"].iloc[expected].tolist()
+
+def test_queries_are_not_trivial(dataframe):
+    """ The synthetic dictionary gives each query some words to find, and some to reject. """
+    words = dataframe["Mot"].tolist()
+    for query in QUERIES:
+        if query is not NEVER_MATCHES:
+            assert 0 < len(reference(words, **query)) < len(words), query
@@ -0,0 +1,112 @@
+import random
+
+import pytest
+
+from fuzzy import distance_bounds, edit_distance
+from word_index import fold
+
+# ===================================================================
+#                             REFERENCE
+# ===================================================================
+def osa_distance(a: str, b: str) -> int:
+    """ Optimal string alignment distance, one cell of the distance matrix at a time. """
+
+    matrix = [[row + column if not row or not column else 0 for column in range(len(b) + 1)]
+              for row in range(len(a) + 1)]
+    for row in range(1, len(a) + 1):
+        for column in range(1, len(b) + 1):
+            cost = a[row - 1] != b[column - 1]
+            matrix[row][column] = min(matrix[row - 1][column] + 1, matrix[row][column - 1] + 1,
+                                      matrix[row - 1][column - 1] + cost)
+            if row > 1 and column > 1 and a[row - 1] == b[column - 2] and a[row - 2] == b[column - 1]:
+                matrix[row][column] = min(matrix[row][column], matrix[row - 2][column - 2] + 1)
+    return matrix[len(a)][len(b)]
+
+def misspell(word: str, rng: random.Random, edits: int) -> str:
+    """ Word with some letters inserted, deleted, replaced or swapped. """
+
+    for _ in range(edits):
+        position = rng.randrange(len(word))
+        edit = rng.choice(["insert", "delete", "replace", "swap"])
+        if edit == "insert":
+            word = word[:position] + rng.choice("aeiourst") + word[position:]
+        elif edit == "delete" and len(word) > 1:
+            word = word[:position] + word[position + 1:]
+        elif edit == "replace":
+            word = word[:position] + rng.choice("aeiourst") + word[position + 1:]
+        elif position < len(word) - 1:
+            word = word[:position] + word[position + 1] + word[position] + word[position + 2:]
+    return word
+
+# ===================================================================
+#                               TESTS
+# ===================================================================
+def test_edit_distance():
+    rng = random.Random(0)
+    for _ in range(3000):
+        a = "".join(rng.choices("abcé", k=rng.randint(0, 12)))
+        b = misspell(a, rng, rng.randint(0, 4)) if a and rng.random() < 0.7 else \
+            "".join(rng.choices("abcé", k=rng.randint(0, 12)))
+        distance = osa_distance(a, b)
+        for max_distance in range(4):
+            assert edit_distance(a, b, max_distance) == min(distance, max_distance + 1), (a, b, max_distance)
+
+    # Longer than the bit vectors of a machine word
+    a = "anticonstitutionnellement" * 4
+    for edits in range(4):
+        b = misspell(a, rng, edits)
+        assert edit_distance(a, b, 2) == min(osa_distance(a, b), 3)
+
+def test_distance_bounds(dataframe):
+    rng = random.Random(1)
+    candidates = [fold(word) for word in rng.sample(dataframe["Mot"].tolist(), 200)]
+    for word in candidates[:20]:
+        word = misspell(word, rng, 2)
+        bounds = distance_bounds(word, candidates).tolist()
+        assert all(bound <= osa_distance(word, candidate) for bound, candidate in zip(bounds, candidates))
+
+@pytest.mark.parametrize("source", ["compiled", "dataframe"])
+def test_suggest(modules, dataframe, source):
+    dico, _, dictionary = modules
+    words = dataframe["Mot"].tolist()
+    folded = [fold(word) for word in words]
+    searched = dico if source == "compiled" else dataframe
+    rng = random.Random(2)
+
+    for word in rng.sample(words, 15):
+        misspelled = misspell(word, rng, rng.randint(1, 2))
+
+        # Every word within the distance, regardless of accents and case
+        expected = sorted((osa_distance(fold(misspelled), other), row) for row, other in enumerate(folded)
+                          if abs(len(other) - len(misspelled)) <= 2)
+        expected = [(words[row], distance) for distance, row in expected if distance <= 2]
+        suggestions = dictionary.suggest(searched, "Mot", misspelled, 2, limit=None)
+        assert sorted(suggestions) == sorted(expected), misspelled
+        assert [distance for _, distance in suggestions] == sorted(distance for _, distance in suggestions)
+
+        # The closest ones
+        assert [distance for _, distance in dictionary.suggest(searched, "Mot", misspelled, 2, limit=3)] == \
+            [distance for _, distance in suggestions[:3]]
+        assert len(dictionary.suggest(searched, "Mot", misspelled, 1, limit=None)) == \
+            sum(distance <= 1 for _, distance in expected)
+
+def test_suggest_accents(modules, dataframe):
+    dico, _, dictionary = modules
+    word = next(word for word in dataframe["Mot"].tolist() if fold(word) != word.lower())
+
+    # Missing accents aren't counted
+    assert (word, 0) in dictionary.suggest(dico, "Mot", fold(word), 2)
+    assert dictionary.suggest(dico, "Mot", fold(word), 2)[0] == (word, 0)
+
+def test_define_fuzzy(modules, dataframe):
+    dico, _, dictionary = modules
+    rng = random.Random(3)
+    words = set(dataframe["Mot"].tolist())
+
+    misspelled = next(candidate for candidate in (misspell(word, rng, 1) for word in rng.sample(sorted(words), 100))
+                      if candidate.capitalize() not in words and dictionary.suggest(dico, "Mot", candidate, 2))
+    closest, _ = dictionary.suggest(dico, "Mot", misspelled, 2)[0]
+
+    assert dictionary.define(dico, "Mot", "Définitions", misspelled) is None
+    assert dictionary.define(dico, "Mot", "Définitions", misspelled, fuzzy=2) == dico.definitions(dico.find(closest))
+    assert dictionary.define(dico, "Mot", "Définitions", "Zzzzzzzzzzzz", fuzzy=2) is None
@@ -0,0 +1,34 @@
+from lexicon_store import SQLiteStore
+from word_index import fold
+
+# ===================================================================
+#                               TESTS
+# ===================================================================
+def test_search(lexicon, tmp_path):
+    store = SQLiteStore(str(tmp_path / "lexicon.db"))
+    with store.batch():
+        for word in ["Être", "Etre", "Arbre"]:
+            store.add(word, f"1) Définition de {word}.", "0")
+
+    assert lexicon.search(store, "arbre")[1] == "Arbre"
+    assert lexicon.search(store, "êtré", log=False) is None
+
+    # Regardless of case and accents: the closest spelling
+    assert lexicon.search(store, "êtré", strict=False)[1] == "Être"
+    assert lexicon.search(store, "etré", strict=False)[1] == "Etre"
+    assert lexicon.search(store, "arbres", log=False, strict=False) is None
+
+def test_add_word(lexicon, tmp_path):
+    dico = lexicon.dico
+    store = SQLiteStore(str(tmp_path / "lexicon.db"))
+    word = next(word for word in dico.words.tolist() if fold(word) != word.lower() and "-" not in word)
+
+    lexicon.add_word(dico, store, fold(word))
+    assert len(store) == 0
+
+    # Added as written in the dictionary
+    lexicon.add_word(dico, store, fold(word).upper(), strict=False)
+    _, added, definitions, _ = store.get(word)
+    assert added == word
+    assert definitions == "".join(f"{idx + 1}) {definition}" for idx, definition in enumerate(
+        dico.definitions(dico.find(word))))
@@ -0,0 +1,259 @@
+import time
+import random
+import sqlite3
+
+import pytest
+from openpyxl import Workbook, load_workbook
+
+from benchmark import open_lexicon
+from lexicon_store import (LexiconStore, SQLiteStore, WriteBehind, XlsxStore, copy_entries, export_xlsx, import_xlsx,
+                           open_store)
+
+# ===================================================================
+#                             SETTINGS
+# ===================================================================
+ENGINES = ["xlsx", "sqlite"]
+
+ENTRIES = [("Arbre", "1) Végétal.", "1"), ("Été", "1) Saison.", "2"), ("Manga", "1) Bande dessinée.", "3")]
+
+# ===================================================================
+#                              UTILS
+# ===================================================================
+def sheet_rows(sheet) -> list:
+    """ Rows of a sheet below its column names, up to the last one. """
+    return [row for row in sheet.iter_rows(min_row=2, max_col=3, values_only=True)]
+
+def reopen(store):
+    """ Same lexicon, as saved in its file. """
+    return open_store(store.path)
+
+class Failure(Exception):
+    pass
+
+# ===================================================================
+#                               TESTS
+# ===================================================================
+def test_index_of_an_existing_sheet():
+    workbook = Workbook()
+    for row in [["Mot", "Definitions", "Timestamp"], ["Arbre", "1) Végétal.", "1"], ["Été", "1) Saison.", "2"],
+                ["Manga", "1) Bande dessinée.", "3"]]:
+        workbook.active.append(row)
+    store = XlsxStore(workbook.active)
+
+    assert len(store) == 3
+    assert store.get("Été") == (3, "Été", "1) Saison.", "2")
+    assert store.get("Poire") is None
+    assert [word for word, _, _ in store] == ["Arbre", "Été", "Manga"]
+
+    # Written after the last word
+    assert store.add("Tarte", "1) Pâtisserie.", "4") == 5
+
+def test_deletions_are_compacted_on_save(tmp_path):
+    store = open_lexicon("xlsx", str(tmp_path))
+    words = [f"Mot{idx}" for idx in range(30)]
+    with store.batch():
+        for word in words:
+            store.add(word, f"1) Définition de {word}.", "0")
+
+    # The deleted rows stay blank until the lexicon is saved: the other words keep their row
+    removed = random.Random(0).sample(words, 12) + [words[0], words[-1]]
+    kept = [word for word in words if word not in removed]
+    rows = {word: store.get(word)[0] for word in kept}
+    with store.batch():
+        for word in dict.fromkeys(removed):
+            assert store.remove(word)
+            assert {word: store.get(word)[0] for word in kept} == rows
+            assert store.get(word) is None
+        assert [entry[0] for entry in store] == [word for word in words if word in kept]
+        assert len(store) == len(kept)
+
+    # Saved: the words moved up, in the same order, and the index follows them
+    assert [row[0] for row in sheet_rows(store.sheet)] == kept
+    assert [store.get(word)[0] for word in kept] == list(range(2, len(kept) + 2))
+    assert store.get(kept[3])[1:] == (kept[3], f"1) Définition de {kept[3]}.", "0")
+    assert [row[0] for row in sheet_rows(load_workbook(tmp_path / "lexicon.xlsx").active)] == kept
+
+    # The next word is written right after the last one
+    assert store.add("Nouveau", "1) Ajout.", "1") == len(kept) + 2
+    assert not store.remove("Absent")
+
+def test_interface():
+    # Storage engines implement all the methods
+    with pytest.raises(TypeError):
+        LexiconStore(save=lambda: None)
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_store(tmp_path, engine):
+    store = open_lexicon(engine, str(tmp_path))
+    assert len(store) == 0
+    assert list(store) == []
+
+    indexes = [store.add(*entry) for entry in ENTRIES]
+    assert len(set(indexes)) == len(ENTRIES)
+    assert [store.get(word) for word, _, _ in ENTRIES] == [(idx, *entry) for idx, entry in zip(indexes, ENTRIES)]
+    assert store.get("Poire") is None
+    assert "Été" in store and "Poire" not in store
+    assert list(store) == ENTRIES
+
+    assert store.remove("Été")
+    assert not store.remove("Été")
+    assert list(store) == [ENTRIES[0], ENTRIES[2]]
+    assert len(store) == 2
+
+    # Reopened from its file
+    assert list(reopen(store)) == [ENTRIES[0], ENTRIES[2]]
+
+def test_open_store(tmp_path):
+    assert isinstance(open_store(str(tmp_path / "lexicon.db")), SQLiteStore)
+
+    # A new spreadsheet has its column names
+    store = open_store(str(tmp_path / "lexicon.xlsx"))
+    assert isinstance(store, XlsxStore)
+    store.add(*ENTRIES[0])
+    sheet = load_workbook(tmp_path / "lexicon.xlsx").active
+    assert [cell.value for cell in sheet[1]] == ["Mot", "Definitions", "Timestamp"]
+    assert sheet_rows(sheet) == [ENTRIES[0]]
+
+def test_export_import(tmp_path):
+    database = open_store(str(tmp_path / "lexicon.db"))
+    with database.batch():
+        for entry in ENTRIES:
+            database.add(*entry)
+
+    assert export_xlsx(database, str(tmp_path / "lexi.xlsx")) == str(tmp_path / "lexi.xlsx")
+    assert sheet_rows(load_workbook(tmp_path / "lexi.xlsx").active) == ENTRIES
+
+    # The words already in the lexicon are skipped
+    other = open_store(str(tmp_path / "other.db"))
+    other.add("Été", "1) Autre.", "0")
+    assert import_xlsx(str(tmp_path / "lexi.xlsx"), other) == 2
+    assert list(other) == [("Été", "1) Autre.", "0"), ENTRIES[0], ENTRIES[2]]
+    assert copy_entries(database, other) == 0
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_get_folded(tmp_path, engine):
+    store = open_lexicon(engine, str(tmp_path))
+    with store.batch():
+        for word in ["Été", "Arbre", "Ete", "Étê"]:
+            store.add(word, f"1) Définition de {word}.", "0")
+
+    # In insertion order
+    assert [entry[1] for entry in store.get_folded("ete")] == ["Été", "Ete", "Étê"]
+    assert store.get_folded("ete")[1] == store.get("Ete")
+    assert store.get_folded("Été") == [] # Keys are normalized
+    assert store.get_folded("poire") == []
+
+    store.remove("Été")
+    store.add("Ète", "1) Ajout.", "1")
+    assert [entry[1] for entry in store.get_folded("ete")] == ["Ete", "Étê", "Ète"]
+    assert [entry[1] for entry in reopen(store).get_folded("ete")] == ["Ete", "Étê", "Ète"]
+
+def test_folded_column_migration(tmp_path):
+    """ Databases created before the normalized forms were stored get them when opened. """
+
+    connection = sqlite3.connect(tmp_path / "lexicon.db")
+    connection.execute("CREATE TABLE lexicon (id INTEGER PRIMARY KEY AUTOINCREMENT, word TEXT NOT NULL UNIQUE, "
+                       "definitions TEXT, timestamp TEXT)")
+    connection.executemany("INSERT INTO lexicon (word, definitions, timestamp) VALUES (?, ?, ?)", ENTRIES)
+    connection.commit()
+    connection.close()
+
+    store = SQLiteStore(str(tmp_path / "lexicon.db"))
+    assert list(store) == ENTRIES
+    assert store.get_folded("ete") == [store.get("Été")]
+
+    store.add("Ete", "1) Ajout.", "4")
+    assert [entry[1] for entry in store.get_folded("ete")] == ["Été", "Ete"]
+
+def test_batch_saves_once():
+    saves = []
+    persistence = WriteBehind(lambda: saves.append(persistence.pending))
+
+    with persistence.batch():
+        for _ in range(5):
+            persistence.modified()
+        # Nested batches are saved with the outermost one, even when flushed
+        with persistence.batch():
+            persistence.modified()
+        assert persistence.flush() == 0
+        assert saves == []
+    assert saves == [6]
+
+    # Nothing to save
+    with persistence.batch():
+        pass
+    assert saves == [6]
+
+def test_write_behind():
+    saves = []
+    persistence = WriteBehind(lambda: saves.append(persistence.pending))
+    persistence.flush_interval = 0.05
+
+    with persistence.batch():
+        persistence.modified()
+    with persistence.batch():
+        persistence.modified()
+    assert saves == []
+
+    # Saved once by the timer, for both batches
+    deadline = time.monotonic() + 5
+    while not saves and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert saves == [2]
+    assert persistence.pending == 0
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_each_modification_is_saved(tmp_path, engine):
+    store = open_lexicon(engine, str(tmp_path))
+    store.add("Arbre", "1) Végétal.", "0")
+    assert [word for word, _, _ in reopen(store)] == ["Arbre"]
+
+    store.remove("Arbre")
+    assert len(reopen(store)) == 0
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_failed_batch_is_undone(tmp_path, engine):
+    store = open_lexicon(engine, str(tmp_path))
+    with store.batch():
+        for word in ["Arbre", "Été", "Manga"]:
+            store.add(word, f"1) Définition de {word}.", "0")
+    entries = list(store)
+
+    with pytest.raises(Failure):
+        with store.batch():
+            store.add("Tarte", "1) Pâtisserie.", "1")
+            assert store.remove("Été")
+            with store.batch():
+                store.add("Poire", "1) Fruit.", "1")
+            assert store.remove("Arbre")
+            raise Failure
+
+    # Neither applied nor saved
+    assert list(store) == entries
+    assert store.get("Été")[1:] == ("Été", "1) Définition de Été.", "0")
+    assert store.get("Tarte") is None
+    assert store.persistence.pending == 0
+    assert list(reopen(store)) == entries
+
+    # The lexicon is still usable
+    store.add("Tarte", "1) Pâtisserie.", "1")
+    assert [word for word, _, _ in reopen(store)] == ["Arbre", "Été", "Manga", "Tarte"]
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_failed_batch_keeps_the_previous_ones(tmp_path, engine):
+    """ With write-behind, only the modifications of the failed batch are undone, not those waiting to be saved. """
+
+    store = open_lexicon(engine, str(tmp_path))
+    store.flush_interval = 60
+    store.add("Arbre", "1) Végétal.", "0")
+
+    with pytest.raises(Failure):
+        with store.batch():
+            store.remove("Arbre")
+            store.add("Manga", "1) Bande dessinée.", "0")
+            raise Failure
+
+    assert [word for word, _, _ in store] == ["Arbre"]
+    assert store.persistence.pending == 1
+    store.flush_interval = None # Saves the pending modifications
+    assert [word for word, _, _ in reopen(store)] == ["Arbre"]
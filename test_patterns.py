@@ -0,0 +1,67 @@
+import re
+import random
+
+import pytest
+
+from word_index import fold
+
+# ===================================================================
+#                             REFERENCE
+# ===================================================================
+def matching(words: list, pattern: str, no_comp: bool = True, accent_insensitive: bool = False) -> list:
+    """ Words matching a pattern, as a regular expression checked on each word. """
+
+    letters = fold if accent_insensitive else (lambda word: word)
+    pattern = fold(pattern) if accent_insensitive else pattern.capitalize()
+    regex = re.compile("".join(".*" if char == "*" else "." if char == "?" else re.escape(char) for char in pattern))
+    return [word for word in words if regex.fullmatch(letters(word))
+            and not (no_comp and ("-" in word or " " in word))]
+
+def patterns(words: list, seed: int) -> list:
+    """ Patterns drawn from some words: letters replaced by "?", sequences of letters by "*". """
+
+    rng = random.Random(seed)
+    drawn = []
+    for word in rng.sample(words, 12):
+        chars = [char if rng.random() < 0.5 else "?" for char in word.lower()]
+        if rng.random() < 0.3:
+            start = rng.randrange(len(chars))
+            chars[start:start + rng.randint(0, 3)] = ["*"]
+        drawn.append("".join(chars))
+    return drawn
+
+# ===================================================================
+#                               TESTS
+# ===================================================================
+@pytest.mark.parametrize("accent_insensitive", [False, True])
+@pytest.mark.parametrize("no_comp", [True, False])
+def test_pattern(modules, dataframe, accent_insensitive, no_comp):
+    _, multi_filters, _ = modules
+    words = dataframe["Mot"].tolist()
+
+    for pattern in patterns(words, seed=no_comp) + ["*", "?", "a*", "*tion", "*e*e*", "zz??"]:
+        result = multi_filters.multi_filters(dataframe, "Mot", no_comp=no_comp, pattern=pattern,
+                                             accent_insensitive=accent_insensitive, log=None)
+        expected = matching(words, pattern, no_comp, accent_insensitive)
+        assert (result["Mot"].tolist() if result is not None else []) == expected, pattern
+
+@pytest.mark.parametrize("accent_insensitive", [False, True])
+def test_match_patterns(modules, dataframe, accent_insensitive):
+    _, multi_filters, _ = modules
+    words = dataframe["Mot"].tolist()
+    searched = patterns(words, seed=2) + ["?" * 30, "r*"]
+    searched.append(searched[0]) # Duplicated
+
+    results = multi_filters.match_patterns(dataframe, "Mot", searched, accent_insensitive=accent_insensitive,
+                                           log=None)
+    assert list(results) == list(dict.fromkeys(searched))
+    for pattern, result in results.items():
+        assert (result["Mot"].tolist() if result is not None else []) == \
+            matching(words, pattern, accent_insensitive=accent_insensitive), pattern
+
+def test_match_patterns_arguments(modules, dataframe):
+    _, multi_filters, _ = modules
+
+    assert multi_filters.match_patterns(dataframe, "Mot", "g?a??it", log=None) is None
+    assert multi_filters.match_patterns(dataframe, "Mot", ["g?a", ""], log=None) is None
+    assert multi_filters.match_patterns(dataframe, "Absent", ["g?a"], log=None) is None
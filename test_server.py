@@ -0,0 +1,149 @@
+import os
+import json
+import socket
+import asyncio
+import threading
+
+import pytest
+
+from client import Client, ServerError
+from conftest import import_from, reference
+from lexicon_store import SQLiteStore
+
+# ===================================================================
+#                             FIXTURES
+# ===================================================================
+@pytest.fixture(scope="module")
+def server(modules, dictionary_directory, tmp_path_factory):
+    """ Server of the synthetic dictionary, with its own lexicon, serving on a Unix socket in another thread.
+    Returns (server, socket path). """
+
+    directory = tmp_path_factory.mktemp("server")
+    dictionary_server = import_from(dictionary_directory, "server").DictionaryServer(
+        SQLiteStore(str(directory / "lexicon.db")))
+    path = str(directory / "server.sock")
+
+    loop = asyncio.new_event_loop()
+    serving = loop.create_task(dictionary_server.serve(path))
+
+    def run():
+        try:
+            loop.run_until_complete(serving)
+        except asyncio.CancelledError:
+            pass
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+
+    # Listening once the socket is connectable
+    while True:
+        try:
+            Client(path).close()
+            break
+        except (FileNotFoundError, ConnectionRefusedError):
+            assert not serving.done()
+
+    yield dictionary_server, path
+
+    loop.call_soon_threadsafe(serving.cancel)
+    thread.join()
+    loop.close()
+    assert not os.path.exists(path)
+
+# ===================================================================
+#                               TESTS
+# ===================================================================
+def test_dictionary(server, modules, dataframe):
+    dico, multi_filters, _ = modules
+    _, path = server
+    words = dataframe["Mot"].tolist()
+
+    with Client(path) as client:
+        assert client.ping()["words"] == len(dico)
+        assert client.define(words[10].lower()) == dico.definitions(10)
+        assert client.define("Zzzzz") is None
+        assert client.define_many([words[0], words[-1], "Zzzzz"]) == \
+            {words[0]: dico.definitions(0), words[-1]: dico.definitions(len(words) - 1), "Zzzzz": None}
+
+        assert client.multi_filters(length=7, start_with="pr") == \
+            dataframe["Mot"].iloc[reference(words, length=7, start_with="pr")].tolist()
+        assert client.multi_filters(length="7") is None
+        assert client.multi_filters_batch([{"length": 7}, {"end_with": "er"}]) == \
+            [dataframe["Mot"].iloc[reference(words, **query)].tolist() for query in [{"length": 7}, {"end_with": "er"}]]
+        assert client.match_patterns(["pr*"]) == \
+            {"pr*": multi_filters.multi_filters(dataframe, "Mot", pattern="pr*", log=None)["Mot"].tolist()}
+
+def test_lexicon(server, modules):
+    dico, _, _ = modules
+    dictionary_server, path = server
+    word = dico.word(100)
+
+    with Client(path) as client:
+        assert client.search(word) is None
+        entry = client.add_word(word.lower())
+        assert entry[1:3] == [word, "".join(f"{idx + 1}) {definition}" for idx, definition in
+                                            enumerate(dico.definitions(100)))]
+        assert client.search(word) == entry
+
+        assert client.insert("Néologisme", ["Mot nouveau.", "Sens nouveau."])[1:3] == \
+            ["Néologisme", "1) Mot nouveau. 2) Sens nouveau. "]
+        assert client.search("neologisme") is None
+        assert client.search("neologisme", strict=False)[1] == "Néologisme"
+
+        assert client.delete(word)
+        assert not client.delete(word)
+        assert client.search(word) is None
+
+    assert [entry[0] for entry in dictionary_server.store] == ["Néologisme"]
+
+def test_errors(server):
+    _, path = server
+
+    with Client(path) as client:
+        with pytest.raises(ServerError, match="unknown operation"):
+            client.request("drop")
+        with pytest.raises(ServerError, match="TypeError"):
+            client.request("define", mot="manga")
+
+        # The connection is still usable
+        assert client.define("Zzzzz") is None
+
+def test_concurrent_requests(server, modules):
+    """ The requests written at once on a connection are all answered, in any order, with the id of their
+    request. """
+
+    dico, _, _ = modules
+    _, path = server
+
+    connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    connection.connect(path)
+    with connection, connection.makefile("rwb") as file:
+        requests = [{"id": row, "op": "define", "args": {"word": dico.word(row)}} for row in range(50)]
+        requests.append({"id": "ping", "op": "ping"})
+        file.write(b"".join(json.dumps(request).encode() + b"\n" for request in requests))
+        file.flush()
+
+        responses = {}
+        for _ in requests:
+            response = json.loads(file.readline())
+            responses[response["id"]] = response["result"]
+
+    assert responses.pop("ping")["requests"] >= len(requests)
+    assert responses == {row: dico.definitions(row) for row in range(50)}
+
+def test_several_clients(server, modules):
+    dico, _, _ = modules
+    _, path = server
+    results = {}
+
+    def define(row: int):
+        with Client(path) as client:
+            results[row] = [client.define(dico.word(row + offset)) for offset in range(20)]
+
+    threads = [threading.Thread(target=define, args=(row,)) for row in range(0, 200, 20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == {row: [dico.definitions(row + offset) for offset in range(20)] for row in range(0, 200, 20)}
@@ -0,0 +1,68 @@
+import pytest
+
+from conftest import reference
+
+# ===================================================================
+#                               TESTS
+# ===================================================================
+def test_filter_session(modules, dataframe):
+    _, multi_filters, _ = modules
+    words = dataframe["Mot"].tolist()
+    session = multi_filters.FilterSession(dataframe, "Mot", log=None)
+
+    # Each refinement keeps the words matching all the filters so far
+    steps = [{"contains": ["e"]}, {"not_contain": ["a"]}, {"nth_letters": [[2, "r"]]}]
+    expected = [set(range(len(words)))]
+    for step in steps:
+        session.refine(**step)
+        expected.append(expected[-1] & set(reference(words, **step)))
+        assert session.rows.tolist() == sorted(expected[-1])
+    assert session.words() == [words[row] for row in sorted(expected[-1])]
+
+    assert session.undo()
+    assert session.rows.tolist() == sorted(expected[-2])
+
+    session.reset()
+    assert session.refine(length=7)["Mot"].tolist() == [words[row] for row in reference(words, length=7)]
+
+def test_session_history(modules, dataframe):
+    _, multi_filters, _ = modules
+    words = dataframe["Mot"].tolist()
+    session = multi_filters.FilterSession(dataframe, "Mot", no_comp=False, history=2, log=None)
+    assert len(session) == len(words)
+
+    for length in [7, 7, 7]:
+        session.refine(length=length)
+    # Only the last two refinements can be undone
+    assert session.undo() and session.undo()
+    assert not session.undo()
+    assert session.rows.tolist() == reference(words, no_comp=False, length=7)
+
+    # Wrong filters leave the candidates unchanged, and add nothing to undo
+    assert session.refine(length="7") is None
+    assert session.rows.tolist() == reference(words, no_comp=False, length=7)
+    assert not session.undo()
+
+    session.reset()
+    assert len(session) == len(words)
+    assert not session.undo()
+
+def test_session_accent_insensitive(modules, dataframe):
+    _, multi_filters, _ = modules
+    words = dataframe["Mot"].tolist()
+    session = multi_filters.FilterSession(dataframe, "Mot", accent_insensitive=True, log=None)
+
+    session.refine(start_with="E")
+    session.refine(contains=["e", "e"], pattern="*r?")
+    expected = set(reference(words, start_with="e", accent_insensitive=True)) & \
+        set(reference(words, contains=["e", "e"], accent_insensitive=True)) & \
+        {row for row, word in enumerate(words) if len(word) > 1 and word[-2] in "rR"}
+    assert session.rows.tolist() == sorted(expected)
+
+def test_session_arguments(modules, dataframe):
+    _, multi_filters, _ = modules
+
+    with pytest.raises(ValueError):
+        multi_filters.FilterSession(dataframe, "Absent", log=None)
+    with pytest.raises(ValueError):
+        multi_filters.FilterSession(dataframe["Mot"], "Mot", log=None)
@@ -0,0 +1,65 @@
+import pytest
+
+from conftest import reference
+from instrumentation import collect
+from test_filters import QUERIES
+
+# ===================================================================
+#                               TESTS
+# ===================================================================
+@pytest.mark.parametrize("query", QUERIES, ids=str)
+def test_stream_filters(modules, dataframe, query):
+    dico, multi_filters, _ = modules
+    words = list(multi_filters.stream_filters(dico, chunk_size=500, log=None, **query))
+
+    expected = reference(dataframe["Mot"].tolist(), **query)
+    assert words == dataframe["Mot"].iloc[expected].tolist()
+
+def test_stream_filters_limit(modules, dataframe):
+    dico, multi_filters, _ = modules
+    found = list(multi_filters.stream_filters(dico, contains=["e"], limit=10, chunk_size=7, definitions=True,
+                                              log=None))
+
+    expected = reference(dataframe["Mot"].tolist(), contains=["e"])[:10]
+    assert [word for word, _ in found] == dataframe["Mot"].iloc[expected].tolist()
+    assert [definitions for _, definitions in found] == [dico.definitions(row) for row in expected]
+
+def test_stream_filters_path(modules, dataframe, dictionary_directory):
+    _, multi_filters, _ = modules
+    words = multi_filters.stream_filters(str(dictionary_directory / "files" / "dico.bin"), length=7, log=None)
+
+    assert list(words) == dataframe["Mot"].iloc[reference(dataframe["Mot"].tolist(), length=7)].tolist()
+
+def test_stream_filters_event(modules):
+    """ The query event lists the filters crossed by all the chunks, whatever the plan of each chunk. """
+
+    dico, multi_filters, _ = modules
+    events = []
+    with collect(events.append):
+        found = list(multi_filters.stream_filters(dico, length=7, start_with="pr", contains=["e"], chunk_size=100,
+                                                  log=None))
+
+    query = [event for event in events if event["event"] == "query"]
+    assert len(query) == 1
+    assert sorted(query[0]["filters"]) == ["contains", "length", "no_comp", "start_with"]
+    assert query[0]["rows_total"] == len(dico)
+    assert query[0]["rows_after"] == len(found)
+
+    # Also sent when the words aren't all read
+    events.clear()
+    with collect(events.append):
+        words = multi_filters.stream_filters(dico, contains=["e"], chunk_size=100, log=None)
+        next(words)
+        words.close()
+    query = [event for event in events if event["event"] == "query"]
+    assert query[0]["rows_total"] == 100
+    assert query[0]["rows_after"] == 1
+
+def test_stream_filters_arguments(modules, tmp_path):
+    dico, multi_filters, _ = modules
+
+    assert multi_filters.stream_filters(str(tmp_path / "missing.bin"), log=None) is None
+    assert multi_filters.stream_filters(dico.to_dataframe(), log=None) is None
+    assert multi_filters.stream_filters(dico, limit=0, log=None) is None
+    assert multi_filters.stream_filters(dico, chunk_size=0, log=None) is None
+    assert multi_filters.stream_filters(dico, length="7", log=None) is None
@@ -0,0 +1,907 @@
+import sys
+import mmap
+import weakref
+import unicodedata
+from bisect import bisect_left
+from collections import Counter
+from functools import cached_property
+from typing import Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from fuzzy import MAX_DISTANCE, FuzzyIndex, distance_bounds, edit_distance
+
+# Rack tiles standing for any letter in anagram queries
+BLANK_TILES = ("?", "*")
+
+# Maximum number of letters stored per word in the code point matrix. The
+# letters beyond it are read from the words themselves.
+MATRIX_WIDTH = 32
+
+# Number of words converted at once when building the code point matrix
+MATRIX_CHUNK = 100000
+
+# Sorted words are found by bisecting one word out of ORDERED_SAMPLE, then the block of words between two of them
+ORDERED_SAMPLE = 16
+
+# Letter bitmasks: the 63 most frequent characters of a column get their own bit, the last bit is set for words
+# containing any other character
+OVERFLOW_BIT = 63
+
+# ===================================================================
+#                           NORMALIZATION
+# ===================================================================
+def remove_accents(input_str):
+    """
+    Removes accents from characters in a string.
+
+    The function uses the 'unicodedata' module to normalize the character string according to the NFD standard, which
+    breaks down characters into their basic components.
+
+    Args:
+        input_str (str): Character string from which the accents must be removed.
+    """
+    # String normalization
+    # Transforms the original string into a new string where accented characters are represented by a sequence of base
+    # characters and combining characters (accents). It does not remove the accents; it simply separates them from the
+    # letters they modify. At this point, the length of the string has therefore increased if it contained accented
+    # characters, one extra character for each (although doubled characters are not visible in print).
+    # For example, the word “été” would be decomposed into “e”, “ ' ", "t”, “e”, “ ' ”. Accents have been decomposed
+    # from their base letter.
+    normalized_form = unicodedata.normalize('NFD', input_str)
+
+    # The 'combining' method returns True if 'c' is a combining character (such as an accent).
+    # List comprehension only retains characters that are not combining characters, thus eliminating accents.
+    return ''.join([c for c in normalized_form if not unicodedata.combining(c)])
+
+class _FoldTable(dict):
+    """ Translation table (for 'str.translate') of each character to its normalized form, filled on first use. """
+
+    def __missing__(self, code_point: int) -> str:
+        self[code_point] = remove_accents(chr(code_point)).lower()
+        return self[code_point]
+
+_FOLD_TABLE = _FoldTable()
+
+def fold(word: str) -> str:
+    """ Normalized form of a word used for accent and case insensitive comparisons: no accents, lower case.
+
+    Each character is normalized once, then looked up in a translation table,
+    which is much faster than normalizing the whole string each time.
+    """
+    return word.translate(_FOLD_TABLE)
+
+def fold_all(words: Sequence[str]) -> list:
+    """ Normalized form of several words, translated in a single call. """
+    if not words:
+        return []
+    return "\n".join(words).translate(_FOLD_TABLE).split("\n")
+
+def closest_spelling(word: str, spellings: Sequence[str]) -> int:
+    """ Position of the spelling closest to a word among spellings sharing its normalized form ("Etre" -> "Être"):
+    the same letters regardless of case first, then the fewest accent differences. The first one in case of a tie.
+    """
+
+    target = word.lower()
+    distances = [edit_distance(target, spelling.lower(), len(target) + len(spelling)) for spelling in spellings]
+    return distances.index(min(distances))
+
+# ===================================================================
+#                             WORD INDEX
+# ===================================================================
+class WordIndex:
+    """ Lookup structures built once over a column of words.
+
+    The rows handled by the index are positions in the column (from 0 to
+    len - 1), not dataframe labels. Each structure is only built the first
+    time it is needed.
+
+    Args:
+        words (Sequence[str]): Words of the column, in the column order.
+        folded (Sequence[str]): Normalized form of the words if already known (see 'fold()').
+        fuzzy (FuzzyIndex): Fuzzy index of the words if already built (see 'fuzzy').
+        ordered (bool): The words are sorted: they are found by bisection, without building a hash index holding
+        all of them, and they are used as they are for the prefix lookups.
+    """
+
+    def __init__(self, words: Sequence[str], folded: Optional[Sequence[str]] = None,
+                 fuzzy: Optional[FuzzyIndex] = None, ordered: bool = False):
+        self.words = words
+        self.size = len(words)
+        self.ordered = ordered
+        self._position_histograms = {} # Number of words having each code point, by (position, folded)
+        if folded is not None:
+            self.folded = folded
+        if fuzzy is not None:
+            self.fuzzy = fuzzy
+
+    @cached_property
+    def _exact(self) -> tuple:
+        """ Hash index of the words: (unique words, row of their first occurrence). """
+        words = pd.Series(self.words, dtype=object)
+        unique = words.drop_duplicates(keep="first")
+        # Same dtype as the words looked up in 'positions()': a string dtype index would convert them on each call
+        return pd.Index(unique.to_numpy(dtype=object), dtype=object), unique.index.to_numpy()
+
+    def positions(self, words: Sequence[str]) -> np.ndarray:
+        """ Rows of the first occurrence of several words, all resolved at once: a single hash lookup, or for sorted
+        words a single bisection in the sampled words followed by a few vectorized steps (see '_ordered_positions()').
+
+        Args:
+            words (Sequence[str]): Words to find, exactly as stored.
+
+        Returns:
+            (numpy.ndarray): Row of each word, -1 for the words not found.
+        """
+
+        if self.ordered:
+            return self._ordered_positions(words)
+
+        unique, first_rows = self._exact
+        found = unique.get_indexer(pd.Index(list(words), dtype=object))
+        return np.where(found >= 0, first_rows[found], -1)
+
+    def position(self, word: str, strict: bool = True) -> int:
+        """ Row of the first occurrence of a word, -1 if not found.
+
+        Args:
+            word (str): Word to find.
+            strict (bool): False to find the word regardless of case and accents if it isn't stored as written: the
+            row of the closest spelling sharing its normalized form (see 'closest_spelling()').
+        """
+
+        row = self._ordered_position(word) if self.ordered else int(self.positions([word])[0])
+        if row >= 0 or strict:
+            return row
+
+        rows = self.folded_positions(fold(word))
+        if not len(rows):
+            return -1
+        return int(rows[closest_spelling(word, [self.words[other] for other in rows.tolist()])])
+
+    @cached_property
+    def _sampled_words(self) -> np.ndarray:
+        """ One sorted word out of ORDERED_SAMPLE, as an array of objects (bisected by 'numpy.searchsorted()'). """
+        sampled = self.words[::ORDERED_SAMPLE]
+        array = np.empty(len(sampled), dtype=object)
+        array[:] = sampled
+        return array
+
+    def _ordered_position(self, word: str) -> int:
+        """ Row of the first occurrence of a word among sorted words, -1 if not found.
+
+        The word is bisected in the sampled words, then in the block of words
+        (decoded at once) between the two samples surrounding it.
+        """
+
+        sample = bisect_left(self._sampled_words, word)
+        start = max(sample - 1, 0) * ORDERED_SAMPLE
+        block = self.words[start:sample * ORDERED_SAMPLE + 1]
+        idx = bisect_left(block, word)
+        return start + idx if idx < len(block) and block[idx] == word else -1
+
+    def _ordered_positions(self, words: Sequence[str]) -> np.ndarray:
+        """ Rows of the first occurrence of several words among sorted words, -1 for the words not found.
+
+        All the words are bisected in the sampled words by a single
+        'numpy.searchsorted()', then bisected together in the blocks between
+        the samples surrounding them: each step decodes one word per block,
+        all of them at once.
+        """
+
+        targets = np.empty(len(words), dtype=object)
+        targets[:] = list(words)
+        if not len(targets) or not self.size:
+            return np.full(len(targets), -1, dtype=np.int64)
+
+        # First row holding a word >= the target, between the sample before it and the sample after it
+        samples = np.searchsorted(self._sampled_words, targets)
+        low = np.maximum(samples - 1, 0) * ORDERED_SAMPLE
+        high = np.minimum(samples * ORDERED_SAMPLE, self.size)
+        while True:
+            active = np.flatnonzero(low < high)
+            if not len(active):
+                break
+            middle = (low[active] + high[active]) // 2
+            below = np.array(_take(self.words, middle.tolist()), dtype=object) < targets[active]
+            low[active] = np.where(below, middle + 1, low[active])
+            high[active] = np.where(below, high[active], middle)
+
+        rows = np.minimum(low, self.size - 1)
+        found = (low < self.size) & (np.array(_take(self.words, rows.tolist()), dtype=object) == targets)
+        return np.where(found, low, -1)
+
+    @cached_property
+    def word_array(self) -> np.ndarray:
+        """ Words as a numpy array, to be indexed by rows. """
+        array = np.empty(self.size, dtype=object)
+        array[:] = self.words
+        return array
+
+    # -------------------------------------------------------------------
+    #                          NORMALIZED FORMS
+    # -------------------------------------------------------------------
+    @cached_property
+    def folded(self) -> list:
+        """ Normalized form of each word (see 'fold()'). """
+        return fold_all(self.words)
+
+    @cached_property
+    def _folded_exact(self) -> tuple:
+        """ Hash index of the normalized words: (unique normalized words, bounds of the rows of each one in 'order',
+        'order': rows sorted by normalized word). """
+
+        keys, order = self._folded_prefixes
+        array = np.empty(len(keys), dtype=object)
+        array[:] = keys
+        starts = np.flatnonzero(np.r_[True, array[1:] != array[:-1]]) if len(array) else np.empty(0, dtype=np.int64)
+        return pd.Index(array[starts], dtype=object), np.append(starts, len(array)), order
+
+    def folded_positions(self, key: str) -> np.ndarray:
+        """ Sorted rows of the words whose normalized form is 'key' (see 'fold()'): "etre" -> "Être", "Etre"...
+
+        Found in constant time through a hash index of the normalized words, built on the first call.
+        """
+
+        unique, bounds, order = self._folded_exact
+        idx = unique.get_indexer([key])[0]
+        if idx < 0:
+            return np.empty(0, dtype=np.int64)
+        return np.sort(order[bounds[idx]:bounds[idx + 1]])
+
+    @cached_property
+    def folded_array(self) -> np.ndarray:
+        """ Normalized form of each word, as a numpy array to be indexed by rows. """
+        array = np.empty(self.size, dtype=object)
+        array[:] = self.folded
+        return array
+
+    # -------------------------------------------------------------------
+    #                          COMPOUND WORDS
+    # -------------------------------------------------------------------
+    @cached_property
+    def compound(self) -> np.ndarray:
+        """ Which words are compound words (containing a space or a hyphen). """
+        return pd.Series(self.words, dtype=object).str.contains(r"[\s-]").to_numpy(dtype=bool)
+
+    @cached_property
+    def compound_count(self) -> int:
+        """ Number of compound words. """
+        return int(np.count_nonzero(self.compound))
+
+    # -------------------------------------------------------------------
+    #                          LETTER POSITIONS
+    # -------------------------------------------------------------------
+    @cached_property
+    def lengths(self) -> np.ndarray:
+        """ Length of each word. """
+        return np.fromiter(map(len, self.words), dtype=np.int32, count=self.size)
+
+    @cached_property
+    def length_histogram(self) -> np.ndarray:
+        """ Number of words of each length. """
+        return np.bincount(self.lengths, minlength=1)
+
+    @cached_property
+    def folded_length_histogram(self) -> np.ndarray:
+        """ Number of normalized words of each length. """
+        return np.bincount(self.folded_lengths, minlength=1)
+
+    @cached_property
+    def _length_order(self) -> np.ndarray:
+        """ Rows sorted by word length: the words of a given length are contiguous. """
+        return np.argsort(self.lengths, kind="stable")
+
+    @cached_property
+    def _folded_length_order(self) -> np.ndarray:
+        """ Rows sorted by normalized word length. """
+        return np.argsort(self.folded_lengths, kind="stable")
+
+    def length_rows(self, length: int, folded: bool = False) -> np.ndarray:
+        """ Sorted rows of the words (or normalized words) of a given length. """
+
+        histogram = self.folded_length_histogram if folded else self.length_histogram
+        if not 0 <= length < len(histogram):
+            return np.empty(0, dtype=np.int64)
+        start = int(histogram[:length].sum())
+        return (self._folded_length_order if folded else self._length_order)[start:start + histogram[length]]
+
+    @cached_property
+    def folded_lengths(self) -> np.ndarray:
+        """ Length of each normalized word. """
+        return np.fromiter(map(len, self.folded), dtype=np.int32, count=self.size)
+
+    @cached_property
+    def codepoints(self) -> np.ndarray:
+        """ Code point matrix of the words: one row per word, padded with zeros (see '_codepoint_matrix()'). """
+        return _codepoint_matrix(self.words)
+
+    @cached_property
+    def folded_codepoints(self) -> np.ndarray:
+        """ Code point matrix of the normalized words. """
+        return _codepoint_matrix(self.folded)
+
+    def position_frequency(self, rank: int, letter: str, folded: bool = False) -> int:
+        """ Number of words having a letter at a given position (from 1).
+
+        Beyond the width of the code point matrix, the number of words long
+        enough is returned as an upper bound.
+        """
+
+        matrix = self.folded_codepoints if folded else self.codepoints
+        if rank > matrix.shape[1]:
+            lengths = self.folded_lengths if folded else self.lengths
+            return int(np.count_nonzero(lengths >= rank))
+
+        key = (rank, folded)
+        if key not in self._position_histograms:
+            self._position_histograms[key] = np.bincount(matrix[:, rank - 1])
+        histogram = self._position_histograms[key]
+        return int(histogram[ord(letter)]) if ord(letter) < len(histogram) else 0
+
+    def letter_mask(self, rows: np.ndarray, rank: int, letter: str, folded: bool = False) -> np.ndarray:
+        """ Which of the given rows have a letter at a given position, as a single vectorized comparison.
+
+        Args:
+            rows (numpy.ndarray): Rows to test.
+            rank (int): Position of the letter, from 1.
+            letter (str): Letter expected (one character).
+            folded (bool): Test the normalized words instead of the words.
+
+        Returns:
+            (numpy.ndarray): Boolean mask over 'rows'.
+        """
+
+        matrix = self.folded_codepoints if folded else self.codepoints
+
+        if rank <= matrix.shape[1]:
+            # Words shorter than 'rank' are padded with 0, which never matches a letter
+            return matrix[rows, rank - 1] == ord(letter)
+
+        # Position beyond the matrix width: only the (rare) long words are read
+        words = self.folded if folded else self.words
+        lengths = self.folded_lengths if folded else self.lengths
+        mask = np.zeros(len(rows), dtype=bool)
+        for idx in np.flatnonzero(lengths[rows] >= rank).tolist():
+            mask[idx] = words[rows[idx]][rank - 1] == letter
+        return mask
+
+    # -------------------------------------------------------------------
+    #                          LETTER PRESENCE
+    # -------------------------------------------------------------------
+    @cached_property
+    def letter_bits(self) -> tuple:
+        """ Letters present in each word, as a bitmask (see '_letter_bits()'). """
+        return _letter_bits(self.words, self.codepoints, self.lengths)
+
+    @cached_property
+    def folded_letter_bits(self) -> tuple:
+        """ Letters present in each normalized word, as a bitmask. """
+        return _letter_bits(self.folded, self.folded_codepoints, self.folded_lengths)
+
+    @cached_property
+    def _bit_frequency(self) -> np.ndarray:
+        """ Number of words having each bit of their letter bitmask set. """
+        return _bit_frequency(self.letter_bits[1])
+
+    @cached_property
+    def _folded_bit_frequency(self) -> np.ndarray:
+        """ Number of normalized words having each bit of their letter bitmask set. """
+        return _bit_frequency(self.folded_letter_bits[1])
+
+    def letter_frequency(self, letter: str, folded: bool = False) -> int:
+        """ Number of words containing a letter.
+
+        For a letter without a bit of its own, the number of words containing
+        any rare character is returned as an upper bound.
+        """
+
+        table = (self.folded_letter_bits if folded else self.letter_bits)[0]
+        frequency = self._folded_bit_frequency if folded else self._bit_frequency
+        return int(frequency[table.get(letter, OVERFLOW_BIT)])
+
+    def letter_counts(self, rows: np.ndarray, letter: str, folded: bool = False) -> np.ndarray:
+        """ Number of occurrences of a letter in each of the given rows.
+
+        Args:
+            rows (numpy.ndarray): Rows to count.
+            letter (str): Letter to count (one character).
+            folded (bool): Count in the normalized words instead of the words.
+
+        Returns:
+            (numpy.ndarray): Number of occurrences, for each row.
+        """
+
+        matrix = self.folded_codepoints if folded else self.codepoints
+        counts = (matrix[rows] == ord(letter)).sum(axis=1)
+
+        # Letters beyond the matrix width
+        words = self.folded if folded else self.words
+        lengths = self.folded_lengths if folded else self.lengths
+        width = matrix.shape[1]
+        for idx in np.flatnonzero(lengths[rows] > width).tolist():
+            counts[idx] += words[rows[idx]][width:].count(letter)
+        return counts
+
+    def contains_mask(self, rows: np.ndarray, letters: dict, folded: bool = False) -> np.ndarray:
+        """ Which of the given rows contain all the given letters, at least a given number of times each.
+
+        The presence of the letters is tested with a single AND over the
+        letter bitmasks. The occurrences are only counted for the letters
+        required several times (or without a bit of their own), and only on
+        the rows that passed the bitmask test.
+
+        Args:
+            rows (numpy.ndarray): Rows to test.
+            letters (dict): Minimum number of occurrences, by letter (one character).
+            folded (bool): Test the normalized words instead of the words.
+
+        Returns:
+            (numpy.ndarray): Boolean mask over 'rows'.
+        """
+
+        table, bits = self.folded_letter_bits if folded else self.letter_bits
+
+        required = 0
+        to_count = []
+        for letter, minimum in letters.items():
+            bit = table.get(letter, OVERFLOW_BIT)
+            required |= 1 << bit
+            if minimum > 1 or bit == OVERFLOW_BIT:
+                to_count.append((letter, minimum))
+
+        required = np.uint64(required)
+        mask = (bits[rows] & required) == required
+
+        for letter, minimum in to_count:
+            candidates = np.flatnonzero(mask)
+            mask[candidates] = self.letter_counts(rows[candidates], letter, folded) >= minimum
+        return mask
+
+    def excludes_mask(self, rows: np.ndarray, letters: Sequence[str], folded: bool = False) -> np.ndarray:
+        """ Which of the given rows contain none of the given letters.
+
+        Args:
+            rows (numpy.ndarray): Rows to test.
+            letters (Sequence[str]): Forbidden letters (one character each).
+            folded (bool): Test the normalized words instead of the words.
+
+        Returns:
+            (numpy.ndarray): Boolean mask over 'rows'.
+        """
+
+        table, bits = self.folded_letter_bits if folded else self.letter_bits
+        bits = bits[rows]
+
+        forbidden = 0
+        rare = []
+        for letter in letters:
+            if letter in table:
+                forbidden |= 1 << table[letter]
+            else:
+                rare.append(letter)
+
+        mask = (bits & np.uint64(forbidden)) == 0
+
+        # Letters without a bit of their own: only the words having the overflow bit can contain them
+        for letter in rare:
+            candidates = np.flatnonzero(mask & ((bits & np.uint64(1 << OVERFLOW_BIT)) != 0))
+            mask[candidates] = self.letter_counts(rows[candidates], letter, folded) == 0
+        return mask
+
+    # -------------------------------------------------------------------
+    #                        PREFIXES AND SUFFIXES
+    # -------------------------------------------------------------------
+    @cached_property
+    def _prefixes(self) -> tuple:
+        """ Sorted words and their rows (see '_sorted_keys()'). """
+        if self.ordered:
+            return self.words, np.arange(self.size)
+        return _sorted_keys(self.words)
+
+    @cached_property
+    def _folded_prefixes(self) -> tuple:
+        """ Sorted normalized words and their rows. """
+        return _sorted_keys(self.folded)
+
+    @cached_property
+    def _suffixes(self) -> tuple:
+        """ Sorted reversed words and their rows: the words sharing an ending are contiguous. """
+        return _sorted_keys([word[::-1] for word in self.words])
+
+    @cached_property
+    def _folded_suffixes(self) -> tuple:
+        """ Sorted reversed normalized words and their rows. """
+        return _sorted_keys([word[::-1] for word in self.folded])
+
+    def prefix_count(self, prefix: str, folded: bool = False) -> int:
+        """ Number of words beginning with 'prefix'. """
+        lo, hi = _key_range((self._folded_prefixes if folded else self._prefixes)[0], prefix)
+        return hi - lo
+
+    def suffix_count(self, suffix: str, folded: bool = False) -> int:
+        """ Number of words ending with 'suffix'. """
+        lo, hi = _key_range((self._folded_suffixes if folded else self._suffixes)[0], suffix[::-1])
+        return hi - lo
+
+    def prefix_rows(self, prefix: str, folded: bool = False) -> np.ndarray:
+        """ Rows of the words beginning with 'prefix', found by bisection in the sorted words.
+
+        Args:
+            prefix (str): Beginning of the words.
+            folded (bool): Search the normalized words instead of the words.
+
+        Returns:
+            (numpy.ndarray): Sorted rows of the matching words.
+        """
+
+        keys, order = self._folded_prefixes if folded else self._prefixes
+        lo, hi = _key_range(keys, prefix)
+        return np.sort(order[lo:hi])
+
+    def suffix_rows(self, suffix: str, folded: bool = False) -> np.ndarray:
+        """ Rows of the words ending with 'suffix', found by bisection in the sorted reversed words.
+
+        Args:
+            suffix (str): Ending of the words.
+            folded (bool): Search the normalized words instead of the words.
+
+        Returns:
+            (numpy.ndarray): Sorted rows of the matching words.
+        """
+
+        keys, order = self._folded_suffixes if folded else self._suffixes
+        lo, hi = _key_range(keys, suffix[::-1])
+        return np.sort(order[lo:hi])
+
+    # -------------------------------------------------------------------
+    #                             ANAGRAMS
+    # -------------------------------------------------------------------
+    @cached_property
+    def _anagram_index(self) -> tuple:
+        """ Words grouped by signature, the sorted letters of their normalized form.
+
+        Returns (sorted unique signatures, start of each group in 'order', size of each group, 'order': rows sorted
+        by signature).
+        """
+
+        signatures = np.empty(self.size, dtype=object)
+        signatures[:] = ["".join(sorted(word)) for word in self.folded]
+        order = np.argsort(signatures, kind="stable")
+        unique, starts, counts = np.unique(signatures[order], return_index=True, return_counts=True)
+        return unique.tolist(), starts, counts, order
+
+    def _has_prefix(self, prefix: str) -> bool:
+        """ At least one signature starts with 'prefix'. """
+        signatures = self._anagram_index[0]
+        idx = bisect_left(signatures, prefix)
+        return idx < len(signatures) and signatures[idx].startswith(prefix)
+
+    def anagram_rows(self, tiles: Sequence[str], length: Optional[int] = None) -> np.ndarray:
+        """ Rows of the words that can be written with some or all of the given tiles.
+
+        The letters are compared without accents nor case. Tiles in BLANK_TILES
+        stand for any letter. Instead of generating the permutations of the
+        tiles, the sub-multisets of the tiles are enumerated in signature order,
+        and a branch is abandoned as soon as no signature of the dictionary
+        starts with it: the cost depends on the number of answers, not on the
+        number of permutations.
+
+        Args:
+            tiles (Sequence[str]): Available letters.
+            length (int): Only the words of this length are returned.
+
+        Returns:
+            (numpy.ndarray): Sorted rows of the matching words.
+        """
+
+        signatures, starts, counts, order = self._anagram_index
+
+        letters = Counter(fold("".join(tile for tile in tiles if tile not in BLANK_TILES)))
+        blanks = sum(tile in BLANK_TILES for tile in tiles)
+
+        # Characters to try at each step: the letters of the tiles and, if there are blanks, any letter of the
+        # dictionary
+        wildcards = set(self._letters) if blanks else set()
+        alphabet = sorted(set(letters) | wildcards)
+
+        found = []
+
+        def explore(start: int, prefix: str, blanks_left: int):
+            idx = bisect_left(signatures, prefix)
+            if prefix and idx < len(signatures) and signatures[idx] == prefix \
+                    and (length is None or len(prefix) == length):
+                found.append(idx)
+
+            if length is not None and len(prefix) >= length:
+                return
+
+            for position in range(start, len(alphabet)):
+                char = alphabet[position]
+                available = letters.get(char, 0) + (blanks_left if char in wildcards else 0)
+                extended = prefix
+                for count in range(1, available + 1):
+                    extended += char
+                    if not self._has_prefix(extended):
+                        break
+                    explore(position + 1, extended, blanks_left - max(0, count - letters.get(char, 0)))
+
+        explore(0, "", blanks)
+
+        if not found:
+            return np.empty(0, dtype=np.int64)
+        return np.sort(np.concatenate([order[starts[idx]:starts[idx] + counts[idx]] for idx in found]))
+
+    @cached_property
+    def _letters(self) -> list:
+        """ Letters appearing in the normalized words, which a blank tile can stand for. """
+        return sorted({char for signature in self._anagram_index[0] for char in set(signature) if char.isalpha()})
+
+    # -------------------------------------------------------------------
+    #                           FUZZY LOOKUP
+    # -------------------------------------------------------------------
+    @cached_property
+    def fuzzy(self) -> FuzzyIndex:
+        """ Deletes index of the normalized words (see 'fuzzy.FuzzyIndex'). """
+        return FuzzyIndex.build(self.folded)
+
+    def similar(self, word: str, max_distance: int = MAX_DISTANCE, limit: Optional[int] = None) -> list:
+        """ Words within an edit distance of a word, such as the words a misspelled word was meant to be.
+
+        The distance is computed between the normalized forms, so that missing
+        or wrong accents are not counted ("ete" is at distance 0 of "été"); the
+        words at the same distance are sorted by their distance with the word
+        as written, accents included (but not case).
+
+        The candidates of the fuzzy index of too different a length, then
+        those too different by their letters (see 'fuzzy.distance_bounds()'),
+        are rejected before their distance is computed. When 'limit' words
+        are found within a distance, the candidates beyond it are skipped.
+
+        Args:
+            word (str): Word to search.
+            max_distance (int): Largest edit distance, up to the one of the fuzzy index.
+            limit (int): Maximum number of words returned, None for all of them.
+
+        Returns:
+            (list): (row, distance) of each word found, the closest first.
+        """
+
+        folded_word = fold(word)
+        max_distance = min(max_distance, self.fuzzy.max_distance)
+
+        rows = self.fuzzy.candidates(folded_word, max_distance)
+        rows = rows[np.abs(self.folded_lengths[rows] - len(folded_word)) <= max_distance].tolist()
+        candidates = _take(self.folded, rows)
+
+        # Candidates by increasing lower bound: once 'limit' words are found within a distance, the candidates
+        # beyond it are skipped, and the distances are only computed up to it
+        bounds = distance_bounds(folded_word, candidates)
+        order = np.argsort(bounds, kind="stable").tolist()
+        bounds = bounds.tolist()
+        within = [0] * (max_distance + 1) # Number of words found at each distance
+        found = [] # (row, normalized word, distance) of each word found
+        for position in order:
+            if bounds[position] > max_distance:
+                break
+            distance = edit_distance(folded_word, candidates[position], max_distance)
+            if distance <= max_distance:
+                found.append((rows[position], candidates[position], distance))
+                within[distance] += 1
+                while limit is not None and max_distance and sum(within[:max_distance]) >= limit:
+                    max_distance -= 1
+        found = [(row, candidate, distance) for row, candidate, distance in found if distance <= max_distance]
+
+        # Accents only matter between words at the same distance (the same distance when neither word has any)
+        written = word.lower()
+        keys = []
+        for (row, candidate, distance), candidate_written in zip(found, _take(self.words, [row for row, *_ in found])):
+            candidate_written = candidate_written.lower()
+            if written == folded_word and candidate_written == candidate:
+                keys.append((distance, distance, row))
+            else:
+                keys.append((distance, edit_distance(written, candidate_written, distance + 2), row))
+        found = sorted(keys)
+        return [(row, distance) for distance, _, row in found[:limit]]
+
+    # -------------------------------------------------------------------
+    #                           MEMORY USAGE
+    # -------------------------------------------------------------------
+    def memory_usage(self, seen: Optional[set] = None) -> dict:
+        """ Memory held by the index, in bytes, by structure (only the structures built so far, see 'deep_size()').
+
+        The objects shared by several structures (the words held by 'words' and 'word_array' for instance) are
+        counted once, in the first of them.
+
+        Args:
+            seen (set): Ids of the objects already counted elsewhere (see 'deep_size()').
+        """
+
+        seen = set() if seen is None else seen
+        return {name.lstrip("_"): deep_size(value, seen) for name, value in vars(self).items()
+                if not isinstance(value, (int, bool))}
+
+def _take(strings: Sequence[str], rows: list) -> list:
+    """ Strings of some rows, decoded at once from a compiled dictionary (see 'PackedStrings.take()'). """
+    take = getattr(strings, "take", None)
+    return take(rows) if take is not None else [strings[row] for row in rows]
+
+def deep_size(value, seen: Optional[set] = None) -> int:
+    """ Memory held by an object and the objects it contains, in bytes.
+
+    numpy arrays, pandas indexes, lists, tuples, dicts and the attributes of
+    objects are followed. The arrays mapped from a file (the sections of a
+    compiled dictionary) are not counted: their pages are shared between the
+    processes and loaded on demand.
+
+    Args:
+        value: Object to measure.
+        seen (set): Ids of the objects already counted, which are not counted again.
+    """
+
+    seen = set() if seen is None else seen
+    if id(value) in seen or isinstance(value, (mmap.mmap, type)):
+        return 0
+    seen.add(id(value))
+
+    if isinstance(value, np.ndarray):
+        base = value
+        while isinstance(base, np.ndarray) and base.base is not None:
+            base = base.base
+        if isinstance(base, memoryview):
+            base = base.obj
+        size = 0 if isinstance(base, mmap.mmap) else value.nbytes
+        if value.dtype == object:
+            size += sum(deep_size(item, seen) for item in value.ravel().tolist())
+        return size
+
+    if isinstance(value, pd.Index):
+        # Hash table of the index, then its values
+        return value.memory_usage() - value.nbytes + deep_size(value.to_numpy(), seen)
+
+    size = sys.getsizeof(value)
+    if isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(deep_size(item, seen) for item in value)
+    elif isinstance(value, dict):
+        size += sum(deep_size(key, seen) + deep_size(item, seen) for key, item in value.items())
+    elif hasattr(value, "__dict__"):
+        size += deep_size(vars(value), seen)
+    return size
+
+def _codepoint_matrix(words: Sequence[str]) -> np.ndarray:
+    """ Fixed-width matrix of the code points of the words, one row per word, padded with zeros.
+
+    Its width is the length of the longest word, up to MATRIX_WIDTH. It is
+    stored on 16 bits unless a word contains a character beyond the BMP.
+    """
+
+    width = max(1, min(MATRIX_WIDTH, max(map(len, words), default=1)))
+    chunks = []
+    for start in range(0, len(words), MATRIX_CHUNK):
+        # numpy fixed-width unicode strings are UCS-4: viewed as uint32, they are the code points
+        chunk = np.array(words[start:start + MATRIX_CHUNK], dtype=f"U{width}")
+        chunks.append(chunk.view(np.uint32).reshape(len(chunk), width))
+
+    if not chunks:
+        return np.zeros((0, width), dtype=np.uint16)
+
+    dtype = np.uint16 if all(chunk.max(initial=0) <= 0xFFFF for chunk in chunks) else np.uint32
+    return np.concatenate([chunk.astype(dtype) for chunk in chunks])
+
+def _bit_frequency(bits: np.ndarray) -> np.ndarray:
+    """ Number of bitmasks having each of the 64 bits set. """
+    return np.array([np.count_nonzero(bits & np.uint64(1 << bit)) for bit in range(OVERFLOW_BIT + 1)])
+
+def _sorted_keys(keys: Sequence[str]) -> tuple:
+    """ Keys sorted for bisection, with the row of each sorted key.
+
+    Returns (sorted keys as a list, numpy array of their rows). Already sorted keys (the words of a compiled
+    dictionary) are not sorted again.
+    """
+
+    if pd.Index(keys, dtype=object).is_monotonic_increasing:
+        return list(keys), np.arange(len(keys))
+
+    array = np.empty(len(keys), dtype=object)
+    array[:] = keys
+    order = np.argsort(array, kind="stable")
+    return array[order].tolist(), order
+
+def _key_range(keys: list, prefix: str) -> tuple:
+    """ Range (lo, hi) of the sorted keys beginning with 'prefix'. """
+
+    if not prefix:
+        return 0, len(keys)
+
+    # The keys beginning with 'prefix' are before the first string greater than all of them: 'prefix' with its last
+    # character incremented
+    lo = bisect_left(keys, prefix)
+    hi = bisect_left(keys, prefix[:-1] + chr(ord(prefix[-1]) + 1), lo)
+    return lo, hi
+
+def _letter_bits(words: Sequence[str], matrix: np.ndarray, lengths: np.ndarray) -> tuple:
+    """ Bitmask of the letters present in each word.
+
+    The 63 most frequent characters of the words get their own bit. The
+    OVERFLOW_BIT is set for the words containing any other character.
+
+    Returns (bit of each frequent character, numpy.uint64 array of the words bitmasks).
+    """
+
+    # Occurrences of each code point (0 is the padding of the matrix)
+    frequency = np.zeros(1, dtype=np.int64)
+    for start in range(0, len(matrix), MATRIX_CHUNK):
+        counts = np.bincount(matrix[start:start + MATRIX_CHUNK].ravel())
+        if len(counts) > len(frequency):
+            counts[:len(frequency)] += frequency
+            frequency = counts
+        else:
+            frequency[:len(counts)] += counts
+    frequency[0] = 0
+
+    frequent = [int(cp) for cp in np.argsort(-frequency, kind="stable")[:OVERFLOW_BIT] if frequency[cp] > 0]
+    table = {chr(cp): bit for bit, cp in enumerate(frequent)}
+
+    # Flag of each code point: its own bit, the overflow bit, or nothing for the padding
+    flags = np.full(len(frequency), np.uint64(1 << OVERFLOW_BIT), dtype=np.uint64)
+    flags[0] = 0
+    flags[frequent] = np.left_shift(np.uint64(1), np.arange(len(frequent), dtype=np.uint64))
+
+    bits = np.empty(len(matrix), dtype=np.uint64)
+    for start in range(0, len(matrix), MATRIX_CHUNK):
+        bits[start:start + MATRIX_CHUNK] = np.bitwise_or.reduce(flags[matrix[start:start + MATRIX_CHUNK]], axis=1)
+
+    # Letters beyond the matrix width
+    width = matrix.shape[1]
+    for row in np.flatnonzero(lengths > width).tolist():
+        for char in words[row][width:]:
+            bits[row] |= np.uint64(1 << table.get(char, OVERFLOW_BIT))
+
+    return table, bits
+
+# ===================================================================
+#                          INDEXES CACHE
+# ===================================================================
+# Indexes built over dataframes, by (id(dataframe), column name), with
+# the array of the column they were built from. The entries are removed as
+# soon as the dataframe is garbage collected.
+_indexes = {}
+
+def get_index(source, col_name: Optional[str] = None) -> WordIndex:
+    """ Returns the word index of a dataframe column or of a compiled dictionary.
+
+    The index of a dataframe column is built on the first call and reused
+    until the dataframe is deleted. A column replaced, or resized, gets a
+    new index; but if words of the column are modified in place (df.loc[...]
+    = ...), 'invalidate()' must be called so that the index is built again.
+
+    Args:
+        source (pandas.DataFrame or CompiledDictionary): Words source.
+        col_name (str): Name of the column containing the words (dataframes only).
+    """
+
+    if not isinstance(source, pd.DataFrame):
+        return source.word_index()
+
+    column = source[col_name]
+    entry = _indexes.get((id(source), col_name))
+    if entry is not None and entry[0]() is source and entry[2]() is column.array and entry[1].size == len(column):
+        return entry[1]
+
+    index = WordIndex(column.tolist())
+    register(source, col_name, index)
+    return index
+
+def register(dataframe: pd.DataFrame, col_name: str, index: WordIndex):
+    """ Associates an already built index with a dataframe column. """
+
+    key = (id(dataframe), col_name)
+    _indexes[key] = (weakref.ref(dataframe, lambda _, key=key: _indexes.pop(key, None)), index,
+                     weakref.ref(dataframe[col_name].array))
+
+def invalidate(dataframe: pd.DataFrame):
+    """ Forgets the indexes built over a dataframe, after an in place modification. """
+
+    for key in [key for key in _indexes if key[0] == id(dataframe)]:
+        del _indexes[key]